@@ -14,6 +14,7 @@ import LogoutSuccess from './components/LogoutSuccess';
 import NotFound from './components/NotFound';
 import ErrorPage from './components/ErrorPage';
 import TestRunner from './components/TestRunner';
+import Leaderboard from './components/Leaderboard';
 import 'bootstrap/dist/css/bootstrap.min.css';
 import 'bootstrap/dist/js/bootstrap.bundle.min.js';
 import AdminRoute from './components/AdminRoute';
@@ -35,6 +36,7 @@ const App = () => {
             <Route path="/profile" element={<Profile />} />
             <Route path="/profile/:username" element={<Profile />} />
             <Route path="/post-mystery" element={<PostMystery />} />
+            <Route path="/leaderboards" element={<Leaderboard />} />
             <Route path="/logout-success" element={<LogoutSuccess />} />
             <Route path="/error" element={<ErrorPage />} />
             <Route 
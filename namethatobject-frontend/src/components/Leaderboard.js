@@ -0,0 +1,115 @@
+import React, { useEffect, useState } from 'react';
+import { Link } from 'react-router-dom';
+import axios from 'axios';
+import { API_BASE_URL } from '../config';
+
+const PAGE_SIZE = 20;
+
+const BOARDS = {
+  users: { label: 'Top Users', endpoint: 'users', params: { period: 'all' } },
+  usersWeek: { label: 'Users This Week', endpoint: 'users', params: { period: 'week' } },
+  points: { label: 'Top Mysteries', endpoint: 'mysteries', params: { metric: 'points' } },
+  activity: { label: 'Most Active This Week', endpoint: 'mysteries', params: { metric: 'activity' } },
+  hot: { label: 'Hot & Unsolved', endpoint: 'mysteries', params: { metric: 'hot' } },
+};
+
+const Leaderboard = () => {
+  const [board, setBoard] = useState('users');
+  const [tag, setTag] = useState('');
+  const [entries, setEntries] = useState([]);
+  const [next, setNext] = useState(null);
+  const [error, setError] = useState(null);
+
+  const load = (offset = 0) => {
+    const { endpoint, params } = BOARDS[board];
+    const query = { ...params, limit: PAGE_SIZE, offset };
+    if (tag.trim() && board !== 'usersWeek') {
+      query.tag = tag.trim();
+    }
+    axios.get(`${API_BASE_URL}/leaderboards/${endpoint}/`, { params: query })
+      .then((response) => {
+        setEntries((previous) => (offset ? [...previous, ...response.data.results] : response.data.results));
+        setNext(response.data.next);
+        setError(null);
+      })
+      .catch((err) => {
+        setError(err.response?.data?.error || 'Could not load the leaderboard.');
+        setEntries([]);
+        setNext(null);
+      });
+  };
+
+  useEffect(() => {
+    load(0);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [board]);
+
+  return (
+    <div className="container mt-4">
+      <h2 className="mb-3">Leaderboards</h2>
+      <ul className="nav nav-pills mb-3">
+        {Object.entries(BOARDS).map(([key, { label }]) => (
+          <li className="nav-item" key={key}>
+            <button
+              className={`nav-link ${board === key ? 'active' : ''}`}
+              onClick={() => setBoard(key)}
+            >
+              {label}
+            </button>
+          </li>
+        ))}
+      </ul>
+      {board !== 'usersWeek' && (
+        <form
+          className="d-flex mb-3"
+          onSubmit={(e) => {
+            e.preventDefault();
+            load(0);
+          }}
+        >
+          <input
+            className="form-control me-2"
+            style={{ maxWidth: '240px' }}
+            placeholder="Filter by tag"
+            value={tag}
+            onChange={(e) => setTag(e.target.value)}
+          />
+          <button className="btn btn-outline-primary" type="submit">Apply</button>
+        </form>
+      )}
+      {error && <div className="alert alert-warning">{error}</div>}
+      <table className="table table-hover">
+        <thead>
+          <tr>
+            <th style={{ width: '80px' }}>#</th>
+            <th>{BOARDS[board].endpoint === 'users' ? 'User' : 'Mystery'}</th>
+            <th className="text-end">Score</th>
+          </tr>
+        </thead>
+        <tbody>
+          {entries.map((entry) => (
+            <tr key={entry.rank}>
+              <td>{entry.rank}</td>
+              <td>
+                {entry.username ? (
+                  <Link to={`/profile/${entry.username}`}>{entry.username}</Link>
+                ) : (
+                  <Link to={`/mystery/${entry.post.id}`}>{entry.post.title}</Link>
+                )}
+              </td>
+              <td className="text-end">{entry.score}</td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+      {!error && entries.length === 0 && <p className="text-muted">Nothing here yet.</p>}
+      {next !== null && (
+        <button className="btn btn-outline-secondary" onClick={() => load(next)}>
+          Load more
+        </button>
+      )}
+    </div>
+  );
+};
+
+export default Leaderboard;
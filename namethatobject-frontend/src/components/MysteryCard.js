@@ -1,15 +1,16 @@
 import React from 'react';
 import { Link } from 'react-router-dom';
+import ResponsiveImage from './ResponsiveImage';
 
 const MysteryCard = ({ mystery }) => {
   return (
     <div className="card h-100">
-      {mystery.image && (
-        <img 
-          src={mystery.image} 
-          className="card-img-top" 
-          alt={mystery.title}
-          style={{ height: '200px', objectFit: 'cover' }}
+      {mystery.image_url && (
+        <ResponsiveImage
+          mystery={mystery}
+          sizes="(max-width: 767px) 100vw, 33vw"
+          className="card-img-top"
+          style={{ height: '200px' }}
         />
       )}
       <div className="card-body">
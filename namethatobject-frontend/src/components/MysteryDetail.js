@@ -6,10 +6,32 @@ import { getCloudinaryUrl } from '../utils/cloudinary';
 import Modal from "react-modal";
 import { handleAxiosError } from '../utils/errorHandler';
 
+// Apply `update` to the comment with `commentId`, wherever it sits in the reply tree
+const updateComment = (nodes, commentId, update) =>
+  nodes.map((node) => {
+    if (node.id === commentId) return { ...node, ...update(node) };
+    if (!node.replies?.length) return node;
+    return { ...node, replies: updateComment(node.replies, commentId, update) };
+  });
+
+const containsComment = (nodes, commentId) =>
+  nodes.some((node) => node.id === commentId || containsComment(node.replies || [], commentId));
+
+// Add a comment pushed by the server under its parent, unless we already have it
+const insertComment = (nodes, comment) => {
+  if (containsComment(nodes, comment.id)) return nodes;
+  if (!comment.parent) return [...nodes, comment];
+  return updateComment(nodes, comment.parent, (parent) => ({
+    replies: [...(parent.replies || []), comment],
+  }));
+};
+
 const MysteryDetail = () => {
   const { id } = useParams();
   const [mystery, setMystery] = useState(null);
   const [comments, setComments] = useState([]);
+  // Cursor of the next page of top-level comments, null once all are loaded
+  const [threadCursor, setThreadCursor] = useState(null);
   const [newComment, setNewComment] = useState("");
   const [newCommentTag, setNewCommentTag] = useState("Question"); // Default to "Question"
   const [replyCommentId, setReplyCommentId] = useState(null);
@@ -25,6 +47,7 @@ const MysteryDetail = () => {
   const [isEditing, setIsEditing] = useState(false);
   const [editedTitle, setEditedTitle] = useState('');
   const [editedDescription, setEditedDescription] = useState('');
+  const [similarMysteries, setSimilarMysteries] = useState([]);
 
   useEffect(() => {
     const fetchData = async () => {
@@ -35,30 +58,12 @@ const MysteryDetail = () => {
         }
         setMystery(mysteryResponse.data);
 
-        const commentsResponse = await axios.get(`${API_BASE_URL}/comments/`);
-        const postComments = commentsResponse.data.filter(
-          (comment) => comment.post === parseInt(id)
-        );
-
-        const commentMap = new Map();
-        const topLevelComments = [];
-
-        postComments.forEach(comment => {
-          commentMap.set(comment.id, { ...comment, replies: [] });
+        // The server returns the comments already nested into a reply tree
+        const threadResponse = await axios.get(`${API_BASE_URL}/posts/${id}/thread/`, {
+          params: { limit: 200 }
         });
-
-        postComments.forEach(comment => {
-          if (comment.parent) {
-            const parentComment = commentMap.get(comment.parent);
-            if (parentComment) {
-              parentComment.replies.push(commentMap.get(comment.id));
-            }
-          } else {
-            topLevelComments.push(commentMap.get(comment.id));
-          }
-        });
-
-        setComments(topLevelComments);
+        setComments(threadResponse.data.results);
+        setThreadCursor(threadResponse.data.next);
       } catch (error) {
         if (error.message === '404') {
           navigate('/error', { 
@@ -73,6 +78,83 @@ const MysteryDetail = () => {
     fetchData();
   }, [id, navigate]);
 
+  // Live comments, votes and eureka marks from other users, applied as they
+  // arrive instead of re-downloading the thread
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+    const source = new EventSource(`${API_BASE_URL}/posts/${id}/events/`);
+    source.addEventListener('comment', (event) => {
+      const comment = JSON.parse(event.data);
+      setComments((prev) => insertComment(prev, comment));
+    });
+    source.addEventListener('votes', (event) => {
+      const { post, comment, upvotes, downvotes, points } = JSON.parse(event.data);
+      if (post) {
+        setMystery((prev) => (prev ? { ...prev, upvotes, downvotes } : prev));
+      } else {
+        setComments((prev) => updateComment(prev, comment, () => ({ upvotes, downvotes, points })));
+      }
+    });
+    source.addEventListener('eureka', (event) => {
+      const { eureka_comment } = JSON.parse(event.data);
+      setMystery((prev) => (prev ? { ...prev, eureka_comment } : prev));
+    });
+    source.addEventListener('resync', async () => {
+      try {
+        const [mysteryResponse, threadResponse] = await Promise.all([
+          axios.get(`${API_BASE_URL}/posts/${id}/`),
+          axios.get(`${API_BASE_URL}/posts/${id}/thread/`, { params: { limit: 200 } }),
+        ]);
+        setMystery(mysteryResponse.data);
+        setComments(threadResponse.data.results);
+        setThreadCursor(threadResponse.data.next);
+      } catch (error) {
+        console.error('Error resyncing mystery:', error);
+      }
+    });
+    return () => source.close();
+  }, [id]);
+
+  const loadMoreComments = async () => {
+    try {
+      const response = await axios.get(`${API_BASE_URL}/posts/${id}/thread/`, {
+        params: { limit: 200, cursor: threadCursor }
+      });
+      setComments((prev) => {
+        const loaded = new Set(prev.map((comment) => comment.id));
+        // Live events may already have added some of these
+        return [...prev, ...response.data.results.filter((comment) => !loaded.has(comment.id))];
+      });
+      setThreadCursor(response.data.next);
+    } catch (error) {
+      console.error('Error loading more comments:', error);
+    }
+  };
+
+  // Uploaded media is pushed to storage in the background after the post is
+  // created; poll until its URLs are in.
+  const mediaStatus = mystery?.media_status;
+  useEffect(() => {
+    if (mediaStatus !== 'pending') return undefined;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API_BASE_URL}/posts/${id}/`);
+        const { media_status, image_url, video_url, audio_url } = response.data;
+        setMystery((prev) => ({ ...prev, media_status, image_url, video_url, audio_url }));
+      } catch (error) {
+        console.error('Error refreshing media status:', error);
+      }
+    }, 2000);
+    return () => clearTimeout(timer);
+  }, [id, mediaStatus, mystery]);
+
+  // Earlier posts whose image looks like this one (re-posts of the same object)
+  useEffect(() => {
+    axios.get(`${API_BASE_URL}/posts/${id}/similar/`)
+      .then((response) => setSimilarMysteries(response.data.results))
+      .catch((error) => console.error('Error fetching similar mysteries:', error));
+  }, [id]);
+
   useEffect(() => {
     if (mystery) {
       setEditedTitle(mystery.title);
@@ -106,21 +188,7 @@ const MysteryDetail = () => {
       );
 
       // Update comments state with new vote counts
-      setComments(prevComments => 
-        prevComments.map(comment => {
-          if (comment.id === commentId) {
-            return { ...comment, ...response.data };
-          }
-          // Check if the voted comment is a reply
-          if (comment.replies) {
-            const updatedReplies = comment.replies.map(reply => 
-              reply.id === commentId ? { ...reply, ...response.data } : reply
-            );
-            return { ...comment, replies: updatedReplies };
-          }
-          return comment;
-        })
-      );
+      setComments(prevComments => updateComment(prevComments, commentId, () => response.data));
     } catch (error) {
       console.error(`Error ${voteType}ing comment:`, error);
     }
@@ -165,13 +233,6 @@ const MysteryDetail = () => {
         setMystery(response.data);
         setShowEurekaSelection(false);
         setSelectedEurekaComment(null);
-        
-        // Refresh the comments to show the updated eureka status
-        const commentsResponse = await axios.get(`${API_BASE_URL}/comments/`);
-        const postComments = commentsResponse.data.filter(
-          (comment) => comment.post === parseInt(id)
-        );
-        setComments(postComments);
       }
     } catch (error) {
       console.error("Error marking mystery as solved:", error);
@@ -190,7 +251,7 @@ const MysteryDetail = () => {
         { headers: { Authorization: `Token ${token}` } }
       );
 
-      setComments([...comments, { ...response.data, replies: [] }]);
+      setComments(prevComments => insertComment(prevComments, { ...response.data, replies: [] }));
       setNewComment("");
       setNewCommentTag("Question"); // Reset to default
     } catch (error) {
@@ -218,17 +279,8 @@ const MysteryDetail = () => {
       );
 
       if (response.data) {
-        setComments(prevComments => 
-          prevComments.map(comment => {
-            if (comment.id === parentId) {
-              return {
-                ...comment,
-                replies: [...(comment.replies || []), response.data]
-              };
-            }
-            return comment;
-          })
-        );
+        // The event stream may have delivered it already
+        setComments(prevComments => insertComment(prevComments, { ...response.data, replies: [] }));
 
         setReplyText("");
         setReplyCommentId(null);
@@ -539,10 +591,29 @@ const MysteryDetail = () => {
         </div>
       )}
 
+      {similarMysteries.length > 0 && (
+        <div className="alert alert-info mb-4">
+          <strong>This object may have been posted before:</strong>
+          <ul className="mb-0 mt-2">
+            {similarMysteries.map((similar) => (
+              <li key={similar.id}>
+                <Link to={`/mystery/${similar.id}`}>{similar.title}</Link>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
+
       <div className="card shadow-sm mb-4">
         <div className="card-body">
 
           {/* Media section - only for image */}
+          {mystery.media_status === 'pending' && !mystery.image_url && (
+            <div className="text-muted text-center mb-4">
+              <i className="fas fa-spinner fa-spin me-2"></i>
+              Processing uploaded media...
+            </div>
+          )}
           {mystery.image_url && (
             <div 
               className="media-container position-relative mb-4"
@@ -969,6 +1040,11 @@ const MysteryDetail = () => {
             </div>
           ))}
         </div>
+        {threadCursor && (
+          <button className="btn btn-outline-secondary" onClick={loadMoreComments}>
+            Load more comments
+          </button>
+        )}
       </div>
 
       <style>
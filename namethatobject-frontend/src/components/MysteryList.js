@@ -3,24 +3,35 @@ import axios from 'axios';
 import { Link, useNavigate } from 'react-router-dom';
 import { API_BASE_URL } from '../config';
 import { getProfilePicture } from '../utils/cloudinaryHelper';
+import ResponsiveImage from './ResponsiveImage';
+
+// What a card shows (see ResponsiveImage for the image fields); the rest of
+// each post is left out of the feed
+const CARD_FIELDS = 'id,title,description,tags,upvotes,downvotes,image_url,image_srcset,image_placeholder';
 
 const MysteryList = ({ searchTerm }) => {
   const [mysteries, setMysteries] = useState([]);
   const [visibleCount, setVisibleCount] = useState(6);
+  const [nextPage, setNextPage] = useState(null);
   const [filter, setFilter] = useState('all');
+  const [ordering, setOrdering] = useState('hot');
   const [successMessage, setSuccessMessage] = useState('');
   const [isLoggedIn, setIsLoggedIn] = useState(false);
 
   const navigate = useNavigate();
 
   useEffect(() => {
-    axios.get(`${API_BASE_URL}/posts/`)
+    // Posts come back already ranked, one cursor page at a time
+    axios.get(`${API_BASE_URL}/posts/`, { params: { ordering, fields: CARD_FIELDS } })
       .then(response => {
-        const sortedMysteries = response.data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-        setMysteries(sortedMysteries);
+        setMysteries(response.data.results);
+        setNextPage(response.data.next);
+        setVisibleCount(6);
       })
       .catch(error => console.error('Error fetching mysteries:', error));
+  }, [ordering]);
 
+  useEffect(() => {
     const token = localStorage.getItem('token');
     setIsLoggedIn(!!token);
 
@@ -54,6 +65,14 @@ const MysteryList = ({ searchTerm }) => {
 
   const handleLoadMore = () => {
     setVisibleCount(visibleCount + 6);
+    if (nextPage && visibleCount + 6 >= mysteries.length) {
+      axios.get(nextPage)
+        .then(response => {
+          setMysteries(prevMysteries => [...prevMysteries, ...response.data.results]);
+          setNextPage(response.data.next);
+        })
+        .catch(error => console.error('Error fetching mysteries:', error));
+    }
   };
 
   const filteredMysteries = mysteries.filter(mystery => {
@@ -76,7 +95,19 @@ const MysteryList = ({ searchTerm }) => {
       <h1 className="text-center mb-4" style={{ color: 'var(--primary-text-gray)' }}>Mysteries</h1>
 
       {/* Filter Options */}
-      <div className="d-flex justify-content-center mb-4">
+      <div className="d-flex justify-content-center align-items-center mb-4">
+        <select
+          className="form-select me-3"
+          style={{ width: 'auto' }}
+          value={ordering}
+          onChange={(e) => setOrdering(e.target.value)}
+          aria-label="Sort mysteries"
+        >
+          <option value="hot">Hot</option>
+          <option value="new">New</option>
+          <option value="top">Top</option>
+          <option value="unsolved">Hot & Unsolved</option>
+        </select>
         <button
           className={`btn me-2 ${filter === 'all' ? 'btn-primary' : 'btn-outline-primary'}`}
           onClick={() => setFilter('all')}
@@ -137,15 +168,11 @@ const MysteryList = ({ searchTerm }) => {
                     }}
                     onClick={() => navigate(`/mystery/${mystery.id}`)}
                   >
-                    <img
-                      src={mystery.image_url}
-                      alt={mystery.title}
+                    <ResponsiveImage
+                      mystery={mystery}
+                      sizes="(max-width: 767px) 100vw, 33vw"
                       className="card-img-top"
-                      style={{ 
-                        height: '100%', 
-                        width: '100%',
-                        objectFit: 'cover'
-                      }}
+                      style={{ height: '100%', width: '100%' }}
                       onError={(e) => {
                         console.error('Image failed to load:', mystery.image_url);
                         e.target.style.display = 'none';
@@ -200,7 +227,7 @@ const MysteryList = ({ searchTerm }) => {
         )}
       </div>
 
-      {visibleCount < filteredMysteries.length && (
+      {(visibleCount < filteredMysteries.length || nextPage) && (
         <div className="text-center mt-4">
           <button className="btn btn-primary" onClick={handleLoadMore}>
             Load More Mysteries
@@ -36,13 +36,10 @@ const Navbar = ({ searchTerm, setSearchTerm }) => {
 
     if (term) {
       try {
-        const response = await axios.get(`${API_BASE_URL}/posts/`);
-        const filteredResults = response.data.filter(post =>
-          post.title.toLowerCase().includes(term.toLowerCase()) ||
-          post.description.toLowerCase().includes(term.toLowerCase()) ||
-          (post.tags && post.tags.some(tag => tag.name.toLowerCase().includes(term.toLowerCase())))
-        );
-        setSearchResults(filteredResults.slice(0, 5));
+        const response = await axios.get(`${API_BASE_URL}/search/suggest/`, {
+          params: { q: term, kind: 'post', limit: 5 }
+        });
+        setSearchResults(response.data.results);
       } catch (error) {
         console.error('Error fetching search results:', error);
       }
@@ -120,7 +117,7 @@ const Navbar = ({ searchTerm, setSearchTerm }) => {
                       onMouseLeave={(e) => e.currentTarget.style.backgroundColor = 'white'}
                     >
                       <div className="text-truncate">
-                        {result.title}
+                        {result.label}
                       </div>
                     </div>
                   ))}
@@ -130,6 +127,13 @@ const Navbar = ({ searchTerm, setSearchTerm }) => {
           </form>
 
           <div className="d-flex align-items-center">
+            <Link
+              className="nav-link me-3"
+              to="/leaderboards"
+              style={{ color: 'var(--primary-text-gray)' }}
+            >
+              Leaderboards
+            </Link>
             {isLoggedIn ? (
               <>
                 <Link
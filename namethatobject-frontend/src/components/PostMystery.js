@@ -2,6 +2,7 @@
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 import { API_BASE_URL } from '../config';
+import { uploadInChunks } from '../utils/chunkedUpload';
 
 const PostMystery = () => {
   const [title, setTitle] = useState('');
@@ -11,6 +12,8 @@ const PostMystery = () => {
   const [tagSuggestions, setTagSuggestions] = useState([]);
   const [selectedTags, setSelectedTags] = useState([]);
   const [image, setImage] = useState(null);
+  const [mediaFile, setMediaFile] = useState(null);
+  const [mediaProgress, setMediaProgress] = useState(null);
   const [showMysteryAttributes, setShowMysteryAttributes] = useState(false);
   const [selectedMysteryAttributes, setSelectedMysteryAttributes] = useState([]);
   const [expandedCategories, setExpandedCategories] = useState([]);
@@ -55,12 +58,13 @@ const PostMystery = () => {
       return;
     }
     try {
-      const response = await axios.get(
-        `https://www.wikidata.org/w/api.php?action=wbsearchentities&search=${query}&language=en&limit=5&format=json&origin=*`
-      );
+      const response = await axios.get(`${API_BASE_URL}/wikidata/search/`, {
+        params: { q: query, limit: 5 },
+        headers: { Authorization: `Token ${token}` }
+      });
       setIdentificationSuggestions((prev) => ({
         ...prev,
-        [clueCategory]: response.data.search.map((result) => ({
+        [clueCategory]: response.data.results.map((result) => ({
           name: result.label,
           description: result.description,
           wikidata_id: result.id,
@@ -141,11 +145,12 @@ const PostMystery = () => {
   const fetchTagSuggestions = async (query) => {
     if (!query) return setTagSuggestions([]);
     try {
-      const response = await axios.get(
-        `https://www.wikidata.org/w/api.php?action=wbsearchentities&search=${query}&language=en&limit=5&format=json&origin=*`
-      );
+      const response = await axios.get(`${API_BASE_URL}/wikidata/search/`, {
+        params: { q: query, limit: 5 },
+        headers: { Authorization: `Token ${token}` }
+      });
       setTagSuggestions(
-        response.data.search.map((result) => ({
+        response.data.results.map((result) => ({
           name: result.label,
           description: result.description,
           wikidata_id: result.id,
@@ -193,6 +198,21 @@ const PostMystery = () => {
         formData.append('image', image);
     }
 
+    // Videos and audio clips go through the resumable upload API first
+    if (mediaFile) {
+        const kind = mediaFile.type.startsWith('audio') ? 'audio' : 'video';
+        try {
+            const uploadId = await uploadInChunks(mediaFile, kind, token, setMediaProgress);
+            formData.append(`${kind}_upload`, uploadId);
+        } catch (error) {
+            console.error('Error uploading media:', error);
+            alert('Error uploading the video or audio clip. Please try again.');
+            setMediaProgress(null);
+            setIsSubmitting(false);
+            return;
+        }
+    }
+
     // Format and append tags
     const allTags = [
         ...selectedTags,
@@ -307,6 +327,31 @@ const PostMystery = () => {
               </small>
             </div>
 
+            {/* Video/Audio Upload Section */}
+            <div className="form-group mb-4">
+              <label className="form-label fw-bold">
+                <i className="fas fa-film me-2"></i>Upload Video or Audio
+              </label>
+              <div className="input-group">
+                <input
+                  type="file"
+                  className="form-control"
+                  onChange={(e) => setMediaFile(e.target.files[0] || null)}
+                  accept="video/*,audio/*"
+                  style={{ borderRadius: '10px' }}
+                />
+              </div>
+              {mediaProgress !== null && (
+                <div className="progress mt-2" style={{ height: '6px' }}>
+                  <div
+                    className="progress-bar"
+                    role="progressbar"
+                    style={{ width: `${Math.round(mediaProgress * 100)}%` }}
+                  ></div>
+                </div>
+              )}
+            </div>
+
             {/* Description Section */}
             <div className="form-group mb-4">
               <label className="form-label fw-bold">
@@ -24,6 +24,8 @@ const Profile = () => {
   });
   const [userPosts, setUserPosts] = useState([]);
   const [userComments, setUserComments] = useState([]);
+  const [nextPosts, setNextPosts] = useState(null);
+  const [nextComments, setNextComments] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [previewImage, setPreviewImage] = useState(null);
@@ -105,42 +107,38 @@ const Profile = () => {
       // Update profile data
       setProfileData(profileResponse.data);
 
-      // Fetch and update posts with the latest profile data
-      const postsResponse = await axios.get(`${API_BASE_URL}/posts/`);
-      const userSpecificPosts = postsResponse.data
-        .filter(post => 
-          post.author?.username === (profileUsername || loggedInUsername) && 
-          !post.is_anonymous
-        )
-        .map(post => ({
-          ...post,
-          author: {
-            ...post.author,
-            profile_picture: profileResponse.data.profile?.profile_picture
-          }
-        }))
-        .sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-      setUserPosts(userSpecificPosts);
-
-      // Fetch and update comments with the latest profile data
-      const commentsResponse = await axios.get(`${API_BASE_URL}/comments/`);
-      const userSpecificComments = commentsResponse.data
-        .filter(comment => comment.author?.username === (profileUsername || loggedInUsername))
-        .map(comment => ({
-          ...comment,
-          author: {
-            ...comment.author,
-            profile_picture: profileResponse.data.profile?.profile_picture
-          }
-        }))
-        .sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-      setUserComments(userSpecificComments);
-
-      // Calculate and update points, rank, and badges
-      const calculatedPoints = calculatePoints(userSpecificPosts, userSpecificComments);
-      setPoints(calculatedPoints);
-      setRank(calculateRank(calculatedPoints));
-      setEarnedBadges(calculateBadges(userSpecificPosts, userSpecificComments, calculatedPoints));
+      // The server filters, orders and pages the user's own posts and comments
+      const activityUrl = `${API_BASE_URL}/user/profile/${profileResponse.data.username}`;
+      const withProfilePicture = item => ({
+        ...item,
+        author: {
+          ...item.author,
+          profile_picture: profileResponse.data.profile?.profile_picture
+        }
+      });
+      const [postsResponse, commentsResponse] = await Promise.all([
+        axios.get(`${activityUrl}/posts/`, {
+          params: { page_size: 20 },
+          headers: { Authorization: `Token ${token}` }
+        }),
+        axios.get(`${activityUrl}/comments/`, {
+          params: { page_size: 20 },
+          headers: { Authorization: `Token ${token}` }
+        })
+      ]);
+      setUserPosts(postsResponse.data.results.map(withProfilePicture));
+      setUserComments(commentsResponse.data.results.map(withProfilePicture));
+      setNextPosts(postsResponse.data.next);
+      setNextComments(commentsResponse.data.next);
+
+      // Points, rank and badges are kept up to date on the server
+      const statsResponse = await axios.get(
+        `${API_BASE_URL}/user/profile/${profileResponse.data.username}/stats/`,
+        { headers: { Authorization: `Token ${token}` } }
+      );
+      setPoints(statsResponse.data.points);
+      setRank(statsResponse.data.rank);
+      setEarnedBadges(statsResponse.data.badges);
 
     } catch (err) {
       console.error('Error fetching data:', err);
@@ -206,42 +204,30 @@ const Profile = () => {
     }
   };
 
-  const calculateRank = (totalPoints) => {
-    if (totalPoints >= 1000) return 'God Like';
-    if (totalPoints >= 750) return 'Master';
-    if (totalPoints >= 500) return 'Expert';
-    if (totalPoints >= 250) return 'Contributor';
-    if (totalPoints >= 100) return 'Explorer';
-    return 'Beginner';
-  };
-
-  const calculatePoints = (posts, comments) => {
-    let pointsFromPosts = posts.reduce((sum, post) => sum + post.upvotes, 0);
-    let pointsFromComments = comments.reduce((sum, comment) => sum + comment.upvotes, 0);
-    let bonusPoints = posts.length * 10 + comments.length * 5;
-    return pointsFromPosts + pointsFromComments + bonusPoints;
-  };
-
-  const calculateBadges = (posts, comments, points) => {
-    const badges = [];
-    const upvotedPosts = posts.filter((post) => post.upvotes >= 10).length;
-    const expertAnswers = comments.filter((comment) => comment.tag === 'Expert Answer').length;
-    const anonymousUpvotedPosts = posts.filter((post) => post.is_anonymous && post.upvotes >= 10).length;
-
-    if (posts.length > 0) badges.push('first_post');
-    if (comments.length >= 10) badges.push('commenter');
-    if (upvotedPosts > 0) badges.push('upvoted_post');
-    if (points >= 1000) badges.push('top_contributor');
-    if (expertAnswers >= 10) badges.push('helper');
-    if (anonymousUpvotedPosts > 0) badges.push('anonymous_advocate');
-
-    return badges;
-  };
-
   const handleShowBadge = (badge) => setSelectedBadge(badge);
   const handleCloseModal = () => setSelectedBadge(null);
-  const handleLoadMorePosts = () => setVisiblePosts(prev => prev + 5);
-  const handleLoadMoreComments = () => setVisibleComments(prev => prev + 5);
+  // Reveals five more items, fetching the next page once the loaded ones run out
+  const loadMore = (items, visible, setVisible, next, setNext, setItems) => {
+    setVisible(visible + 5);
+    if (next && visible + 5 >= items.length) {
+      axios.get(next, { headers: { Authorization: `Token ${token}` } })
+        .then(response => {
+          const profilePicture = profileData.profile?.profile_picture;
+          const results = response.data.results.map(item => ({
+            ...item,
+            author: { ...item.author, profile_picture: profilePicture }
+          }));
+          setItems(prev => [...prev, ...results]);
+          setNext(response.data.next);
+        })
+        .catch(error => console.error('Error fetching activity:', error));
+    }
+  };
+
+  const handleLoadMorePosts = () =>
+    loadMore(userPosts, visiblePosts, setVisiblePosts, nextPosts, setNextPosts, setUserPosts);
+  const handleLoadMoreComments = () =>
+    loadMore(userComments, visibleComments, setVisibleComments, nextComments, setNextComments, setUserComments);
 
   const handleDeleteAccount = async () => {
     if (deleteConfirmation !== profileData.username) {
@@ -250,7 +236,7 @@ const Profile = () => {
     }
 
     try {
-      await axios.delete(`${API_BASE_URL}/user/delete-account/`, {
+      const response = await axios.delete(`${API_BASE_URL}/user/delete-account/`, {
         headers: { Authorization: `Token ${token}` }
       });
 
@@ -258,8 +244,13 @@ const Profile = () => {
       localStorage.removeItem('token');
       localStorage.removeItem('userData');
 
-      // Show success message and redirect
-      alert('Your account has been successfully deleted');
+      // Show success message and redirect. Large accounts are deleted in the
+      // background (202); the account is already signed out at this point.
+      if (response.status === 202) {
+        alert('Your account is being deleted. This can take a few minutes for large accounts.');
+      } else {
+        alert('Your account has been successfully deleted');
+      }
       navigate('/');
     } catch (error) {
       console.error('Error deleting account:', error);
@@ -532,7 +523,7 @@ const Profile = () => {
                   </div>
                 </div>
               ))}
-              {userPosts.length > visiblePosts && (
+              {(userPosts.length > visiblePosts || nextPosts) && (
                 <button 
                   onClick={handleLoadMorePosts}
                   className="btn btn-outline-primary w-100 mt-3"
@@ -583,7 +574,7 @@ const Profile = () => {
                   </div>
                 </div>
               ))}
-              {userComments.length > visibleComments && (
+              {(userComments.length > visibleComments || nextComments) && (
                 <button 
                   onClick={handleLoadMoreComments}
                   className="btn btn-outline-primary w-100 mt-3"
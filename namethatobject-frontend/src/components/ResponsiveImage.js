@@ -0,0 +1,44 @@
+import React, { useState } from 'react';
+
+// Serves the server-generated derivatives (`image_srcset`) so the browser
+// downloads the width it needs instead of the full-size original, with the
+// tiny `image_placeholder` shown blurred until it arrives.
+const ResponsiveImage = ({ mystery, sizes, className, style, onError }) => {
+  const [loaded, setLoaded] = useState(false);
+  const srcset = mystery.image_srcset || {};
+
+  return (
+    <div
+      style={{
+        ...style,
+        backgroundImage: mystery.image_placeholder && !loaded ? `url(${mystery.image_placeholder})` : 'none',
+        backgroundSize: 'cover',
+        backgroundPosition: 'center',
+        overflow: 'hidden'
+      }}
+    >
+      <picture>
+        {srcset.webp && <source type="image/webp" srcSet={srcset.webp} sizes={sizes} />}
+        {srcset.jpeg && <source type="image/jpeg" srcSet={srcset.jpeg} sizes={sizes} />}
+        <img
+          src={mystery.image_url}
+          alt={mystery.title}
+          className={className}
+          loading="lazy"
+          decoding="async"
+          onLoad={() => setLoaded(true)}
+          onError={onError}
+          style={{
+            height: '100%',
+            width: '100%',
+            objectFit: 'cover',
+            opacity: loaded ? 1 : 0,
+            transition: 'opacity 0.3s'
+          }}
+        />
+      </picture>
+    </div>
+  );
+};
+
+export default ResponsiveImage;
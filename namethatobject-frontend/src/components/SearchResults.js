@@ -51,33 +51,21 @@ const SearchResults = () => {
   }, [location.search]);
 
   const fetchSearchResults = () => {
-    axios.get(MYSTERIES_ENDPOINT).then((response) => {
-      let filteredResults = response.data.filter((mystery) => {
-        const query = searchQuery.toLowerCase();
-        return (
-          mystery.title.toLowerCase().includes(query) ||
-          mystery.description.toLowerCase().includes(query) ||
-          mystery.tags?.some((tag) => tag.name.toLowerCase().includes(query))
-        );
-      });
+    // Facet filters are applied server-side through the tag index
+    const params = new URLSearchParams();
+    Object.keys(filters).forEach((filterKey) => {
+      filters[filterKey].forEach((value) => params.append('facet', `${filterKey}:${value}`));
+    });
 
-      // Apply strict filtering logic
-      Object.keys(filters).forEach((filterKey) => {
-        const selectedValues = filters[filterKey];
-        if (selectedValues.length > 0) {
-          filteredResults = filteredResults.filter((mystery) =>
-            selectedValues.every((value) =>
-              mystery.tags?.some(
-                (tag) =>
-                  tag.description === filterKey &&
-                  tag.name.toLowerCase() === value.toLowerCase()
-              )
-            )
-          );
-        }
-      });
+    let url = `${MYSTERIES_ENDPOINT}?${params}`;
+    if (searchQuery) {
+      params.append('q', searchQuery);
+      params.append('limit', 50);
+      url = `${API_BASE_URL}/posts/search/?${params}`;
+    }
 
-      setResults(filteredResults);
+    axios.get(url).then((response) => {
+      setResults(response.data.results);
     });
   };
 
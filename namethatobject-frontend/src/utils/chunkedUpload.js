@@ -0,0 +1,48 @@
+import axios from 'axios';
+import { API_BASE_URL } from '../config';
+
+const CHUNK_SIZE = 5 * 1024 * 1024;
+const MAX_RETRIES = 3;
+
+const sha256Base64 = async (buffer) => {
+  const digest = await crypto.subtle.digest('SHA-256', buffer);
+  return btoa(String.fromCharCode(...new Uint8Array(digest)));
+};
+
+// Sends a video/audio file to the resumable upload API in checksummed
+// chunks. After a failed chunk it asks the server for its offset and
+// resumes from there. Resolves with the upload id to attach to a post.
+export const uploadInChunks = async (file, kind, token, onProgress = () => {}) => {
+  const headers = { Authorization: `Token ${token}` };
+  const { data } = await axios.post(
+    `${API_BASE_URL}/uploads/`,
+    { kind, filename: file.name, length: file.size },
+    { headers }
+  );
+  const url = `${API_BASE_URL}/uploads/${data.id}/`;
+
+  let offset = 0;
+  let failures = 0;
+  while (offset < file.size) {
+    const chunk = await file.slice(offset, offset + CHUNK_SIZE).arrayBuffer();
+    try {
+      const response = await axios.patch(url, chunk, {
+        headers: {
+          ...headers,
+          'Content-Type': 'application/offset+octet-stream',
+          'Upload-Offset': offset,
+          'Upload-Checksum': `sha256 ${await sha256Base64(chunk)}`,
+        },
+      });
+      offset = Number(response.headers['upload-offset']);
+      failures = 0;
+      onProgress(offset / file.size);
+    } catch (error) {
+      failures += 1;
+      if (failures > MAX_RETRIES) throw error;
+      const state = await axios.get(url, { headers });
+      offset = state.data.offset;
+    }
+  }
+  return data.id;
+};
@@ -17,7 +17,7 @@ describe('MysteryList Component', () => {
   ];
 
   beforeEach(() => {
-    axios.get.mockResolvedValue({ data: mockPosts });
+    axios.get.mockResolvedValue({ data: { next: null, previous: null, results: mockPosts } });
   });
 
   test('renders mystery posts', async () => {
@@ -30,7 +30,7 @@ describe('Profile Component', () => {
         return Promise.resolve({ data: mockUser });
       }
       if (url.includes('posts')) {
-        return Promise.resolve({ data: mockPosts });
+        return Promise.resolve({ data: { next: null, previous: null, results: mockPosts } });
       }
       return Promise.reject(new Error('not found'));
     });
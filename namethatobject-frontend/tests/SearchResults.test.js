@@ -21,7 +21,7 @@ describe('SearchResults Component', () => {
   ];
 
   beforeEach(() => {
-    axios.get.mockResolvedValue({ data: mockResults });
+    axios.get.mockResolvedValue({ data: { next: null, previous: null, results: mockResults } });
   });
 
   test('renders search result title', async () => {
@@ -53,7 +53,7 @@ describe('SearchResults Component', () => {
   });
 
   test('displays no results message', async () => {
-    axios.get.mockResolvedValueOnce({ data: [] });
+    axios.get.mockResolvedValueOnce({ data: { next: null, previous: null, results: [] } });
 
     render(
       <BrowserRouter>
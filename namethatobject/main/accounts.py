@@ -0,0 +1,220 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .models import AccountDeletion, Comment, LeaderboardScore, Post
+from .reputation import recredit
+from .response_cache import POST_LIST, invalidate, post_key, user_key
+from .suggest import remove_posts_from_suggest_index
+
+DEFAULTS = {
+    # Accounts with more posts and comments than this are deleted by the
+    # background worker; the request returns a job to poll instead
+    'BACKGROUND_THRESHOLD': 2000,
+    'BATCH_SIZE': 1000,
+    'EAGER': False,
+}
+
+# Posts and comments that outlive their author are handed to this
+# placeholder account. It can't sign in, and the username validator keeps
+# anyone from registering it.
+DELETED_USERNAME = '[deleted]'
+
+
+def deletion_settings():
+    return {**DEFAULTS, **getattr(settings, 'ACCOUNT_DELETION', {})}
+
+
+def deleted_user():
+    user, created = User.objects.get_or_create(username=DELETED_USERNAME, defaults={'is_active': False})
+    if created:
+        user.set_unusable_password()
+        user.save(update_fields=['password'])
+    return user
+
+
+def content_count(user):
+    return Post.objects.filter(author=user).count() + Comment.objects.filter(author=user).count()
+
+
+def _hand_over_posts(user_id, placeholder, batch_size):
+    """
+    Hand one batch of the user's posts to `placeholder`: posts others have
+    commented on stay up, anonymized; the rest are soft-deleted. Returns
+    the number of posts handled, 0 once there are none left.
+    """
+    ids = list(Post.objects.filter(author_id=user_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    batch = Post.objects.filter(pk__in=ids)
+    batch.filter(Exists(Comment.objects.filter(post=OuterRef('pk')))).update(
+        is_anonymous=True, author=placeholder
+    )
+    removed = list(batch.filter(author_id=user_id).values_list('pk', flat=True))
+    if removed:
+        Post.objects.filter(pk__in=removed).update(is_deleted=True, author=placeholder)
+        LeaderboardScore.objects.filter(subject_id__in=removed, board__startswith='posts:').delete()
+        transaction.on_commit(lambda: remove_posts_from_suggest_index(removed))
+    invalidate(POST_LIST, *(post_key(pk) for pk in ids))
+    return len(ids)
+
+
+def _hand_over_comments(user_id, placeholder, batch_size):
+    ids = list(Comment.objects.filter(author_id=user_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+    if ids:
+        Comment.objects.filter(pk__in=ids).update(is_anonymous=True, author=placeholder)
+    return len(ids)
+
+
+def _batches(user_id, placeholder, batch_size):
+    """Hand the user's content over one batch at a time, yielding the number of rows in each."""
+    for hand_over in (_hand_over_posts, _hand_over_comments):
+        while True:
+            handled = hand_over(user_id, placeholder, batch_size)
+            if not handled:
+                break
+            yield handled
+
+
+def delete_account(user, batch_size=None):
+    """
+    Delete `user` in one transaction. Their posts and comments are moved to
+    the deleted-user placeholder with a few set-based UPDATEs per batch
+    instead of being saved one by one, so deleting the user row afterwards
+    cascades over nothing but their own votes, profile and tokens.
+    """
+    batch_size = batch_size or deletion_settings()['BATCH_SIZE']
+    placeholder = deleted_user()
+    with transaction.atomic():
+        for _ in _batches(user.pk, placeholder, batch_size):
+            pass
+        invalidate(user_key(user.pk))
+        user.delete()
+        # The UPDATEs bypass the reputation signals; only the placeholder's
+        # counters depend on who authored the handed over content
+        recredit([placeholder.pk])
+
+
+def start_deletion(user):
+    """
+    Queue `user`'s account for deletion in the background. The account is
+    deactivated and signed out right away; the returned job reports
+    progress until the worker has deleted it.
+    """
+    with transaction.atomic():
+        job = AccountDeletion.objects.create(user=user, username=user.username, total=content_count(user))
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        Token.objects.filter(user=user).delete()
+        transaction.on_commit(lambda: submit(job.pk))
+    return job
+
+
+def run_deletion(job_id):
+    """
+    Carry out a queued deletion, one transaction per batch, recording
+    progress as it goes. A job interrupted part way (e.g. by a restart)
+    picks up where it stopped when run again. Returns the final status, or
+    None if another worker already has the job.
+    """
+    claimed = AccountDeletion.objects.filter(
+        pk=job_id, status__in=[AccountDeletion.PENDING, AccountDeletion.RUNNING]
+    ).update(status=AccountDeletion.RUNNING, updated_at=timezone.now())
+    if not claimed:
+        return None
+    job = AccountDeletion.objects.get(pk=job_id)
+    try:
+        if job.user_id is not None:
+            placeholder = deleted_user()
+            batches = _batches(job.user_id, placeholder, deletion_settings()['BATCH_SIZE'])
+            while True:
+                with transaction.atomic():
+                    handled = next(batches, 0)
+                    if handled:
+                        job.processed += handled
+                        AccountDeletion.objects.filter(pk=job.pk).update(
+                            processed=job.processed, updated_at=timezone.now()
+                        )
+                if not handled:
+                    break
+            with transaction.atomic():
+                invalidate(user_key(job.user_id))
+                for user in User.objects.filter(pk=job.user_id):
+                    user.delete()
+                recredit([placeholder.pk])
+        AccountDeletion.objects.filter(pk=job.pk).update(
+            status=AccountDeletion.DONE, processed=job.total, updated_at=timezone.now()
+        )
+        return AccountDeletion.DONE
+    except Exception as e:
+        print(f"Error deleting account {job.username}: {e}")
+        AccountDeletion.objects.filter(pk=job.pk).update(status=AccountDeletion.FAILED, error=str(e))
+        return AccountDeletion.FAILED
+
+
+def deletion_state(job):
+    return {
+        'id': str(job.pk),
+        'username': job.username,
+        'status': job.status,
+        'processed': job.processed,
+        'total': job.total,
+        'progress': round(job.processed / job.total, 3) if job.total else 1.0,
+        'error': job.error,
+    }
+
+
+class DeletionWorker:
+    """Single background thread that works through queued account deletions."""
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='account-deletion')
+
+    def submit(self, job_id):
+        return self.executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        try:
+            return run_deletion(job_id)
+        finally:
+            connection.close()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def get_deletion_worker():
+    global _worker, _worker_pid
+    with _worker_lock:
+        if _worker is None or _worker_pid != os.getpid():
+            _worker = DeletionWorker()
+            _worker_pid = os.getpid()
+            atexit.register(shutdown_deletion_worker)
+        return _worker
+
+
+def shutdown_deletion_worker():
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.shutdown()
+
+
+def submit(job_id):
+    if deletion_settings()['EAGER']:
+        run_deletion(job_id)
+        return
+    get_deletion_worker().submit(job_id)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, Comment
+from .models import Post, Comment, Vote, MediaUpload, ChunkedUpload, UserReputation, LeaderboardScore
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
@@ -12,3 +12,32 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('id', 'post', 'author', 'text', 'tag', 'created_at')
     list_filter = ('tag', 'created_at')  # Filter by tag
     search_fields = ('text', 'author__username', 'tag')  # Allow search by tag
+
+@admin.register(Vote)
+class VoteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'post', 'comment', 'value', 'created_at')
+    list_filter = ('value', 'created_at')
+    raw_id_fields = ('user', 'post', 'comment')
+
+@admin.register(MediaUpload)
+class MediaUploadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'post', 'kind', 'status', 'attempts', 'updated_at')
+    list_filter = ('kind', 'status')
+    raw_id_fields = ('post',)
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'kind', 'filename', 'offset', 'length', 'status', 'updated_at')
+    list_filter = ('kind', 'status')
+    raw_id_fields = ('user', 'post')
+
+@admin.register(UserReputation)
+class UserReputationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'points', 'post_count', 'comment_count', 'eureka_count')
+    search_fields = ('user__username',)
+    raw_id_fields = ('user',)
+
+@admin.register(LeaderboardScore)
+class LeaderboardScoreAdmin(admin.ModelAdmin):
+    list_display = ('board', 'subject_id', 'score')
+    search_fields = ('board',)
@@ -0,0 +1,149 @@
+"""
+Async versions of the hot read endpoints, for the ASGI entry point.
+
+They answer with the same JSON as the PostViewSet actions they mirror
+(list, retrieve, thread, search) and share its querysets, serializers
+(flat ones for the list and thread), paginator and response cache. Queries go through Django's async ORM and
+rows are serialized once fetched, so serializers never touch the database
+from the event loop. DRF has no async views, so `async_read_view` supplies
+the bits of APIView these need: the Request wrapper, JSON rendering and
+error responses.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from .fieldsets import parse_fieldset, related_id
+from .flat_serializers import FlatPostSerializer, FlatThreadCommentSerializer
+from .models import Comment, Post
+from .pagination import FeedCursorPagination
+from .renderers import FastJSONRenderer
+from .response_cache import POST_LIST, acached_response, post_key, user_key
+from .search import get_search_backend
+from .serializers import PostSerializer
+from .threads import CommentThread
+from .views import int_query_param, post_queryset, read_serializer
+
+
+def async_read_view(view=None, *, renderer_class=JSONRenderer):
+    """Wrap an async GET view taking a DRF Request and returning a DRF Response."""
+    if view is None:
+        return functools.partial(async_read_view, renderer_class=renderer_class)
+
+    @require_GET
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request = Request(request)
+        request.accepted_renderer = renderer_class()
+        request.accepted_media_type = renderer_class.media_type
+        try:
+            response = await view(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            response = exception_handler(exc, {'request': request})
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = {'request': request, 'response': response}
+        patch_vary_headers(response, ['Accept'])
+        return response.render()
+
+    return wrapper
+
+
+async def get_post(request, pk, serializer=PostSerializer):
+    try:
+        return await post_queryset(request, 'retrieve', serializer).aget(pk=pk)
+    except Post.DoesNotExist:
+        raise Http404('No Post matches the given query.')
+
+
+def context(request):
+    return {'request': request, 'format': None, 'view': None}
+
+
+def post_serializer(request, *args):
+    return read_serializer(request, PostSerializer(*args, context=context(request)))
+
+
+@async_read_view(renderer_class=FastJSONRenderer)
+async def post_list(request):
+    async def render():
+        paginator = FeedCursorPagination()
+        serializer = FlatPostSerializer(parse_fieldset(request))
+        rows = serializer.rows(post_queryset(request, 'list'))
+        # DRF's paginator builds and runs the page query itself; one hop to
+        # a thread for it is what the async ORM would do for the query anyway
+        page = await sync_to_async(paginator.paginate_queryset)(rows, request)
+        return paginator.get_paginated_response(serializer.serialize(page))
+
+    return await acached_response(request, [POST_LIST], render)
+
+
+@async_read_view
+async def post_detail(request, pk):
+    async def render():
+        post = await get_post(request, pk, post_serializer(request))
+        return Response(post_serializer(request, post).data)
+
+    return await acached_response(
+        request, [post_key(pk)], render,
+        discover=lambda data: [user_key(related_id(data['author']))] if data.get('author') else []
+    )
+
+
+@async_read_view(renderer_class=FastJSONRenderer)
+async def post_thread(request, pk):
+    post = await get_post(request, pk)
+    max_depth = int_query_param(request, 'depth')
+    limit = int_query_param(request, 'limit', default=50, maximum=200)
+    parent_id = int_query_param(request, 'parent')
+
+    serializer = FlatThreadCommentSerializer(parse_fieldset(request))
+    comments = serializer.rows(Comment.objects.filter(post=post).order_by('created_at', 'id'))
+    thread = CommentThread([comment async for comment in comments])
+    roots, next_cursor = thread.window(
+        parent_id=parent_id,
+        cursor=request.query_params.get('cursor', None),
+        limit=limit
+    )
+    results = thread.render(
+        roots,
+        serializer.serialize,
+        max_depth=max_depth
+    )
+    return Response({
+        'post': post.id,
+        'count': len(thread.comments),
+        'next': next_cursor,
+        'results': results
+    })
+
+
+@async_read_view
+async def post_search(request):
+    text = request.query_params.get('q', '').strip()
+    limit = int_query_param(request, 'limit', default=20, maximum=50)
+    offset = int_query_param(request, 'offset', default=0, minimum=0)
+    if not text:
+        return Response({'next': None, 'results': []})
+
+    queryset = post_queryset(request, 'search', post_serializer(request))
+    # The search backends run raw SQL, which has no async interface
+    matches = await sync_to_async(get_search_backend().search)(queryset, text, offset, limit + 1)
+    results = []
+    for match in matches[:limit]:
+        data = post_serializer(request, match.post).data
+        data['rank'] = match.rank
+        data['highlight'] = match.highlight
+        results.append(data)
+    return Response({
+        'next': offset + limit if len(matches) > limit else None,
+        'results': results
+    })
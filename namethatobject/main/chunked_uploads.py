@@ -0,0 +1,208 @@
+import base64
+import binascii
+import fcntl
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .media import ingest_staged_file, staging_dir
+from .models import ChunkedUpload
+
+DEFAULTS = {
+    'DIR': None,
+    'MAX_SIZE': 2 * 1024 ** 3,
+    'EXPIRE_AFTER': 24 * 3600,
+}
+
+# Bytes read from the request per write, so memory use is the same for any chunk or file size
+BLOCK_SIZE = 64 * 1024
+
+CHECKSUM_ALGORITHMS = {
+    'sha256': hashlib.sha256,
+    'sha1': hashlib.sha1,
+    'md5': hashlib.md5,
+}
+
+# Status tus uses for a chunk whose Upload-Checksum does not match
+CHECKSUM_MISMATCH = 460
+
+
+class UploadError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def upload_settings():
+    return {**DEFAULTS, **getattr(settings, 'CHUNKED_UPLOADS', {})}
+
+
+def upload_dir():
+    return upload_settings()['DIR'] or os.path.join(settings.BASE_DIR, 'chunked_uploads')
+
+
+def upload_state(upload):
+    return {
+        'id': str(upload.id),
+        'kind': upload.kind,
+        'filename': upload.filename,
+        'length': upload.length,
+        'offset': upload.offset,
+        'status': upload.status,
+    }
+
+
+def create_upload(user, kind, filename, length):
+    if kind not in dict(ChunkedUpload.KIND_CHOICES):
+        raise UploadError(f'kind must be one of {", ".join(dict(ChunkedUpload.KIND_CHOICES))}.', 400)
+    try:
+        length = int(length)
+    except (TypeError, ValueError):
+        raise UploadError('length must be an integer.', 400)
+    if length <= 0:
+        raise UploadError('length must be positive.', 400)
+    if length > upload_settings()['MAX_SIZE']:
+        raise UploadError(f'Uploads are limited to {upload_settings()["MAX_SIZE"]} bytes.', 413)
+
+    filename = os.path.basename(str(filename or kind))[:255]
+    os.makedirs(upload_dir(), exist_ok=True)
+    upload_id = uuid.uuid4()
+    path = os.path.join(upload_dir(), f'{upload_id}.part')
+    open(path, 'wb').close()
+    return ChunkedUpload.objects.create(
+        id=upload_id, user=user, kind=kind, filename=filename, length=length, path=path
+    )
+
+
+def parse_checksum(header):
+    """`Upload-Checksum: sha256 <base64 digest>` -> (hash constructor, digest bytes)."""
+    algorithm, _, encoded = (header or '').strip().partition(' ')
+    if algorithm.lower() not in CHECKSUM_ALGORITHMS:
+        raise UploadError(
+            f'Upload-Checksum must be "<{"|".join(CHECKSUM_ALGORITHMS)}> <base64 digest>".', 400
+        )
+    try:
+        digest = base64.b64decode(encoded.strip(), validate=True)
+    except binascii.Error:
+        raise UploadError('Upload-Checksum digest is not valid base64.', 400)
+    return CHECKSUM_ALGORITHMS[algorithm.lower()], digest
+
+
+def write_chunk(upload, offset, stream, content_length, checksum):
+    """
+    Append one chunk of the request body at `offset`.
+
+    The body is copied to the upload file `BLOCK_SIZE` bytes at a time while
+    it is hashed, so memory use stays flat. If the digest does not match
+    `checksum` (or the body ends early) the file is truncated back to
+    `offset` and the client can resend the chunk. An exclusive lock on the
+    file turns concurrent PATCHes of the same upload into a 409.
+    """
+    if upload.status != ChunkedUpload.UPLOADING:
+        raise UploadError('Upload is already complete.', 409)
+    if content_length is None:
+        raise UploadError('Content-Length is required.', 411)
+    if offset is None or offset != upload.offset:
+        raise UploadError(f'Upload-Offset must be {upload.offset}.', 409)
+    if offset + content_length > upload.length:
+        raise UploadError('Chunk goes past the declared upload length.', 413)
+    algorithm, expected = parse_checksum(checksum)
+
+    with open(upload.path, 'r+b') as part:
+        try:
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError('Another chunk of this upload is being written.', 409)
+        # Check the offset again now that we hold the lock
+        upload.refresh_from_db(fields=['offset', 'status'])
+        if upload.offset != offset:
+            raise UploadError(f'Upload-Offset must be {upload.offset}.', 409)
+
+        # Drop whatever an interrupted earlier attempt left past the offset
+        part.seek(offset)
+        part.truncate()
+        digest = algorithm()
+        remaining = content_length
+        while remaining:
+            block = stream.read(min(BLOCK_SIZE, remaining)) if stream is not None else b''
+            if not block:
+                break
+            digest.update(block)
+            part.write(block)
+            remaining -= len(block)
+
+        if remaining:
+            part.truncate(offset)
+            raise UploadError('Request body ended before Content-Length bytes.', 400)
+        if digest.digest() != expected:
+            part.truncate(offset)
+            raise UploadError('Chunk checksum does not match.', CHECKSUM_MISMATCH)
+        part.flush()
+        os.fsync(part.fileno())
+
+        new_offset = offset + content_length
+        status = ChunkedUpload.COMPLETE if new_offset == upload.length else ChunkedUpload.UPLOADING
+        ChunkedUpload.objects.filter(pk=upload.pk).update(
+            offset=new_offset, status=status, updated_at=timezone.now()
+        )
+    upload.offset = new_offset
+    upload.status = status
+    return upload
+
+
+def _move_to_staging(source, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.move(source, path)
+
+
+def attach_upload(upload, post):
+    """
+    Hand a completed upload to the media pipeline as `post`'s video or audio.
+    The file is moved into staging only once the transaction commits (just
+    before the pipeline picks it up), so a rollback leaves it where it was.
+    """
+    with transaction.atomic():
+        claimed = ChunkedUpload.objects.filter(pk=upload.pk, status=ChunkedUpload.COMPLETE).update(
+            status=ChunkedUpload.ATTACHED, post=post, updated_at=timezone.now()
+        )
+        if not claimed:
+            raise UploadError('Upload is not complete or is already attached.', 409)
+        path = os.path.join(staging_dir(), uuid.uuid4().hex, get_valid_filename(upload.filename) or upload.kind)
+        source = upload.path
+        ChunkedUpload.objects.filter(pk=upload.pk).update(path=path)
+        # Registered before ingest_staged_file queues the pipeline, so it runs first
+        transaction.on_commit(lambda: _move_to_staging(source, path))
+        upload.status, upload.post, upload.path = ChunkedUpload.ATTACHED, post, path
+        ingest_staged_file(post, upload.kind, path, upload.filename)
+    return upload
+
+
+def discard_upload(upload):
+    if upload.status == ChunkedUpload.ATTACHED:
+        raise UploadError('Upload is already attached to a post.', 409)
+    try:
+        os.remove(upload.path)
+    except FileNotFoundError:
+        pass
+    upload.delete()
+
+
+def purge_expired(older_than=None):
+    """Delete unattached uploads that have not received a chunk within `EXPIRE_AFTER` seconds."""
+    if older_than is None:
+        older_than = timedelta(seconds=upload_settings()['EXPIRE_AFTER'])
+    expired = ChunkedUpload.objects.exclude(status=ChunkedUpload.ATTACHED).filter(
+        updated_at__lt=timezone.now() - older_than
+    )
+    count = 0
+    for upload in expired.iterator():
+        discard_upload(upload)
+        count += 1
+    return count
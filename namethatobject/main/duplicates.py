@@ -0,0 +1,127 @@
+from itertools import combinations
+
+from django.conf import settings
+
+from .models import Post, PostImageHash
+
+DEFAULTS = {
+    'ENABLED': True,
+    # dHashes of the same photo re-encoded, resized or lightly cropped are
+    # usually within a few bits; unrelated photos are ~32 bits apart
+    'MAX_DISTANCE': 6,
+    'LIMIT': 5,
+}
+
+HASH_BITS = 64
+BANDS = 4
+BAND_BITS = HASH_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def duplicate_settings():
+    return {**DEFAULTS, **getattr(settings, 'DUPLICATE_DETECTION', {})}
+
+
+def dhash(path):
+    """
+    64-bit difference hash of the image at `path`: the image is shrunk to
+    9x8 greyscale and each bit records whether a pixel is brighter than its
+    right-hand neighbour, so it survives resizing and recompression.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        # Only 9x8 pixels are needed, so let JPEGs decode at 1/8 scale
+        image.draft('L', (64, 64))
+        pixels = list(ImageOps.exif_transpose(image).convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def to_signed(value):
+    """BigIntegerField is signed; store the unsigned hash in two's complement."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def bands(value):
+    return [(value >> (BAND_BITS * i)) & BAND_MASK for i in range(BANDS)]
+
+
+def hash_fields(value):
+    """PostImageHash column values for the unsigned hash `value`."""
+    return {'dhash': to_signed(value), **{f'band{i}': band for i, band in enumerate(bands(value))}}
+
+
+def distance(a, b):
+    return bin(to_unsigned(a) ^ to_unsigned(b)).count('1')
+
+
+def band_neighbours(band, radius):
+    """Every band value within `radius` bits of `band`."""
+    values = [band]
+    for flips in range(1, radius + 1):
+        for bits in combinations(range(BAND_BITS), flips):
+            flipped = band
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+def index_image(post, path):
+    """Hash `post`'s image and store it in the duplicate index. Returns the hash."""
+    value = dhash(path)
+    PostImageHash.objects.update_or_create(post=post, defaults=hash_fields(value))
+    return value
+
+
+def find_similar(value, exclude=None, max_distance=None, limit=None):
+    """
+    Posts whose image hash is within `max_distance` bits of `value`, closest first.
+
+    Multi-index hashing: the 64-bit hash is stored as four indexed 16-bit
+    bands. If two hashes differ in at most d bits, at least one band differs
+    in at most d // 4 bits (pigeonhole), so looking up each band's values
+    within that radius finds every match with a handful of index probes,
+    however many images are stored. Candidates are then checked exactly.
+    """
+    config = duplicate_settings()
+    max_distance = config['MAX_DISTANCE'] if max_distance is None else max_distance
+    limit = config['LIMIT'] if limit is None else limit
+    value = to_unsigned(value)
+
+    radius = max_distance // BANDS
+    lookups = []
+    for i, band in enumerate(bands(value)):
+        lookup = PostImageHash.objects.filter(**{f'band{i}__in': band_neighbours(band, radius)})
+        if exclude is not None:
+            lookup = lookup.exclude(post_id=exclude)
+        lookups.append(lookup.values_list('post_id', 'dhash'))
+    # One index-only scan per band; UNION ALL rather than OR so the database
+    # doesn't have to deduplicate (a hash matching in two bands is fine)
+    candidates = dict(lookups[0].union(*lookups[1:], all=True))
+
+    matches = sorted(
+        (distance(value, candidate), post_id)
+        for post_id, candidate in candidates.items()
+    )
+    matches = [(d, post_id) for d, post_id in matches if d <= max_distance]
+    posts = Post.objects.filter(is_deleted=False).only('title', 'image_url').in_bulk(
+        [post_id for _, post_id in matches]
+    )
+    return [
+        {
+            'id': post_id,
+            'title': posts[post_id].title,
+            'image_url': posts[post_id].image_url,
+            'distance': d,
+        }
+        for d, post_id in matches if post_id in posts
+    ][:limit]
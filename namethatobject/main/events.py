@@ -0,0 +1,192 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Comment, Post
+from .serializers import ThreadCommentSerializer
+
+DEFAULTS = {
+    'BACKEND': 'memory',
+    # Seconds between keep-alive comments on an idle stream, so proxies
+    # don't close it
+    'KEEPALIVE': 15,
+    # Events a subscriber may fall behind by before it is told to resync
+    'QUEUE_SIZE': 100,
+    # Milliseconds a dropped EventSource waits before reconnecting
+    'RETRY': 3000,
+}
+
+# Event names, as sent in the `event:` field of the stream
+COMMENT_CREATED = 'comment'
+VOTES_CHANGED = 'votes'
+EUREKA_MARKED = 'eureka'
+# The subscriber missed events and should re-fetch the post and thread
+RESYNC = 'resync'
+
+
+def event_settings():
+    return {**DEFAULTS, **getattr(settings, 'POST_EVENTS', {})}
+
+
+class Subscription:
+    """One stream's queue of events for one post, living on the stream's event loop."""
+
+    def __init__(self, post_id, queue_size):
+        self.post_id = post_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def deliver(self, event):
+        # Runs on self.loop. A subscriber that can't keep up gets its backlog
+        # replaced by a single resync instead of holding ever more events.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((RESYNC, {}))
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class MemoryBroker:
+    """
+    Fan-out of post events within one process. Publishers may run on any
+    thread (sync views, the vote buffer's flusher); each subscriber is an
+    asyncio queue, so an idle stream costs a queue and a suspended task
+    rather than a thread. Workers don't see each other's events, so a
+    deployment with several workers needs a broker that crosses processes.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, post_id, queue_size):
+        subscription = Subscription(post_id, queue_size)
+        with self._lock:
+            self._subscriptions[post_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.post_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.post_id]
+
+    def watched(self, post_ids=None):
+        """The posts among `post_ids` (or all posts) that have at least one subscriber."""
+        with self._lock:
+            if post_ids is None:
+                return set(self._subscriptions)
+            return {post_id for post_id in post_ids if post_id in self._subscriptions}
+
+    def publish(self, post_id, name, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(post_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, (name, data))
+            except RuntimeError:
+                # The stream's loop has shut down; its finally block will unsubscribe
+                pass
+
+
+BROKERS = {
+    'memory': MemoryBroker,
+}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = BROKERS[event_settings()['BACKEND']]()
+        return _broker
+
+
+def reset_broker():
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+def format_event(name, data):
+    """One server-sent event in wire format."""
+    return f'event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+async def stream(post_id):
+    """
+    The event stream of one post: a retry hint, then each event as it is
+    published, with keep-alive comments while nothing happens. Ends when the
+    client disconnects and the server cancels it.
+    """
+    config = event_settings()
+    broker = get_broker()
+    subscription = broker.subscribe(post_id, config['QUEUE_SIZE'])
+    try:
+        yield f"retry: {config['RETRY']}\n\n"
+        while True:
+            try:
+                name, data = await asyncio.wait_for(subscription.get(), timeout=config['KEEPALIVE'])
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(name, data)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def _publish_on_commit(post_id, name, data):
+    broker = get_broker()
+    transaction.on_commit(lambda: broker.publish(post_id, name, data))
+
+
+def comment_created(comment):
+    """Push a new comment, shaped like a node of `/posts/{id}/thread/`, to the post's subscribers."""
+    if not get_broker().watched([comment.post_id]):
+        return
+    data = {**ThreadCommentSerializer(comment).data, 'replies': []}
+    _publish_on_commit(comment.post_id, COMMENT_CREATED, data)
+
+
+def votes_applied(model, deltas):
+    """
+    Push the current counters of voted posts or comments. Counters are sent
+    rather than the deltas themselves, so a client can apply events in any
+    order or twice and still end up right.
+    """
+    watched = get_broker().watched()
+    if not watched:
+        return
+    pks = [pk for pk, _, _ in deltas]
+    if model is Post:
+        rows = Post.objects.filter(pk__in=watched.intersection(pks)).values('id', 'upvotes', 'downvotes')
+        targets = [(row['id'], {'post': row['id']}, row) for row in rows]
+    else:
+        rows = Comment.objects.filter(pk__in=pks, post_id__in=watched).values('id', 'post_id', 'upvotes', 'downvotes')
+        targets = [(row['post_id'], {'comment': row['id']}, row) for row in rows]
+    for post_id, target, row in targets:
+        _publish_on_commit(post_id, VOTES_CHANGED, {
+            **target,
+            'upvotes': row['upvotes'],
+            'downvotes': row['downvotes'],
+            'points': row['upvotes'] - row['downvotes'],
+        })
+
+
+def eureka_marked(post):
+    if get_broker().watched([post.pk]):
+        _publish_on_commit(post.pk, EUREKA_MARKED, {'post': post.pk, 'eureka_comment': post.eureka_comment})
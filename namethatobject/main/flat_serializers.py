@@ -0,0 +1,197 @@
+"""
+Flat read path for posts and comments.
+
+PostSerializer and CommentSerializer render each row through DRF's field
+machinery: a get_attribute/to_representation pair per field, plus nested
+UserSerializer and UserProfileSerializer instances for the author. On the
+list and thread endpoints that dominates the response time once the
+queries themselves are cheap.
+
+The serializers here build the same dicts, key for key and value for value,
+straight from named `values_list()` rows: one query joins in the author
+and profile columns, and each field is a tuple attribute read plus, where
+DRF converts the value, the converter DRF would use. The field tables are
+compiled once per fieldset (see main/fieldsets.py) into the columns to
+select and a list of accessors, so a sparse fieldset selects and joins
+only what it returns. Rows keep attribute access, so CommentThread and the
+cursor paginators take them in place of model instances.
+
+Any change to the serializers must be mirrored here; test_flat_serializers
+compares the two outputs.
+"""
+from operator import attrgetter
+
+from rest_framework import serializers
+
+from .fieldsets import ALL, ID, select
+from .images import srcset
+from .models import Comment, Post, UserProfile
+
+
+class Column:
+    """A field rendered from `columns` of the row, through `convert` where DRF converts the value."""
+
+    def __init__(self, *columns, convert=None):
+        self.columns = columns
+        self.convert = convert
+
+
+class Nested:
+    """A nested serializer: `fields` of the related row at `relation`, or None when there is none."""
+
+    def __init__(self, relation, fields):
+        self.relation = relation
+        self.fields = fields
+
+
+def _media(model, name):
+    # DRF renders CloudinaryFields through ModelField, i.e. the model field's
+    # get_prep_value, with None passed through
+    prepare = model._meta.get_field(name).get_prep_value
+    return lambda value: None if value is None else prepare(value)
+
+
+_datetime = serializers.DateTimeField().to_representation
+
+PROFILE_FIELDS = {
+    'bio': Column('bio'),
+    'profession': Column('profession'),
+    'profile_picture': Column('profile_picture', convert=_media(UserProfile, 'profile_picture')),
+    'profile_picture_url': Column('profile_picture_url'),
+}
+
+USER_FIELDS = {
+    'id': Column('id'),
+    'username': Column('username'),
+    'profile': Nested('profile', PROFILE_FIELDS),
+    'profile_picture': Column('profile__profile_picture_url', convert=lambda url: url or None),
+}
+
+POST_FIELDS = {
+    'id': Column('id'),
+    'title': Column('title'),
+    'description': Column('description'),
+    'image': Column('image', convert=_media(Post, 'image')),
+    'image_url': Column('image_url'),
+    'image_srcset': Column('image_variants', convert=srcset),
+    'image_placeholder': Column('image_placeholder'),
+    'video': Column('video', convert=_media(Post, 'video')),
+    'video_url': Column('video_url'),
+    'audio': Column('audio', convert=_media(Post, 'audio')),
+    'audio_url': Column('audio_url'),
+    'media_status': Column('media_status'),
+    'created_at': Column('created_at', convert=_datetime),
+    'tags': Column('tags'),
+    'author': Nested('author', USER_FIELDS),
+    'upvotes': Column('upvotes'),
+    'downvotes': Column('downvotes'),
+    'eureka_comment': Column('eureka_comment'),
+    'is_anonymous': Column('is_anonymous'),
+    'parts_relation': Column('parts_relation'),
+}
+
+COMMENT_FIELDS = {
+    'id': Column('id'),
+    'post': Column('post_id'),
+    'text': Column('text'),
+    'created_at': Column('created_at', convert=_datetime),
+    'author': Nested('author', USER_FIELDS),
+    'parent': Column('parent_id'),
+    # Filled in by FlatCommentSerializer.serialize with one query for the page
+    'replies': Column('id', convert=lambda pk: []),
+    'points': Column('upvotes', 'downvotes', convert=lambda upvotes, downvotes: upvotes - downvotes),
+    'upvotes': Column('upvotes'),
+    'downvotes': Column('downvotes'),
+    'tag': Column('tag'),
+}
+
+THREAD_COMMENT_FIELDS = {name: field for name, field in COMMENT_FIELDS.items() if name != 'replies'}
+
+
+def _accessor(field, prefix):
+    getters = [attrgetter(prefix + column) for column in field.columns]
+    if field.convert is None:
+        return getters[0]
+    if len(getters) == 1:
+        get, convert = getters[0], field.convert
+        return lambda row: convert(get(row))
+    return lambda row: field.convert(*(get(row) for get in getters))
+
+
+def _compile(fields, fieldset, prefix='', path=''):
+    """(columns, render) for `fields` narrowed to `fieldset`, where render(row) builds the dict."""
+    columns = []
+    accessors = []
+    for name, field, choice in select(fieldset, fields, lambda field: isinstance(field, Nested), path):
+        if isinstance(field, Column):
+            columns.extend(prefix + column for column in field.columns)
+            accessors.append((name, _accessor(field, prefix)))
+            continue
+        related = f'{prefix}{field.relation}__'
+        key = related + 'id'
+        columns.append(key)
+        if choice == ID:
+            accessors.append((name, attrgetter(key)))
+            continue
+        nested_columns, render = _compile(field.fields, None if choice == ALL else choice, related, f'{path}{name}.')
+        columns.extend(nested_columns)
+        get_key = attrgetter(key)
+        accessors.append((name, lambda row, get_key=get_key, render=render: None if get_key(row) is None else render(row)))
+
+    def render(row):
+        return {name: get(row) for name, get in accessors}
+
+    return columns, render
+
+
+class FlatSerializer:
+    """
+    Compiled read serializer over rows of `rows(queryset)`. `fields` is the
+    field table; `keep` are columns selected whatever the fieldset, for the
+    code around the serializer (sort keys of the paginators, the thread's
+    tree links).
+    """
+    fields = {}
+    keep = ()
+
+    def __init__(self, fieldset=None):
+        columns, self.render = _compile(self.fields, fieldset)
+        self.columns = tuple(dict.fromkeys(self.keep + tuple(columns)))
+
+    def rows(self, queryset):
+        # Joins and prefetches planned for the DRF serializers don't apply to rows
+        return queryset.prefetch_related(None).values_list(*self.columns, named=True)
+
+    def serialize(self, rows):
+        render = self.render
+        return [render(row) for row in rows]
+
+
+class FlatPostSerializer(FlatSerializer):
+    """PostSerializer's output."""
+    fields = POST_FIELDS
+    keep = ('id', 'is_deleted', 'created_at', 'hot_score', 'top_score')
+
+    def serialize(self, rows):
+        render = self.render
+        return [None if row.is_deleted else render(row) for row in rows]
+
+
+class FlatThreadCommentSerializer(FlatSerializer):
+    """ThreadCommentSerializer's output."""
+    fields = THREAD_COMMENT_FIELDS
+    keep = ('id', 'parent_id', 'created_at')
+
+
+class FlatCommentSerializer(FlatThreadCommentSerializer):
+    """CommentSerializer's output."""
+    fields = COMMENT_FIELDS
+
+    def serialize(self, rows):
+        results = super().serialize(rows)
+        if results and 'replies' in results[0]:
+            replies = {row.id: data['replies'] for row, data in zip(rows, results)}
+            children = Comment.objects.filter(parent_id__in=replies).order_by('parent_id', 'id')
+            for parent_id, pk in children.values_list('parent_id', 'id'):
+                replies[parent_id].append(pk)
+        return results
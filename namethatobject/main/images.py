@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+import requests
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WIDTHS': (160, 320, 640, 1280),
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 75,
+    'PLACEHOLDER_WIDTH': 16,
+}
+
+# Derivatives are uploaded next to the originals, in the same backend
+FOLDER = 'mystery_images/derivatives'
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+
+def derivative_settings():
+    return {**DEFAULTS, **getattr(settings, 'IMAGE_DERIVATIVES', {})}
+
+
+def _open(path, largest_width):
+    from PIL import Image, ImageOps
+
+    image = Image.open(path)
+    # JPEG decoders can scale by 1/2, 1/4 or 1/8 while decoding, which is far
+    # cheaper than decoding a 12MP photo only to throw most of it away. Both
+    # sides are kept >= largest_width since EXIF rotation may swap them.
+    image.draft('RGB', (largest_width, largest_width))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def target_widths(original_width, widths):
+    """The configured widths below the original's; never upscale, but always produce one."""
+    return sorted(width for width in widths if width < original_width) or [original_width]
+
+
+def _resize(image, width):
+    from PIL import Image
+
+    if width >= image.width:
+        return image
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+
+def _encode(image, format, quality):
+    buffer = io.BytesIO()
+    if format == 'webp':
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    else:
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def placeholder(image, width):
+    """A few-hundred-byte JPEG data URI the client shows (blurred) until a derivative loads."""
+    small = _resize(image, width)
+    return 'data:image/jpeg;base64,' + base64.b64encode(_encode(small, 'jpeg', 40)).decode()
+
+
+def fetch_image(url, directory):
+    """Local path of a post image: read from MEDIA_ROOT when it is stored there, else downloaded."""
+    if url.startswith(settings.MEDIA_URL) and not url.startswith('http'):
+        local = os.path.join(settings.MEDIA_ROOT, url[len(settings.MEDIA_URL):])
+        if os.path.exists(local):
+            return local
+    path = os.path.join(directory, 'original')
+    with requests.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        with open(path, 'wb') as original:
+            shutil.copyfileobj(response.raw, original)
+    return path
+
+
+def render_derivatives(path, directory):
+    """
+    Write resized copies of the image at `path` into `directory`.
+
+    Returns `(files, placeholder)` where `files` is a list of
+    `(format, width, file path)`. File names start with a digest of the
+    source, so re-rendering the same image produces the same names.
+    """
+    config = derivative_settings()
+    with open(path, 'rb') as source:
+        digest = hashlib.sha1(source.read()).hexdigest()[:16]
+
+    image = _open(path, max(config['WIDTHS']))
+    files = []
+    # Largest first, each step resized from the previous one so the
+    # expensive pass over the full-size image happens only once
+    current = image
+    for width in reversed(target_widths(image.width, config['WIDTHS'])):
+        current = _resize(current, width)
+        for format in config['FORMATS']:
+            name = f'{digest}-{width}.{EXTENSIONS[format]}'
+            with open(os.path.join(directory, name), 'wb') as output:
+                output.write(_encode(current, format, config['QUALITY']))
+            files.append((format, width, os.path.join(directory, name)))
+    return files, placeholder(current, config['PLACEHOLDER_WIDTH'])
+
+
+def generate_derivatives(path, backend):
+    """
+    Render the derivatives of a local image and push them to `backend`.
+
+    Returns the Post fields to update: `image_variants` (`{format: {width: url}}`)
+    and `image_placeholder`.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        files, lqip = render_derivatives(path, directory)
+        variants = {}
+        for format, width, file_path in files:
+            _, url = backend.upload(file_path, 'image', folder=FOLDER)
+            variants.setdefault(format, {})[str(width)] = url
+    variants = {
+        format: dict(sorted(urls.items(), key=lambda item: int(item[0])))
+        for format, urls in variants.items()
+    }
+    return {'image_variants': variants, 'image_placeholder': lqip}
+
+
+def srcset(variants):
+    """`{format: {width: url}}` -> `{format: "url 160w, url 320w"}` for <source srcset>."""
+    return {
+        format: ', '.join(f'{url} {width}w' for width, url in urls.items())
+        for format, urls in (variants or {}).items()
+    }
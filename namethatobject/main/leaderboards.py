@@ -0,0 +1,369 @@
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Comment, LeaderboardScore, Post, PostTag, UserReputation
+from .reputation import COMMENT_POINTS, POST_POINTS
+from .tags import normalize, tag_values
+
+DEFAULTS = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+    # Weekly boards older than this are dropped by `rebuild_leaderboards --prune`
+    'KEEP_WEEKS': 12,
+}
+
+# How much each event adds to a mystery's weekly activity score
+VOTE_ACTIVITY = 1
+COMMENT_ACTIVITY = 2
+
+# Which boards are kept, per (subject, metric): all-time, weekly, and
+# whether each also has per-tag variants. The all-time user ranking is
+# read straight from UserReputation.points.
+BOARDS = {
+    ('users', 'points'): {'all': True, 'week': False},
+    ('posts', 'points'): {'all': True},
+    ('posts', 'activity'): {'week': True},
+    ('posts', 'hot'): {'week': True},
+}
+
+WEEK_PATTERN = re.compile(r'^\d{4}-W\d{2}$')
+
+
+class LeaderboardError(ValueError):
+    pass
+
+
+def leaderboard_settings():
+    return {**DEFAULTS, **getattr(settings, 'LEADERBOARDS', {})}
+
+
+def week_key(day=None):
+    """ISO week of `day` (default today), e.g. `2024-W07`."""
+    year, week, _ = (day or timezone.localdate()).isocalendar()
+    return f'{year}-W{week:02d}'
+
+
+def board_key(subject, metric, week=None, tag=None):
+    parts = [subject, metric]
+    if week:
+        parts += ['week', week]
+    if tag:
+        parts += ['tag', tag]
+    return ':'.join(parts)
+
+
+def tag_names(tags):
+    """Leaderboard tags of a Post.tags value: the normalized tag names."""
+    return sorted({values['name'] for values in tag_values(tags) if values['name']})
+
+
+def resolve_board(subject, metric, period='all', tag=None):
+    """
+    The board key for a leaderboard request, or None for the all-time user
+    ranking. Raises LeaderboardError for combinations that aren't kept.
+    """
+    periods = BOARDS.get((subject, metric))
+    if periods is None:
+        raise LeaderboardError(f'Unknown leaderboard: {metric}.')
+    if period == 'all':
+        week = None
+    elif period == 'week' or WEEK_PATTERN.match(period or ''):
+        week = week_key() if period == 'week' else period
+    else:
+        raise LeaderboardError('period must be "all", "week" or an ISO week such as 2024-W07.')
+    kind = 'week' if week else 'all'
+    if kind not in periods:
+        available = ' or '.join(f'"{name}"' for name in periods)
+        raise LeaderboardError(f'The {metric} leaderboard is only kept for period {available}.')
+    tag = normalize('name', tag) or None
+    if tag and not periods[kind]:
+        raise LeaderboardError('This leaderboard has no per-tag rankings.')
+    if subject == 'users' and not week and not tag:
+        return None
+    return board_key(subject, metric, week, tag)
+
+
+# Writes. Each event adds its deltas with one upsert that creates missing
+# entries and adds to existing ones in place, so concurrent events add up.
+# It runs once the event's transaction commits, keeping the board rows out
+# of that transaction's locks.
+
+# Entries per INSERT, which keeps the statement under SQLite's parameter limit
+UPSERT_BATCH_SIZE = 300
+
+
+def _upsert_scores(rows):
+    table = connection.ops.quote_name(LeaderboardScore._meta.db_table)
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (board, subject_id, score) VALUES '
+                + ', '.join(['(%s, %s, %s)'] * len(batch))
+                + f' ON CONFLICT (board, subject_id) DO UPDATE SET score = {table}.score + EXCLUDED.score',
+                [value for row in batch for value in row],
+            )
+
+
+def add_scores(deltas):
+    """Add `{(board, subject_id): delta}` to the boards once the current transaction commits."""
+    # Sorted so concurrent upserts take their row locks in the same order
+    rows = sorted((board, subject_id, delta) for (board, subject_id), delta in deltas.items() if delta)
+    if rows:
+        transaction.on_commit(lambda: _upsert_scores(rows))
+
+
+def points_boards(tags):
+    return [board_key('posts', 'points')] + [board_key('posts', 'points', tag=tag) for tag in tags]
+
+
+def activity_boards(week, tags, solved):
+    metrics = ['activity'] if solved else ['activity', 'hot']
+    return [
+        board_key('posts', metric, week, tag)
+        for metric in metrics
+        for tag in [None, *tags]
+    ]
+
+
+def activity_deltas(posts, week=None, deltas=None):
+    """
+    Board deltas for the weekly activity of posts, given `[(state, amount)]`
+    where state has `pk`, `tags`, `is_deleted` and `eureka_comment`, added
+    to `deltas` if given. Only unsolved posts enter the hot boards.
+    """
+    week = week or week_key()
+    deltas = defaultdict(int) if deltas is None else deltas
+    for state, amount in posts:
+        if state['is_deleted']:
+            continue
+        for board in activity_boards(week, tag_names(state['tags']), bool(state['eureka_comment'])):
+            deltas[board, state['pk']] += amount
+    return deltas
+
+
+def record_activity(posts, week=None):
+    """Add to the weekly activity of posts (see activity_deltas)."""
+    add_scores(activity_deltas(posts, week))
+
+
+POST_STATE = ('pk', 'tags', 'is_deleted', 'eureka_comment')
+
+
+def votes_applied(model, deltas):
+    """Fold vote counter deltas `[(pk, upvotes, downvotes)]` (see main.votes) into the mystery boards."""
+    by_pk = {pk: (upvotes, downvotes) for pk, upvotes, downvotes in deltas if upvotes or downvotes}
+    if not by_pk:
+        return
+    if model is Post:
+        deltas = defaultdict(int)
+        activity = []
+        for state in Post.objects.filter(pk__in=by_pk).values(*POST_STATE):
+            upvotes, downvotes = by_pk[state['pk']]
+            if not state['is_deleted']:
+                for board in points_boards(tag_names(state['tags'])):
+                    deltas[board, state['pk']] += upvotes - downvotes
+            activity.append((state, VOTE_ACTIVITY * (abs(upvotes) + abs(downvotes))))
+        add_scores(activity_deltas(activity, deltas=deltas))
+    elif model is Comment:
+        comments = Comment.objects.filter(pk__in=by_pk).values(
+            'pk', 'post_id', 'post__tags', 'post__is_deleted', 'post__eureka_comment'
+        )
+        record_activity(
+            (
+                {
+                    'pk': comment['post_id'],
+                    'tags': comment['post__tags'],
+                    'is_deleted': comment['post__is_deleted'],
+                    'eureka_comment': comment['post__eureka_comment'],
+                },
+                VOTE_ACTIVITY * sum(abs(count) for count in by_pk[comment['pk']]),
+            )
+            for comment in comments
+        )
+
+
+def comment_created(comment):
+    state = Post.objects.filter(pk=comment.post_id).values(*POST_STATE).first()
+    if state is not None:
+        record_activity([(state, COMMENT_ACTIVITY)])
+
+
+def post_saved(post, created=False):
+    """
+    Keep a post's entries in step with the post itself: it enters the points
+    boards when created, leaves every board when deleted, leaves the hot
+    boards once solved, and moves between tag boards when its tags change.
+    """
+    if post.is_deleted:
+        remove_post(post.pk)
+        return
+    tags = tag_names(post.tags)
+    if created:
+        LeaderboardScore.objects.bulk_create(
+            [LeaderboardScore(board=board, subject_id=post.pk, score=post.points) for board in points_boards(tags)],
+            ignore_conflicts=True,
+        )
+        return
+
+    entries = LeaderboardScore.objects.filter(subject_id=post.pk)
+    entries.filter(board__startswith=board_key('posts', 'points')).delete()
+    LeaderboardScore.objects.bulk_create(
+        [LeaderboardScore(board=board, subject_id=post.pk, score=post.points) for board in points_boards(tags)],
+        ignore_conflicts=True,
+    )
+    # This week's activity follows the post to its new tags; earlier weeks stay as they were
+    week = week_key()
+    activity = entries.filter(board=board_key('posts', 'activity', week)).values_list('score', flat=True).first()
+    for metric in ('activity', 'hot'):
+        entries.filter(board__startswith=board_key('posts', metric, week) + ':tag:').delete()
+    if activity:
+        LeaderboardScore.objects.bulk_create(
+            [
+                LeaderboardScore(board=board, subject_id=post.pk, score=activity)
+                for board in activity_boards(week, tags, bool(post.eureka_comment))
+                if ':tag:' in board
+            ],
+            ignore_conflicts=True,
+        )
+    if post.eureka_comment:
+        entries.filter(board__startswith='posts:hot:').delete()
+
+
+def remove_post(post_id):
+    LeaderboardScore.objects.filter(subject_id=post_id, board__startswith='posts:').delete()
+
+
+def remove_user(user_id):
+    LeaderboardScore.objects.filter(subject_id=user_id, board__startswith='users:').delete()
+
+
+def credit_points(points, week=None):
+    """
+    Credit reputation point changes `[(user_id, post_id, delta)]` (see
+    main.reputation) to the weekly user board and to the user boards of the
+    tags of the post the points were earned on.
+    """
+    week = week or week_key()
+    post_tags = {
+        post['pk']: tag_names(post['tags'])
+        for post in Post.objects.filter(pk__in={post_id for _, post_id, _ in points}).values('pk', 'tags')
+    }
+    deltas = defaultdict(int)
+    for user_id, post_id, delta in points:
+        deltas[board_key('users', 'points', week), user_id] += delta
+        for tag in post_tags.get(post_id, ()):
+            deltas[board_key('users', 'points', tag=tag), user_id] += delta
+    add_scores(deltas)
+
+
+# Reads. Each page is a range scan over an index in score order, so its
+# cost depends on offset + limit, not on how many users or posts there are.
+
+def top(board, offset=0, limit=20, min_score=None):
+    """`[(subject_id, score)]` of one page of a board; `board` None is the all-time user ranking."""
+    if board is None:
+        entries = UserReputation.objects.filter(points__gt=0).order_by('-points', 'user_id')
+        return list(entries.values_list('user_id', 'points')[offset:offset + limit])
+    entries = LeaderboardScore.objects.filter(board=board)
+    if min_score is not None:
+        entries = entries.filter(score__gte=min_score)
+    return list(entries.order_by('-score', 'subject_id').values_list('subject_id', 'score')[offset:offset + limit])
+
+
+def user_page(board, offset, limit):
+    """Ranked users of one page; reads limit + 1 entries so the caller can tell if there is a next page."""
+    entries = top(board, offset, limit + 1, min_score=1)
+    usernames = dict(User.objects.filter(pk__in=[user_id for user_id, _ in entries]).values_list('pk', 'username'))
+    return [
+        {'rank': offset + i + 1, 'username': usernames[user_id], 'score': score}
+        for i, (user_id, score) in enumerate(entries)
+        if user_id in usernames
+    ]
+
+
+def post_page(board, offset, limit):
+    """Ranked mysteries of one page; reads limit + 1 entries like user_page."""
+    entries = top(board, offset, limit + 1)
+    posts = Post.objects.filter(is_deleted=False).only('title', 'image_url').in_bulk([pk for pk, _ in entries])
+    return [
+        {
+            'rank': offset + i + 1,
+            'score': score,
+            'post': {'id': pk, 'title': posts[pk].title, 'image_url': posts[pk].image_url},
+        }
+        for i, (pk, score) in enumerate(entries)
+        if pk in posts
+    ]
+
+
+# Rebuilding the all-time boards from the posts and comments themselves.
+# Weekly boards only exist as they were recorded: votes keep no history of
+# when they changed, so those can't be recomputed.
+
+def _replace_boards(prefix, rows, batch_size):
+    with transaction.atomic():
+        LeaderboardScore.objects.filter(board__startswith=prefix).delete()
+        batch = []
+        written = 0
+        for board, subject_id, score in rows:
+            batch.append(LeaderboardScore(board=board, subject_id=subject_id, score=score))
+            if len(batch) >= batch_size:
+                written += len(LeaderboardScore.objects.bulk_create(batch, ignore_conflicts=True))
+                batch = []
+        written += len(LeaderboardScore.objects.bulk_create(batch, ignore_conflicts=True))
+    return written
+
+
+def rebuild(batch_size=1000):
+    """Recompute the all-time boards. Returns the number of entries written."""
+    live = Post.objects.filter(is_deleted=False).order_by('pk')
+    post_points = (
+        (board, post['pk'], post['upvotes'] - post['downvotes'])
+        for post in live.values('pk', 'tags', 'upvotes', 'downvotes').iterator(chunk_size=batch_size)
+        for board in points_boards(tag_names(post['tags']))
+    )
+    written = _replace_boards(board_key('posts', 'points'), post_points, batch_size)
+
+    # Same scoring as main.reputation.points_for, split by the tags of the post
+    user_points = defaultdict(int)
+    posts = (
+        PostTag.objects.filter(post__is_deleted=False, post__is_anonymous=False)
+        .values('name', 'post__author_id')
+        .annotate(score=Sum(F('post__upvotes') + POST_POINTS))
+    )
+    for row in posts:
+        user_points[row['name'], row['post__author_id']] += row['score']
+    comments = (
+        Comment.objects.filter(is_anonymous=False).values('post__tag_index__name', 'author_id')
+        .annotate(score=Sum(F('upvotes') + COMMENT_POINTS))
+    )
+    for row in comments:
+        user_points[row['post__tag_index__name'], row['author_id']] += row['score']
+    user_rows = (
+        (board_key('users', 'points', tag=name), user_id, score)
+        for (name, user_id), score in user_points.items() if name
+    )
+    written += _replace_boards(board_key('users', 'points') + ':tag:', user_rows, batch_size)
+    return written
+
+
+def prune(keep_weeks=None, today=None):
+    """Drop weekly boards older than `keep_weeks`. Returns the number of entries deleted."""
+    keep_weeks = leaderboard_settings()['KEEP_WEEKS'] if keep_weeks is None else keep_weeks
+    today = today or timezone.localdate()
+    oldest = week_key(today - timedelta(weeks=keep_weeks - 1))
+    deleted = 0
+    boards = LeaderboardScore.objects.filter(board__contains=':week:').values_list('board', flat=True).distinct()
+    for board in list(boards):
+        week = board.split(':week:')[1].split(':')[0]
+        if week < oldest:
+            deleted += LeaderboardScore.objects.filter(board=board).delete()[0]
+    return deleted
@@ -0,0 +1,62 @@
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from main.duplicates import dhash, hash_fields
+from main.images import fetch_image
+from main.models import Post, PostImageHash
+
+
+def hash_post_image(post_id, url):
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            value = dhash(fetch_image(url, directory))
+        except Exception as e:
+            return post_id, None, str(e)
+    return post_id, value, None
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for existing post images so they show up in duplicate lookups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rehash images that already have a hash.')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Images fetched and hashed in parallel (fetching is network-bound).')
+        parser.add_argument('--batch-size', type=int, default=500, help='Posts hashed and written per batch.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image_url__isnull=True).exclude(image_url='')
+        if not options['all']:
+            posts = posts.filter(image_hash__isnull=True)
+        posts = posts.order_by('pk').values_list('pk', 'image_url')
+
+        started = time.perf_counter()
+        rows = posts.iterator(chunk_size=options['batch_size'])
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                chunk = list(islice(rows, options['batch_size']))
+                if not chunk:
+                    break
+                batch = []
+                for post_id, value, error in executor.map(lambda row: hash_post_image(*row), chunk):
+                    if error is not None:
+                        self.stderr.write(f"Post {post_id}: {error}")
+                        failed += 1
+                        continue
+                    batch.append(PostImageHash(post_id=post_id, **hash_fields(value)))
+                done += self.write(batch)
+        self.stdout.write(
+            f"Hashed {done} images, failed {failed} in {time.perf_counter() - started:.1f}s"
+        )
+
+    def write(self, batch):
+        PostImageHash.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=['post'],
+            update_fields=['dhash', 'band0', 'band1', 'band2', 'band3'],
+        )
+        return len(batch)
@@ -0,0 +1,165 @@
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from main.models import Comment, Post
+from main.seeding import percentile, tag_vocabulary
+
+SCENARIOS = ('list', 'detail', 'search', 'vote', 'create')
+WRITES = ('vote', 'create')
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries one thread's connection runs."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def build_request(scenario, rng, posts, tags):
+    """(method, url, data) for one request of `scenario`."""
+    if scenario == 'list':
+        return 'get', f"{reverse('post-list')}?ordering={rng.choice(['new', 'hot', 'top', 'unsolved'])}", None
+    if scenario == 'detail':
+        return 'get', reverse('post-detail', args=[rng.choice(posts)]), None
+    if scenario == 'search':
+        return 'get', f"{reverse('post-search')}?q={rng.choice(tags)['name']}", None
+    if scenario == 'vote':
+        action = rng.choice(['post-upvote', 'post-downvote'])
+        return 'post', reverse(action, args=[rng.choice(posts)]), None
+    return 'post', reverse('post-list'), {
+        'title': f'Benchmark mystery {rng.getrandbits(32)}',
+        'description': 'Created by bench_api',
+        'tags': rng.sample(tags, 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the post endpoints (list, detail, search, vote, create) from concurrent '
+        'clients and report throughput, latency percentiles and queries per request. '
+        'Run seed_benchmark first; votes are kept, created posts are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help='Comma-separated scenarios to run.')
+        parser.add_argument('--concurrency', default='1,4,16',
+                            help='Comma-separated numbers of concurrent clients.')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per client.')
+        parser.add_argument('--posts', type=int, default=1_000,
+                            help='Pick detail and vote targets among this many hottest posts.')
+        parser.add_argument('--no-cache', action='store_true', help='Disable the response cache.')
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        scenarios = [scenario for scenario in options['scenarios'].split(',') if scenario]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        levels = [int(level) for level in options['concurrency'].split(',')]
+
+        posts = list(
+            Post.objects.filter(is_deleted=False).order_by('-hot_score', '-id')
+            .values_list('pk', flat=True)[:options['posts']]
+        )
+        users = list(User.objects.filter(is_active=True).order_by('-pk')[:max(levels)])
+        if not posts or len(users) < max(levels):
+            raise CommandError('Not enough posts or users to benchmark; run seed_benchmark first.')
+
+        overrides = {'ALLOWED_HOSTS': ['*'], 'SECURE_SSL_REDIRECT': False}
+        if options['no_cache']:
+            overrides['RESPONSE_CACHE'] = {**getattr(settings, 'RESPONSE_CACHE', {}), 'ENABLED': False}
+
+        results, created = [], []
+        try:
+            with override_settings(**overrides):
+                for scenario in scenarios:
+                    for level in levels:
+                        results.append(self.run(
+                            scenario, users[:level], options['requests'], posts, options['seed'], created
+                        ))
+        finally:
+            Post.objects.filter(pk__in=created).delete()
+
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'cache': not options['no_cache'],
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'results': results,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for result in results:
+            self.stdout.write(
+                f"{result['scenario']:>6}  clients={result['concurrency']:<3}  "
+                f"{result['throughput']:>8.1f} req/s  p50={result['p50_ms']:>7.1f}ms  "
+                f"p95={result['p95_ms']:>7.1f}ms  p99={result['p99_ms']:>7.1f}ms  "
+                f"queries={result['queries_mean']:.1f} (max {result['queries_max']})  errors={result['errors']}"
+            )
+
+    def run(self, scenario, users, requests, posts, seed, created):
+        tags = tag_vocabulary()
+
+        def client_loop(index):
+            client = APIClient(raise_request_exception=False)
+            if scenario in WRITES:
+                client.force_authenticate(user=users[index])
+            rng = random.Random(seed + index)
+            samples = []
+            try:
+                for _ in range(requests):
+                    method, url, data = build_request(scenario, rng, posts, tags)
+                    counter = QueryCounter()
+                    with connection.execute_wrapper(counter):
+                        started = time.perf_counter()
+                        response = getattr(client, method)(url, data, format='json')
+                        elapsed = time.perf_counter() - started
+                    samples.append((elapsed, counter.count, response.status_code))
+                    if scenario == 'create' and response.status_code == 201:
+                        created.append(response.data['id'])
+            finally:
+                connection.close()
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            samples = [sample for chunk in executor.map(client_loop, range(len(users))) for sample in chunk]
+        seconds = time.perf_counter() - started
+
+        timings = [elapsed for elapsed, _, _ in samples]
+        queries = [count for _, count, _ in samples]
+        return {
+            'scenario': scenario,
+            'concurrency': len(users),
+            'requests': len(samples),
+            'errors': sum(1 for _, _, code in samples if code >= 400),
+            'seconds': round(seconds, 3),
+            'throughput': round(len(samples) / seconds, 1),
+            'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+            'queries_mean': round(sum(queries) / len(queries), 2),
+            'queries_max': max(queries),
+        }
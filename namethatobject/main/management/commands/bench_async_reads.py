@@ -0,0 +1,267 @@
+import asyncio
+import io
+import json
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from django.urls import reverse
+
+from main.models import Post
+
+# Endpoint -> (sync route, async route)
+ROUTES = {
+    'list': ('post-list', 'async_post_list'),
+    'detail': ('post-detail', 'async_post_detail'),
+    'thread': ('post-thread', 'async_post_thread'),
+    'search': ('post-search', 'async_post_search'),
+}
+SEARCH_TERMS = ['spoon', 'metal', 'key', 'brass', 'tool']
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def pick_url(endpoint, route, rng, posts):
+    if endpoint == 'list':
+        return f"{reverse(route)}?ordering={rng.choice(['new', 'hot', 'top'])}"
+    if endpoint == 'search':
+        return f'{reverse(route)}?q={rng.choice(SEARCH_TERMS)}'
+    return reverse(route, args=[rng.choice(posts)])
+
+
+def wsgi_get(application, url):
+    """GET `url` from a WSGI application the way a WSGI server would; returns the status code."""
+    path, _, query = url.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'testserver', 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_get(application, url):
+    """GET `url` from an ASGI application the way an ASGI server would; returns the status code."""
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+    }
+    request = {'type': 'http.request', 'body': b'', 'more_body': False}
+    disconnected = asyncio.Event()
+    statuses = []
+
+    async def receive():
+        nonlocal request
+        if request is not None:
+            message, request = request, None
+            return message
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return statuses[0]
+
+
+class SlowQueries:
+    """
+    Make every query on every connection wait `latency` seconds first, as
+    if the database were across a slow network. New connections pick the
+    wrapper up as they open, which covers worker threads started later.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.latency)
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        if self.latency:
+            connection.close()
+            connection_created.connect(self.install)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self.install)
+
+
+class ThreadSampler:
+    """Peak number of threads alive while the block runs, above those alive at the start."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def _sample(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, threading.active_count() - self.baseline)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        # Counted without this sampler's own thread
+        self.baseline = threading.active_count() + 1
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._done.set()
+        self._thread.join()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the async read endpoints on the ASGI handler with the DRF views on the '
+        'WSGI handler, in-process. WSGI gets a fixed pool of --threads worker threads, '
+        'the way a threaded worker is sized for memory; ASGI serves every client from '
+        'one event loop and reports how many threads it actually used. --query-latency '
+        'simulates a slow database. Run seed_benchmark first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', default=','.join(ROUTES), help='Comma-separated endpoints to run.')
+        parser.add_argument('--clients', default='4,16,64', help='Comma-separated numbers of concurrent clients.')
+        parser.add_argument('--threads', type=int, default=4, help='Worker threads of the WSGI path.')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client.')
+        parser.add_argument('--query-latency', type=float, default=5, help='Milliseconds added to every query.')
+        parser.add_argument('--cache', action='store_true', help='Keep the response cache on.')
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        endpoints = [endpoint for endpoint in options['endpoints'].split(',') if endpoint]
+        unknown = set(endpoints) - set(ROUTES)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        levels = [int(level) for level in options['clients'].split(',')]
+        posts = list(
+            Post.objects.filter(is_deleted=False, comment_count__gt=0).order_by('-hot_score', '-id')
+            .values_list('pk', flat=True)[:500]
+        )
+        if not posts:
+            raise CommandError('There are no posts with comments to read; run seed_benchmark first.')
+
+        overrides = {'ALLOWED_HOSTS': ['*'], 'SECURE_SSL_REDIRECT': False}
+        if not options['cache']:
+            overrides['RESPONSE_CACHE'] = {**getattr(settings, 'RESPONSE_CACHE', {}), 'ENABLED': False}
+
+        results = []
+        with override_settings(**overrides), SlowQueries(options['query_latency'] / 1000):
+            for endpoint in endpoints:
+                for clients in levels:
+                    for mode in ('wsgi', 'asgi'):
+                        results.append(self.run(mode, endpoint, clients, posts, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'vendor': connection.vendor,
+                'query_latency_ms': options['query_latency'],
+                'wsgi_threads': options['threads'],
+                'cache': options['cache'],
+                'results': results,
+            }, indent=2))
+            return
+        for result in results:
+            self.stdout.write(
+                f"{result['endpoint']:>6}  {result['mode']}  clients={result['clients']:<4} "
+                f"threads={result['threads']:<4} {result['throughput']:>8.1f} req/s  "
+                f"p50={result['p50_ms']:>8.1f}ms  p95={result['p95_ms']:>8.1f}ms  errors={result['errors']}"
+            )
+
+    def run(self, mode, endpoint, clients, posts, options):
+        route = ROUTES[endpoint][mode == 'asgi']
+        run = self.run_asgi if mode == 'asgi' else self.run_wsgi
+        started = time.perf_counter()
+        with ThreadSampler() as sampler:
+            samples = run(endpoint, route, clients, posts, options)
+        seconds = time.perf_counter() - started
+
+        timings = [elapsed for elapsed, _ in samples]
+        return {
+            'endpoint': endpoint,
+            'mode': mode,
+            'clients': clients,
+            'threads': options['threads'] if mode == 'wsgi' else sampler.peak,
+            'requests': len(samples),
+            'errors': sum(1 for _, code in samples if code >= 400),
+            'throughput': round(len(samples) / seconds, 1),
+            'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+        }
+
+    def run_wsgi(self, endpoint, route, clients, posts, options):
+        # Each client waits for one of the worker threads, as requests queue
+        # for a threaded WSGI worker; latency includes that wait
+        application = get_wsgi_application()
+        workers = threading.Semaphore(options['threads'])
+        samples = []
+
+        def client_loop(index):
+            rng = random.Random(options['seed'] + index)
+            try:
+                for _ in range(options['requests']):
+                    url = pick_url(endpoint, route, rng, posts)
+                    started = time.perf_counter()
+                    with workers:
+                        code = wsgi_get(application, url)
+                    samples.append((time.perf_counter() - started, code))
+            finally:
+                connection.close()
+
+        users = [threading.Thread(target=client_loop, args=(index,)) for index in range(clients)]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        return samples
+
+    def run_asgi(self, endpoint, route, clients, posts, options):
+        application = get_asgi_application()
+
+        async def client_loop(index):
+            rng = random.Random(options['seed'] + index)
+            samples = []
+            for _ in range(options['requests']):
+                url = pick_url(endpoint, route, rng, posts)
+                started = time.perf_counter()
+                code = await asgi_get(application, url)
+                samples.append((time.perf_counter() - started, code))
+            return samples
+
+        async def main():
+            chunks = await asyncio.gather(*(client_loop(index) for index in range(clients)))
+            return [sample for chunk in chunks for sample in chunk]
+
+        return asyncio.run(main())
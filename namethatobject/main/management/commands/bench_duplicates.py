@@ -0,0 +1,89 @@
+import json
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.duplicates import duplicate_settings, find_similar, hash_fields
+from main.models import Post, PostImageHash
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure duplicate lookup latency over synthetic image hashes. Everything '
+        'runs in a transaction that is rolled back, so the database is left as it was.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=2_000)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        max_distance = duplicate_settings()['MAX_DISTANCE']
+
+        with transaction.atomic():
+            author = User.objects.create_user(username='bench_duplicates_author')
+            started = time.perf_counter()
+            hashes = []
+            for offset in range(0, options['images'], options['batch_size']):
+                count = min(options['batch_size'], options['images'] - offset)
+                posts = Post.objects.bulk_create(
+                    Post(title=f'Mystery {offset + i}', description='', author=author) for i in range(count)
+                )
+                values = [rng.getrandbits(64) for _ in posts]
+                PostImageHash.objects.bulk_create(
+                    PostImageHash(post_id=post.pk, **hash_fields(value)) for post, value in zip(posts, values)
+                )
+                hashes.extend(values)
+            load_seconds = time.perf_counter() - started
+
+            # Re-posts: a stored hash with up to MAX_DISTANCE bits flipped
+            near, found = [], 0
+            for _ in range(options['queries']):
+                value = rng.choice(hashes)
+                for bit in rng.sample(range(64), rng.randint(0, max_distance)):
+                    value ^= 1 << bit
+                started = time.perf_counter()
+                found += bool(find_similar(value))
+                near.append(time.perf_counter() - started)
+
+            # New objects: hashes unrelated to anything stored
+            unrelated = []
+            for _ in range(options['queries']):
+                value = rng.getrandbits(64)
+                started = time.perf_counter()
+                find_similar(value)
+                unrelated.append(time.perf_counter() - started)
+
+            transaction.set_rollback(True)
+
+        result = {
+            'images': options['images'],
+            'max_distance': max_distance,
+            'load_seconds': round(load_seconds, 1),
+            'recall': found / options['queries'],
+            'near_p50_ms': round(percentile(near, 0.5) * 1000, 2),
+            'near_p99_ms': round(percentile(near, 0.99) * 1000, 2),
+            'unrelated_p50_ms': round(percentile(unrelated, 0.5) * 1000, 2),
+            'unrelated_p99_ms': round(percentile(unrelated, 0.99) * 1000, 2),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+        self.stdout.write(
+            f"{result['images']} images loaded in {result['load_seconds']}s, "
+            f"recall {result['recall']:.3f} at distance <= {max_distance}\n"
+            f"re-posts:  p50 {result['near_p50_ms']}ms  p99 {result['near_p99_ms']}ms\n"
+            f"unrelated: p50 {result['unrelated_p50_ms']}ms  p99 {result['unrelated_p99_ms']}ms"
+        )
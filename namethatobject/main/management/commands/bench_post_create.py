@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from main.media import shutdown_media_pipeline
+from main.models import Post
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Measure POST /posts/ latency for growing image sizes with the background media pipeline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='0,102400,1048576,10485760',
+                            help='Comma-separated upload sizes in bytes (0 = no file).')
+        parser.add_argument('--requests', type=int, default=20, help='Posts created per size.')
+        parser.add_argument('--upload-delay', type=float, default=0.5,
+                            help='Seconds the stand-in CDN takes per upload.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        work_dir = tempfile.mkdtemp(prefix='bench-media-')
+        user = User.objects.create_user(username='bench_media_author')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        delay = options['upload_delay']
+
+        results = []
+        try:
+            with override_settings(
+                MEDIA_ROOT=os.path.join(work_dir, 'media'),
+                MEDIA_PIPELINE={'BACKEND': 'bench', 'STAGING_DIR': os.path.join(work_dir, 'staging')},
+                ALLOWED_HOSTS=['*'],
+                SECURE_SSL_REDIRECT=False,
+            ):
+                from main import media
+
+                class SlowBackend(media.LocalBackend):
+                    def upload(self, path, kind, folder=None):
+                        time.sleep(delay)
+                        return super().upload(path, kind, folder)
+
+                media.BACKENDS['bench'] = SlowBackend
+                try:
+                    for size in [int(size) for size in options['sizes'].split(',')]:
+                        results.append(self.run(client, size, options['requests']))
+                    shutdown_media_pipeline()
+                finally:
+                    del media.BACKENDS['bench']
+        finally:
+            Post.objects.filter(author=user).delete()
+            user.delete()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for result in results:
+            self.stdout.write(
+                f"size={result['bytes']:>10}  p50={result['p50_ms']:>8.1f}ms  p95={result['p95_ms']:>8.1f}ms"
+            )
+
+    def run(self, client, size, requests):
+        payload = os.urandom(size)
+        timings = []
+        for i in range(requests):
+            data = {'title': f'Media benchmark {i}', 'description': 'Bench'}
+            if size:
+                data['image'] = SimpleUploadedFile(f'bench-{i}.jpg', payload, content_type='image/jpeg')
+            started = time.perf_counter()
+            response = client.post('/posts/', data, format='multipart')
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 201:
+                raise RuntimeError(f"Create failed with {response.status_code}: {response.data}")
+        return {
+            'bytes': size,
+            'requests': requests,
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+        }
@@ -0,0 +1,157 @@
+import json
+import re
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from main.models import Comment, Post
+from main.seeding import percentile, seed
+
+
+# Plan lines that mean a query reads a whole table or sorts rows itself
+# instead of walking an index: SQLite's "SCAN t" without an index and
+# "USE TEMP B-TREE", PostgreSQL's "Seq Scan" and "Sort"
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN \w+\b(?! USING| VIRTUAL TABLE)')
+FULL_SCAN_MARKERS = ('USE TEMP B-TREE', 'Seq Scan', 'Sort  (', 'Sort (')
+
+
+def explain(sql):
+    """The query plan of `sql` as a list of lines."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+        return [str(row[-1]) for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    return [
+        line for line in plan
+        if SQLITE_FULL_SCAN.search(line) or any(marker in line for marker in FULL_SCAN_MARKERS)
+    ]
+
+
+def endpoints(sample):
+    """(name, url) pairs for the read paths the frontend hits, against the sampled rows."""
+    post, busy, author, tag = sample['post'], sample['busy'], sample['author'], sample['tag']
+    posts = reverse('post-list')
+    return [
+        ('posts:new', f'{posts}?ordering=new'),
+        ('posts:hot', f'{posts}?ordering=hot'),
+        ('posts:top', f'{posts}?ordering=top'),
+        ('posts:unsolved', f'{posts}?ordering=unsolved'),
+        ('posts:tag', f'{posts}?ordering=new&tag_name={tag}'),
+        ('posts:search', f"{reverse('post-search')}?q={tag}"),
+        ('posts:detail', reverse('post-detail', args=[post])),
+        ('posts:thread', reverse('post-thread', args=[busy])),
+        ('posts:similar', reverse('post-similar', args=[post])),
+        ('comments:post', f"{reverse('comment-list')}?post={busy}"),
+        ('users:stats', reverse('user_stats', args=[author])),
+        ('users:posts', reverse('user_posts', args=[author])),
+        ('users:comments', reverse('user_comments', args=[author])),
+        ('leaderboards:users', reverse('user_leaderboard')),
+        ('leaderboards:mysteries', f"{reverse('mystery_leaderboard')}?metric=hot"),
+    ]
+
+
+def pick_sample():
+    post = Post.objects.filter(is_deleted=False).order_by('-hot_score').values_list('pk', 'tags').first()
+    busy = Post.objects.filter(is_deleted=False).order_by('-comment_count').values_list('pk', flat=True).first()
+    commenter = Comment.objects.order_by('-pk').values_list('author_id', flat=True).first()
+    if post is None or commenter is None:
+        raise CommandError('There are no posts or comments to benchmark; run without --existing to seed some.')
+    tags = post[1] or [{'name': 'spoon'}]
+    return {
+        'post': post[0],
+        'busy': busy,
+        'author': User.objects.get(pk=commenter).username,
+        'tag': tags[0]['name'],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic dataset and report the query plan, query count and latency '
+        'of each read endpoint, flagging plans that scan whole tables or sort without '
+        'an index. Seeded rows are rolled back afterwards; with --existing the current '
+        'data is measured instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2_000)
+        parser.add_argument('--posts', type=int, default=20_000)
+        parser.add_argument('--comments', type=int, default=100_000)
+        parser.add_argument('--runs', type=int, default=20, help='Requests timed per endpoint.')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--existing', action='store_true', help='Measure the data already in the database.')
+        parser.add_argument('--strict', action='store_true', help='Fail if any endpoint query scans a table.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['existing']:
+                started = time.perf_counter()
+                seed(
+                    users=options['users'], posts=options['posts'], comments=options['comments'],
+                    seed=options['seed'], batch_size=options['batch_size'],
+                    log=lambda message: self.stderr.write(f'seeded {message}'),
+                )
+                self.stderr.write(f'seeded in {time.perf_counter() - started:.1f}s')
+            # Fresh statistics, so the planner sees the seeded table sizes
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            results = self.measure(pick_sample(), options['runs'])
+            transaction.set_rollback(not options['existing'])
+
+        scans = {result['endpoint']: result['full_scans'] for result in results if result['full_scans']}
+        if options['json']:
+            self.stdout.write(json.dumps({'vendor': connection.vendor, 'endpoints': results}, indent=2))
+        else:
+            for result in results:
+                self.stdout.write(
+                    f"{result['endpoint']:<24} {result['status']}  {result['queries']:>3} queries  "
+                    f"p50 {result['p50_ms']:>8}ms  p95 {result['p95_ms']:>8}ms"
+                )
+                for query in result['plans']:
+                    for line in query['plan']:
+                        flag = '!' if line in result['full_scans'] else ' '
+                        self.stdout.write(f'    {flag} {line}')
+        if options['strict'] and scans:
+            raise CommandError(f"Full scans in: {', '.join(scans)}")
+
+    def measure(self, sample, runs):
+        client = APIClient()
+        # Some endpoints (user stats) are for signed-in users only
+        client.force_authenticate(User.objects.get(username=sample['author']))
+        results = []
+        with override_settings(ALLOWED_HOSTS=['*'], SECURE_SSL_REDIRECT=False, RESPONSE_CACHE={'ENABLED': False}):
+            for name, url in endpoints(sample):
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(url)
+                # Read the log now: the next request clears it
+                queries = [query['sql'] for query in captured.captured_queries]
+                selects = [
+                    sql for sql in queries
+                    if sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+                ]
+                plans = [{'sql': sql, 'plan': explain(sql)} for sql in selects]
+                timings = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append(time.perf_counter() - started)
+                results.append({
+                    'endpoint': name,
+                    'url': url,
+                    'status': response.status_code,
+                    'queries': len(queries),
+                    'p50_ms': round(percentile(timings, 0.5) * 1000, 2),
+                    'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+                    'plans': plans,
+                    'full_scans': [line for query in plans for line in full_scans(query['plan'])],
+                })
+        return results
@@ -0,0 +1,126 @@
+import json
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+
+from main import renderers
+from main.fieldsets import parse_fieldset, shape_serializer
+from main.flat_serializers import FlatCommentSerializer, FlatPostSerializer
+from main.models import Comment, Post
+from main.query_planner import plan_queryset
+from main.renderers import FastJSONRenderer
+from main.seeding import percentile, seed
+from main.serializers import CommentSerializer, PostSerializer
+
+
+def drf_path(serializer_class, fieldset):
+    def fetch(queryset):
+        serializer = shape_serializer(serializer_class(), fieldset)
+        return list(plan_queryset(queryset, serializer, only=fieldset is not None))
+
+    def serialize(instances):
+        return shape_serializer(serializer_class(instances, many=True), fieldset).data
+
+    return fetch, serialize, JSONRenderer()
+
+
+def flat_path(serializer_class, fieldset):
+    serializer = serializer_class(fieldset)
+    return (lambda queryset: list(serializer.rows(queryset))), serializer.serialize, FastJSONRenderer()
+
+
+# Model -> (DRF serializer, flat serializer)
+SERIALIZERS = {
+    'post': (Post, PostSerializer, FlatPostSerializer),
+    'comment': (Comment, CommentSerializer, FlatCommentSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the DRF serializers against the flat read path (main/flat_serializers.py) '
+        'on the same rows, split into fetching, serializing and rendering, and check '
+        'that both produce the same bytes. Seeds a dataset that is rolled back '
+        'afterwards; with --existing the current data is used instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000, help='Rows serialized per run.')
+        parser.add_argument('--runs', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--existing', action='store_true', help='Use the data already in the database.')
+        parser.add_argument('--post-fields', help='Sparse fieldset of posts, as in ?fields=.')
+        parser.add_argument('--comment-fields', help='Sparse fieldset of comments, as in ?fields=.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['existing']:
+                seed(
+                    users=max(10, options['rows'] // 10), posts=options['rows'], comments=options['rows'],
+                    seed=options['seed'], log=lambda message: self.stderr.write(f'seeded {message}'),
+                )
+            results = []
+            for name, (model, serializer_class, flat_class) in SERIALIZERS.items():
+                fieldset = parse_fieldset(SimpleNamespace(query_params={'fields': options[f'{name}_fields']}))
+                paths = {'drf': drf_path(serializer_class, fieldset), 'flat': flat_path(flat_class, fieldset)}
+                results.append(self.measure(name, model, paths, options))
+            transaction.set_rollback(not options['existing'])
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'vendor': connection.vendor,
+                'encoder': 'orjson' if renderers.orjson else 'json',
+                'results': results,
+            }, indent=2))
+            return
+        for result in results:
+            for path in ('drf', 'flat'):
+                timing = result[path]
+                self.stdout.write(
+                    f"{result['model']:>8}  {path:<4}  {timing['rows_per_sec']:>10.0f} rows/s  "
+                    f"serialize {timing['serialize_rows_per_sec']:>10.0f} rows/s  "
+                    f"fetch={timing['fetch_ms']:>7.1f}ms  serialize={timing['serialize_ms']:>7.1f}ms  "
+                    f"render={timing['render_ms']:>7.1f}ms  {timing['bytes_per_row']} bytes/row"
+                )
+            self.stdout.write(f"{result['model']:>8}  {result['speedup']:.1f}x faster, identical={result['identical']}")
+
+    def measure(self, name, model, paths, options):
+        queryset = model.objects.order_by('-id')
+        if model is Post:
+            queryset = queryset.filter(is_deleted=False)
+        queryset = queryset[:options['rows']]
+        rows = queryset.count()
+        if not rows:
+            raise CommandError(f'There are no {name} rows to serialize; run without --existing to seed some.')
+
+        result = {'model': name, 'fields': options[f'{name}_fields'], 'rows': rows}
+        output = {}
+        for path, (fetch, serialize, renderer) in paths.items():
+            stages = {'fetch': [], 'serialize': [], 'render': []}
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                fetched = fetch(queryset)
+                fetched_at = time.perf_counter()
+                data = serialize(fetched)
+                serialized_at = time.perf_counter()
+                output[path] = renderer.render(data)
+                rendered_at = time.perf_counter()
+                stages['fetch'].append(fetched_at - started)
+                stages['serialize'].append(serialized_at - fetched_at)
+                stages['render'].append(rendered_at - serialized_at)
+            # Medians of each stage, so one slow run doesn't skew the rates
+            timing = {stage: percentile(samples, 0.5) for stage, samples in stages.items()}
+            total = sum(timing.values())
+            result[path] = {
+                **{f'{stage}_ms': round(seconds * 1000, 2) for stage, seconds in timing.items()},
+                'rows_per_sec': round(rows / total),
+                'serialize_rows_per_sec': round(rows / timing['serialize']),
+                'bytes_per_row': round(len(output[path]) / rows),
+            }
+        result['speedup'] = round(result['flat']['rows_per_sec'] / result['drf']['rows_per_sec'], 2)
+        result['identical'] = output['drf'] == output['flat']
+        return result
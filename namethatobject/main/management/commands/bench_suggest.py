@@ -0,0 +1,76 @@
+import json
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.suggest import PrefixIndex
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Measure build time and lookup latency of the suggestion prefix index on synthetic terms.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=20_000)
+        parser.add_argument('--updates', type=int, default=2_000)
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+            for _ in range(50_000)
+        ]
+        titles = [' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))) for _ in range(options['terms'])]
+
+        index = PrefixIndex(max_terms=options['terms'] * 3)
+        started = time.perf_counter()
+        index.bulk_add(('post', i, title, None) for i, title in enumerate(titles))
+        build_seconds = time.perf_counter() - started
+
+        lookups = []
+        for _ in range(options['queries']):
+            word = rng.choice(vocabulary)
+            prefix = word[:rng.randint(1, len(word))]
+            started = time.perf_counter()
+            index.search(prefix, limit=5)
+            lookups.append((time.perf_counter() - started) * 1000)
+
+        updates = []
+        for i in range(options['updates']):
+            title = ' '.join(rng.choices(vocabulary, k=2))
+            started = time.perf_counter()
+            index.add('post', options['terms'] + i, title)
+            updates.append((time.perf_counter() - started) * 1000)
+
+        results = {
+            'terms': options['terms'],
+            'keys': len(index),
+            'build_seconds': round(build_seconds, 3),
+            'lookup_ms': {
+                'p50': round(percentile(lookups, 0.50), 4),
+                'p99': round(percentile(lookups, 0.99), 4),
+                'max': round(max(lookups), 4),
+            },
+            'update_ms': {
+                'p50': round(percentile(updates, 0.50), 4),
+                'p99': round(percentile(updates, 0.99), 4),
+            },
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f"{results['terms']} terms ({results['keys']} keys) built in {results['build_seconds']}s\n"
+            f"lookup  p50={results['lookup_ms']['p50']}ms  p99={results['lookup_ms']['p99']}ms  "
+            f"max={results['lookup_ms']['max']}ms\n"
+            f"update  p50={results['update_ms']['p50']}ms  p99={results['update_ms']['p99']}ms"
+        )
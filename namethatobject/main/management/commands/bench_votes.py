@@ -0,0 +1,89 @@
+import json
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from main.models import Post, Vote
+from main.vote_buffer import VoteBuffer
+from main.votes import cast_vote
+
+
+class Command(BaseCommand):
+    help = 'Measure vote throughput on a single hot post, with and without the write-behind vote buffer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--voters', default='1,2,4,8,16,32',
+                            help='Comma-separated concurrency levels to run.')
+        parser.add_argument('--votes-per-voter', type=int, default=50)
+        parser.add_argument('--mode', choices=['direct', 'buffered', 'both'], default='both')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['voters'].split(',')]
+        modes = ['direct', 'buffered'] if options['mode'] == 'both' else [options['mode']]
+
+        author = User.objects.create_user(username='bench_votes_author')
+        voters = [User.objects.create_user(username=f'bench_votes_{i}') for i in range(max(levels))]
+        post = Post.objects.create(title='Vote benchmark', description='Hot mystery', author=author)
+
+        results = []
+        try:
+            for mode in modes:
+                for level in levels:
+                    results.append(self.run(mode, post, voters[:level], options['votes_per_voter']))
+        finally:
+            User.objects.filter(username__startswith='bench_votes_').delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:>8}  voters={result['voters']:<3}  "
+                f"{result['votes_per_second']:>9.1f} votes/s  drift={result['drift']}"
+            )
+
+    def run(self, mode, post, voters, votes_per_voter):
+        Vote.objects.filter(post=post).delete()
+        Post.objects.filter(pk=post.pk).update(upvotes=0, downvotes=0)
+        vote_buffer = None
+        if mode == 'buffered':
+            vote_buffer = VoteBuffer(tempfile.mkdtemp(prefix='vote-journal-'), flush_interval=0.5)
+            vote_buffer.start()
+
+        def vote(user):
+            try:
+                target = Post.objects.get(pk=post.pk)
+                for i in range(votes_per_voter):
+                    value = Vote.UPVOTE if i % 2 == 0 else Vote.DOWNVOTE
+                    cast_vote(user, target, value, vote_buffer=vote_buffer)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=vote, args=(user,)) for user in voters]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if vote_buffer is not None:
+            vote_buffer.stop()
+
+        post.refresh_from_db()
+        expected_up = Vote.objects.filter(post=post, value=Vote.UPVOTE).count()
+        expected_down = Vote.objects.filter(post=post, value=Vote.DOWNVOTE).count()
+        total = len(voters) * votes_per_voter
+        return {
+            'mode': mode,
+            'voters': len(voters),
+            'votes': total,
+            'seconds': round(elapsed, 4),
+            'votes_per_second': total / elapsed if elapsed else 0.0,
+            'drift': abs(post.upvotes - expected_up) + abs(post.downvotes - expected_down),
+        }
@@ -0,0 +1,39 @@
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from main.images import fetch_image, generate_derivatives
+from main.media import get_backend
+from main.models import Post
+from main.response_cache import invalidate_post
+
+
+class Command(BaseCommand):
+    help = 'Generate resized image derivatives for posts uploaded before they existed (or all posts with --all).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate derivatives that already exist.')
+        parser.add_argument('--limit', type=int, default=None, help='Process at most this many posts.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.filter(is_deleted=False).exclude(image_url__isnull=True).exclude(image_url='')
+        if not options['all']:
+            posts = posts.filter(image_variants__isnull=True)
+        posts = posts.order_by('pk').values_list('pk', 'image_url')
+        if options['limit']:
+            posts = posts[:options['limit']]
+
+        backend = get_backend()
+        done = failed = 0
+        for post_id, url in posts.iterator():
+            with tempfile.TemporaryDirectory() as directory:
+                try:
+                    fields = generate_derivatives(fetch_image(url, directory), backend)
+                except Exception as e:
+                    self.stderr.write(f"Post {post_id}: {e}")
+                    failed += 1
+                    continue
+            Post.objects.filter(pk=post_id).update(**fields)
+            invalidate_post(post_id)
+            done += 1
+        self.stdout.write(f"Generated derivatives for {done} posts, failed {failed}")
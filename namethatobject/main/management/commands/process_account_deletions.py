@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from main.accounts import run_deletion
+from main.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = 'Carry out account deletions the background worker has not finished (e.g. after a restart).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry deletions marked failed.')
+
+    def handle(self, *args, **options):
+        statuses = [AccountDeletion.PENDING, AccountDeletion.RUNNING]
+        if options['retry_failed']:
+            AccountDeletion.objects.filter(status=AccountDeletion.FAILED).update(
+                status=AccountDeletion.PENDING, error=''
+            )
+        counts = {}
+        for job in AccountDeletion.objects.filter(status__in=statuses).order_by('created_at'):
+            status = run_deletion(job.pk)
+            if status is not None:
+                counts[status] = counts.get(status, 0) + 1
+            self.stdout.write(f"{job.username}: {status or 'already taken'}")
+        self.stdout.write(
+            f"Deleted {counts.get(AccountDeletion.DONE, 0)}, failed {counts.get(AccountDeletion.FAILED, 0)}"
+        )
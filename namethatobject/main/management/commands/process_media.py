@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from main.media import process_upload, requeue_stale
+from main.models import MediaUpload
+
+
+class Command(BaseCommand):
+    help = 'Upload staged post media that the background pipeline has not finished (e.g. after a restart).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=15,
+                            help='Treat uploads stuck in processing for this long as abandoned.')
+        parser.add_argument('--retry-failed', action='store_true', help='Also retry uploads marked failed.')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale(timedelta(minutes=options['stale_minutes']))
+        if options['retry_failed']:
+            requeued += MediaUpload.objects.filter(status=MediaUpload.FAILED).update(
+                status=MediaUpload.PENDING, attempts=0
+            )
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} uploads")
+
+        counts = {}
+        pending = MediaUpload.objects.filter(status=MediaUpload.PENDING).order_by('created_at')
+        for upload_id in pending.values_list('pk', flat=True):
+            status = process_upload(upload_id)
+            if status is not None:
+                counts[status] = counts.get(status, 0) + 1
+        self.stdout.write(
+            f"Uploaded {counts.get(MediaUpload.READY, 0)}, failed {counts.get(MediaUpload.FAILED, 0)}"
+        )
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from main.chunked_uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable uploads that were abandoned before being attached to a post.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=None,
+                            help='Idle time before an upload expires (default: CHUNKED_UPLOADS EXPIRE_AFTER).')
+
+    def handle(self, *args, **options):
+        older_than = timedelta(hours=options['hours']) if options['hours'] is not None else None
+        self.stdout.write(f"Deleted {purge_expired(older_than)} expired uploads")
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.leaderboards import prune, rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the all-time leaderboards from posts, comments and votes, and drop '
+        'weekly boards past LEADERBOARDS["KEEP_WEEKS"]. Weekly boards are only kept '
+        'as they are recorded and are not recomputed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--prune', action='store_true', help='Only drop old weekly boards.')
+        parser.add_argument('--keep-weeks', type=int, help='Override LEADERBOARDS["KEEP_WEEKS"].')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if not options['prune']:
+            written = rebuild(batch_size=options['batch_size'])
+            self.stdout.write(f'Rebuilt {written} all-time leaderboard entries')
+        deleted = prune(options['keep_weeks'])
+        self.stdout.write(f'Dropped {deleted} old weekly entries in {time.perf_counter() - started:.1f}s')
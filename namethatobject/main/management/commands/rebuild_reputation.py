@@ -0,0 +1,22 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from main.reputation import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user\'s reputation totals from their posts, comments and votes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help='Only rebuild these users.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            user_ids = list(User.objects.filter(username__in=options['usernames']).values_list('pk', flat=True))
+        started = time.perf_counter()
+        written = rebuild(user_ids, batch_size=options['batch_size'])
+        self.stdout.write(f"Rebuilt reputation for {written} users in {time.perf_counter() - started:.1f}s")
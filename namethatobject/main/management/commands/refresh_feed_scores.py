@@ -0,0 +1,25 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.ranking import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        'Recount comments and recompute the stored hot/top feed scores of posts in '
+        'batches. Scores are kept up to date as votes and comments come in; run this '
+        'periodically to repair drift, or after changing FEED_RANKING.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--days', type=int, help='Only posts created in the last DAYS days.')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+        started = time.perf_counter()
+        written = refresh(batch_size=options['batch_size'], since=since)
+        self.stdout.write(f'Rescored {written} posts in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,49 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with a synthetic community (users, tagged posts, deep comment '
+        'trees) for bench_api and bench_queries --existing. Rows are kept, so point it at '
+        'a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=500_000)
+        parser.add_argument('--days', type=int, default=365, help='Spread posts over this many past days.')
+        parser.add_argument('--max-depth', type=int, default=8, help='Deepest reply nesting.')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=573)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            seeded = seed(
+                users=options['users'], posts=options['posts'], comments=options['comments'],
+                days=options['days'], max_depth=options['max_depth'], seed=options['seed'],
+                batch_size=options['batch_size'],
+                log=lambda message: self.stderr.write(f'seeded {message}'),
+            )
+        result = {
+            'users': len(seeded['users']),
+            'posts': len(seeded['posts']),
+            'comments': len(seeded['comments']),
+            'tags': len(seeded['tags']),
+            'seconds': round(time.perf_counter() - started, 1),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+        self.stdout.write(
+            f"Seeded {result['users']} users, {result['posts']} posts and "
+            f"{result['comments']} comments in {result['seconds']}s"
+        )
@@ -0,0 +1,265 @@
+import atexit
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .images import derivative_settings, generate_derivatives
+from .models import MediaUpload, Post
+from .response_cache import invalidate_post
+
+MEDIA_KINDS = ('image', 'video', 'audio')
+
+DEFAULTS = {
+    'BACKEND': 'cloudinary',
+    'WORKERS': 2,
+    'STAGING_DIR': None,
+    'EAGER': False,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 2.0,
+}
+
+# Same folders and resource types as the Post CloudinaryFields
+CLOUDINARY_OPTIONS = {
+    'image': {'folder': 'mystery_images', 'resource_type': 'image'},
+    'video': {'folder': 'mystery_videos', 'resource_type': 'video'},
+    'audio': {'folder': 'mystery_audio', 'resource_type': 'raw'},
+}
+
+
+def pipeline_settings():
+    return {**DEFAULTS, **getattr(settings, 'MEDIA_PIPELINE', {})}
+
+
+def staging_dir():
+    return pipeline_settings()['STAGING_DIR'] or os.path.join(settings.BASE_DIR, 'media_staging')
+
+
+class CloudinaryBackend:
+    """Pushes staged files to Cloudinary; returns the resource for the Post field and its https URL."""
+
+    def upload(self, path, kind, folder=None):
+        import cloudinary.uploader
+        from cloudinary import CloudinaryResource
+
+        options = {**CLOUDINARY_OPTIONS[kind], **({'folder': folder} if folder else {})}
+        result = cloudinary.uploader.upload(path, **options)
+        resource = CloudinaryResource(
+            result['public_id'],
+            version=result.get('version'),
+            format=result.get('format'),
+            type=result.get('type', 'upload'),
+            resource_type=result.get('resource_type', CLOUDINARY_OPTIONS[kind]['resource_type']),
+        )
+        return resource, result['secure_url']
+
+
+class LocalBackend:
+    """Copies staged files under MEDIA_ROOT; the stand-in for Cloudinary in development and tests."""
+
+    def upload(self, path, kind, folder=None):
+        folder = folder or CLOUDINARY_OPTIONS[kind]['folder']
+        name = os.path.basename(path)
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, folder), exist_ok=True)
+        shutil.copyfile(path, os.path.join(settings.MEDIA_ROOT, folder, name))
+        return None, f'{settings.MEDIA_URL}{folder}/{name}'
+
+
+BACKENDS = {
+    'cloudinary': CloudinaryBackend,
+    'local': LocalBackend,
+}
+
+
+def get_backend():
+    return BACKENDS[pipeline_settings()['BACKEND']]()
+
+
+def stage_upload(post, kind, uploaded_file):
+    """Write an uploaded file to local staging and record it for the pipeline."""
+    directory = os.path.join(staging_dir(), uuid.uuid4().hex)
+    os.makedirs(directory, exist_ok=True)
+    original_name = os.path.basename(uploaded_file.name or kind)
+    path = os.path.join(directory, get_valid_filename(original_name) or kind)
+    with open(path, 'wb') as staged:
+        for chunk in uploaded_file.chunks():
+            staged.write(chunk)
+    return MediaUpload.objects.create(
+        post=post, kind=kind, staged_path=path, original_name=original_name[:255]
+    )
+
+
+def queue_uploads(post, uploads):
+    """Mark `post` pending and hand `uploads` to the pipeline once the current transaction commits."""
+    if not uploads:
+        return uploads
+    Post.objects.filter(pk=post.pk).update(media_status=Post.MEDIA_PENDING)
+    post.media_status = Post.MEDIA_PENDING
+    upload_ids = [upload.pk for upload in uploads]
+    transaction.on_commit(lambda: submit(upload_ids))
+    return uploads
+
+
+def ingest_media(post, files):
+    """
+    Stage `{kind: uploaded file}` for `post` and queue them for upload.
+    The post is marked pending until every file has been uploaded.
+    """
+    return queue_uploads(post, [stage_upload(post, kind, uploaded_file) for kind, uploaded_file in files.items()])
+
+
+def ingest_staged_file(post, kind, path, original_name):
+    """Queue a file that is already on local disk (e.g. a finished chunked upload) for `post`."""
+    upload = MediaUpload.objects.create(
+        post=post, kind=kind, staged_path=path, original_name=original_name[:255]
+    )
+    return queue_uploads(post, [upload])
+
+
+def refresh_media_status(post_id):
+    statuses = set(MediaUpload.objects.filter(post_id=post_id).values_list('status', flat=True))
+    if not statuses:
+        status = Post.MEDIA_NONE
+    elif MediaUpload.FAILED in statuses:
+        status = Post.MEDIA_FAILED
+    elif statuses == {MediaUpload.READY}:
+        status = Post.MEDIA_READY
+    else:
+        status = Post.MEDIA_PENDING
+    Post.objects.filter(pk=post_id).update(media_status=status)
+    return status
+
+
+def _discard_staged(path):
+    try:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def process_upload(upload_id):
+    """
+    Push one staged upload to the media backend and fill in the post's URL.
+    Images also get their resized derivatives (see main.images).
+
+    The upload is claimed with a conditional UPDATE, so when several
+    workers or processes pick up the same id only one of them uploads it.
+    Failed attempts are retried up to MAX_ATTEMPTS before the upload (and
+    with it the post's media) is marked failed. Returns the final status,
+    or None if another worker had already claimed it.
+    """
+    config = pipeline_settings()
+    claimed = MediaUpload.objects.filter(pk=upload_id, status=MediaUpload.PENDING).update(
+        status=MediaUpload.PROCESSING, attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    upload = MediaUpload.objects.get(pk=upload_id)
+
+    backend = get_backend()
+    while True:
+        try:
+            resource, url = backend.upload(upload.staged_path, upload.kind)
+            break
+        except Exception as e:
+            print(f"Error uploading {upload}: {e}")
+            if upload.attempts >= config['MAX_ATTEMPTS']:
+                with transaction.atomic():
+                    MediaUpload.objects.filter(pk=upload.pk).update(status=MediaUpload.FAILED, error=str(e))
+                    refresh_media_status(upload.post_id)
+                invalidate_post(upload.post_id)
+                return MediaUpload.FAILED
+            time.sleep(config['RETRY_DELAY'] * upload.attempts)
+            MediaUpload.objects.filter(pk=upload.pk).update(attempts=F('attempts') + 1)
+            upload.attempts += 1
+
+    fields = {f'{upload.kind}_url': url}
+    if resource is not None:
+        fields[upload.kind] = resource
+    if upload.kind == 'image' and derivative_settings()['ENABLED']:
+        # Resized copies for list pages; the original is still usable if this fails
+        try:
+            fields.update(generate_derivatives(upload.staged_path, backend))
+        except Exception as e:
+            print(f"Error generating derivatives for {upload}: {e}")
+            fields.update(image_variants=None, image_placeholder='')
+    with transaction.atomic():
+        Post.objects.filter(pk=upload.post_id).update(**fields)
+        MediaUpload.objects.filter(pk=upload.pk).update(status=MediaUpload.READY, error='')
+        refresh_media_status(upload.post_id)
+    invalidate_post(upload.post_id)
+    _discard_staged(upload.staged_path)
+    return MediaUpload.READY
+
+
+def requeue_stale(older_than=timedelta(minutes=15)):
+    """Hand uploads left `processing` by a worker that died back to the queue."""
+    return MediaUpload.objects.filter(
+        status=MediaUpload.PROCESSING, updated_at__lt=timezone.now() - older_than
+    ).update(status=MediaUpload.PENDING)
+
+
+class MediaPipeline:
+    """Thread pool that uploads staged media off the request path."""
+
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='media-pipeline')
+
+    def submit(self, upload_ids):
+        return [self.executor.submit(self._run, upload_id) for upload_id in upload_ids]
+
+    def _run(self, upload_id):
+        try:
+            return process_upload(upload_id)
+        except Exception as e:
+            print(f"Error processing media upload {upload_id}: {e}")
+        finally:
+            connection.close()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+_pipeline = None
+_pipeline_pid = None
+_pipeline_lock = threading.Lock()
+
+
+def get_media_pipeline():
+    """Process-wide pipeline; on first use it also picks up uploads still pending from earlier runs."""
+    global _pipeline, _pipeline_pid
+    with _pipeline_lock:
+        if _pipeline is None or _pipeline_pid != os.getpid():
+            _pipeline = MediaPipeline(pipeline_settings()['WORKERS'])
+            _pipeline_pid = os.getpid()
+            atexit.register(shutdown_media_pipeline)
+            pending = list(MediaUpload.objects.filter(status=MediaUpload.PENDING).values_list('pk', flat=True))
+            _pipeline.submit(pending)
+        return _pipeline
+
+
+def shutdown_media_pipeline():
+    """Wait for queued uploads to finish and drop the process-wide pipeline."""
+    global _pipeline
+    with _pipeline_lock:
+        pipeline, _pipeline = _pipeline, None
+    if pipeline is not None:
+        pipeline.shutdown()
+
+
+def submit(upload_ids):
+    if pipeline_settings()['EAGER']:
+        for upload_id in upload_ids:
+            process_upload(upload_id)
+        return
+    get_media_pipeline().submit(upload_ids)
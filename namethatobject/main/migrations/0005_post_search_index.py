@@ -0,0 +1,60 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import migrations
+
+FTS_TABLE = 'main_post_fts'
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX post_search_vector_gin ON main_post USING gin (search_vector)'
+        )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description, tags)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS post_search_vector_gin')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def index_existing_posts(apps, schema_editor):
+    from main.search import get_search_backend
+    Post = apps.get_model('main', 'Post')
+    backend = get_search_backend()
+    for post in Post.objects.only('id', 'title', 'description', 'tags').iterator():
+        backend.index(post)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0004_voteflushbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=SearchVectorField(editable=False, null=True),
+        ),
+        # The GIN index only exists on PostgreSQL; SQLite gets an FTS5 table instead.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='post',
+                    index=GinIndex(fields=['search_vector'], name='post_search_vector_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_index, drop_search_index),
+            ],
+        ),
+        migrations.RunPython(index_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_post_tags(apps, schema_editor):
+    from main.tags import tag_values
+    Post = apps.get_model('main', 'Post')
+    PostTag = apps.get_model('main', 'PostTag')
+    rows = []
+    for post in Post.objects.only('id', 'tags').iterator(chunk_size=2000):
+        rows.extend(PostTag(post_id=post.id, **values) for values in tag_values(post.tags))
+        if len(rows) >= 5000:
+            PostTag.objects.bulk_create(rows)
+            rows = []
+    PostTag.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0005_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('wikidata_id', models.CharField(blank=True, max_length=32)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_index', to='main.post')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['wikidata_id', 'post'], name='posttag_wikidata_post_idx'),
+                    models.Index(fields=['description', 'name', 'post'], name='posttag_facet_post_idx'),
+                    models.Index(fields=['name', 'post'], name='posttag_name_post_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_post_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0006_posttag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='media_status',
+            field=models.CharField(choices=[('none', 'No media'), ('pending', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=16),
+        ),
+        migrations.CreateModel(
+            name='MediaUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('audio', 'Audio')], max_length=8)),
+                ('staged_path', models.CharField(max_length=500)),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to='main.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='mediaupload_status_idx')],
+            },
+        ),
+        # Posts that already have media were uploaded synchronously
+        migrations.RunSQL(
+            "UPDATE main_post SET media_status = 'ready' "
+            "WHERE image_url IS NOT NULL OR video_url IS NOT NULL OR audio_url IS NOT NULL",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0007_post_media_status_mediaupload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('video', 'Video'), ('audio', 'Audio')], max_length=8)),
+                ('filename', models.CharField(max_length=255)),
+                ('length', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('path', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete'), ('attached', 'Attached')], default='uploading', max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to='main.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
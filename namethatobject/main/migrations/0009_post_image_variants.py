@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0008_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_placeholder',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
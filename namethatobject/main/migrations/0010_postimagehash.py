@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0009_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostImageHash',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='image_hash', serialize=False, to='main.post')),
+                ('dhash', models.BigIntegerField()),
+                ('band0', models.IntegerField()),
+                ('band1', models.IntegerField()),
+                ('band2', models.IntegerField()),
+                ('band3', models.IntegerField()),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['band0', 'dhash', 'post'], name='postimagehash_band0_idx'),
+                    models.Index(fields=['band1', 'dhash', 'post'], name='postimagehash_band1_idx'),
+                    models.Index(fields=['band2', 'dhash', 'post'], name='postimagehash_band2_idx'),
+                    models.Index(fields=['band3', 'dhash', 'post'], name='postimagehash_band3_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0010_postimagehash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserReputation',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reputation', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('points', models.IntegerField(default=0)),
+                ('post_count', models.IntegerField(default=0)),
+                ('comment_count', models.IntegerField(default=0)),
+                ('post_upvotes', models.IntegerField(default=0)),
+                ('post_downvotes', models.IntegerField(default=0)),
+                ('comment_upvotes', models.IntegerField(default=0)),
+                ('comment_downvotes', models.IntegerField(default=0)),
+                ('eureka_count', models.IntegerField(default=0)),
+                ('expert_answer_count', models.IntegerField(default=0)),
+                ('upvoted_post_count', models.IntegerField(default=0)),
+                ('anonymous_upvoted_post_count', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
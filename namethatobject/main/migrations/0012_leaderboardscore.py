@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0011_userreputation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userreputation',
+            index=models.Index(fields=['-points', 'user'], name='userreputation_points_idx'),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(max_length=320)),
+                ('subject_id', models.BigIntegerField()),
+                ('score', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('board', 'subject_id'), name='leaderboardscore_unique_entry')],
+                'indexes': [
+                    models.Index(fields=['board', '-score', 'subject_id'], name='leaderboardscore_rank_idx'),
+                    models.Index(fields=['subject_id', 'board'], name='leaderboardscore_subject_idx'),
+                ],
+            },
+        ),
+    ]
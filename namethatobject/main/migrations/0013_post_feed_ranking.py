@@ -0,0 +1,64 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_feed_scores(apps, schema_editor):
+    from main.ranking import ranking_settings, scores
+    Post = apps.get_model('main', 'Post')
+    Comment = apps.get_model('main', 'Comment')
+    config = ranking_settings()
+    counts = dict(Comment.objects.values('post').annotate(count=Count('pk')).values_list('post', 'count'))
+    batch = []
+    for post in Post.objects.only('upvotes', 'downvotes', 'created_at', 'eureka_comment').iterator(chunk_size=2000):
+        post.comment_count = counts.get(post.pk, 0)
+        for field, value in scores(post, config).items():
+            setattr(post, field, value)
+        batch.append(post)
+        if len(batch) >= 2000:
+            Post.objects.bulk_update(batch, ['comment_count', 'hot_score', 'top_score'])
+            batch = []
+    Post.objects.bulk_update(batch, ['comment_count', 'hot_score', 'top_score'])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0012_leaderboardscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='top_score',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_feed_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['-created_at', '-id'], name='post_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['-hot_score', '-id'], name='post_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(is_deleted=False), fields=['-top_score', '-id'], name='post_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                condition=models.Q(is_deleted=False, eureka_comment__isnull=True),
+                fields=['-hot_score', '-id'], name='post_unsolved_hot_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0014_accountdeletion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                condition=models.Q(is_deleted=False), fields=['author', 'is_anonymous', '-created_at', '-id'],
+                name='post_author_public_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                condition=models.Q(eureka_comment__isnull=False), fields=['eureka_comment'], name='post_eureka_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author', 'created_at', 'id'], name='comment_author_created_idx'),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0015_query_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='voteflushbatch',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
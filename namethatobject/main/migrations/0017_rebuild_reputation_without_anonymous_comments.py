@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def rebuild_reputation(apps, schema_editor):
+    # Anonymous comments no longer earn their authors points, so rows and
+    # all-time tag boards built before that still count them
+    from main.leaderboards import rebuild as rebuild_leaderboards
+    from main.reputation import rebuild
+    rebuild()
+    rebuild_leaderboards()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('main', '0016_voteflushbatch_created_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_reputation, migrations.RunPython.noop),
+    ]
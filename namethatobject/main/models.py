@@ -1,11 +1,26 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from cloudinary.models import CloudinaryField
 from cloudinary.utils import cloudinary_url
 
 class Post(models.Model):
+    MEDIA_NONE = 'none'
+    MEDIA_PENDING = 'pending'
+    MEDIA_READY = 'ready'
+    MEDIA_FAILED = 'failed'
+    MEDIA_STATUS_CHOICES = [
+        (MEDIA_NONE, "No media"),
+        (MEDIA_PENDING, "Processing"),
+        (MEDIA_READY, "Ready"),
+        (MEDIA_FAILED, "Failed"),
+    ]
+
     title = models.CharField(max_length=200)
     description = models.TextField()
     image = CloudinaryField('image', folder='mystery_images', blank=True, null=True)
@@ -23,6 +38,45 @@ class Post(models.Model):
     is_anonymous = models.BooleanField(default=False)
     is_deleted = models.BooleanField(default=False)
     parts_relation = models.TextField(blank=True, null=True)
+    media_status = models.CharField(max_length=16, choices=MEDIA_STATUS_CHOICES, default=MEDIA_NONE)
+    # Resized copies of the image, `{format: {width: url}}`, and a tiny data URI
+    # placeholder; generated by the media pipeline (see main.images)
+    image_variants = models.JSONField(blank=True, null=True, editable=False)
+    image_placeholder = models.TextField(blank=True, default='', editable=False)
+    # Maintained by main.search on PostgreSQL; unused on other databases
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Feed ranking (see main.ranking), kept up to date as votes and comments
+    # come in so each feed ordering is read off its own index
+    comment_count = models.IntegerField(default=0, editable=False)
+    hot_score = models.FloatField(default=0, editable=False)
+    top_score = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='post_search_vector_gin'),
+            models.Index(
+                fields=['-created_at', '-id'], name='post_new_idx', condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=['-hot_score', '-id'], name='post_hot_idx', condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=['-top_score', '-id'], name='post_top_idx', condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=['-hot_score', '-id'], name='post_unsolved_hot_idx',
+                condition=models.Q(is_deleted=False, eureka_comment__isnull=True)
+            ),
+            # A user's public posts, newest first, and their reputation totals
+            models.Index(
+                fields=['author', 'is_anonymous', '-created_at', '-id'], name='post_author_public_idx',
+                condition=models.Q(is_deleted=False)
+            ),
+            # Which post (if any) accepted a comment as its answer
+            models.Index(
+                fields=['eureka_comment'], name='post_eureka_idx', condition=models.Q(eureka_comment__isnull=False)
+            ),
+        ]
 
     @property
     def points(self):
@@ -36,56 +90,42 @@ class Post(models.Model):
         self.save()
 
     def save(self, *args, **kwargs):
-        try:
-            if self.image:
-                # Get the direct Cloudinary URL
-                if hasattr(self.image, 'url'):
-                    cloudinary_url = self.image.url
-                    if cloudinary_url:
-                        # Ensure HTTPS
-                        cloudinary_url = cloudinary_url.replace('http://', 'https://')
-                        self.image_url = cloudinary_url
-                        print(f"Image URL set to: {cloudinary_url}")  # Debug log
-                else:
-                    print("Image exists but no URL available yet")
-
-            if self.video:
-                if hasattr(self.video, 'url'):
-                    cloudinary_url = self.video.url
-                    if cloudinary_url:
-                        cloudinary_url = cloudinary_url.replace('http://', 'https://')
-                        self.video_url = cloudinary_url
-                        print(f"Video URL set to: {cloudinary_url}")  # Debug log
-
-            if self.audio:
-                if hasattr(self.audio, 'url'):
-                    cloudinary_url = self.audio.url
-                    if cloudinary_url:
-                        cloudinary_url = cloudinary_url.replace('http://', 'https://')
-                        self.audio_url = cloudinary_url
-                        print(f"Audio URL set to: {cloudinary_url}")  # Debug log
-                
-        except Exception as e:
-            print(f"Error setting media URLs: {e}")
-            import traceback
-            print(traceback.format_exc())
-        
-        # Save first to ensure the file is uploaded
         super().save(*args, **kwargs)
-        
-        # Try to set URLs again after save if they weren't set before
-        try:
-            if self.image and not self.image_url and hasattr(self.image, 'url'):
-                cloudinary_url = self.image.url
-                if cloudinary_url:
-                    cloudinary_url = cloudinary_url.replace('http://', 'https://')
-                    self.image_url = cloudinary_url
-                    print(f"Image URL set after save: {cloudinary_url}")
-                    super().save(update_fields=['image_url'])
-        except Exception as e:
-            print(f"Error setting image URL after save: {e}")
+        # Media assigned to the fields directly (e.g. in the admin) is uploaded
+        # by CloudinaryField on save; fill in the URL columns for it here.
+        # API uploads skip this: main.media uploads them in the background.
+        urls = {}
+        for kind in ('image', 'video', 'audio'):
+            resource = getattr(self, kind)
+            if resource and not getattr(self, f'{kind}_url') and getattr(resource, 'url', None):
+                urls[f'{kind}_url'] = resource.url.replace('http://', 'https://')
+        if urls:
+            Post.objects.filter(pk=self.pk).update(**urls)
+            for field, url in urls.items():
+                setattr(self, field, url)
 
 
+class PostTag(models.Model):
+    """
+    One row per tag of a post, derived from `Post.tags` so tag filters and
+    facet counts are index lookups. `name` and `description` (the facet, e.g.
+    "material") are stored lower-cased; see main.tags.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='tag_index')
+    name = models.CharField(max_length=255)
+    description = models.CharField(max_length=255, blank=True)
+    wikidata_id = models.CharField(max_length=32, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['wikidata_id', 'post'], name='posttag_wikidata_post_idx'),
+            models.Index(fields=['description', 'name', 'post'], name='posttag_facet_post_idx'),
+            models.Index(fields=['name', 'post'], name='posttag_name_post_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.description})' if self.description else self.name
+
 class Comment(models.Model):
     TAG_CHOICES = [
         ("Question", "Question"),
@@ -103,6 +143,14 @@ class Comment(models.Model):
     tag = models.CharField(max_length=20, choices=TAG_CHOICES, default="Question")  # New field
     is_anonymous = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # A post's comments in either direction (comment list pages, threads)
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_idx'),
+            # A user's comments, newest first, and their reputation totals
+            models.Index(fields=['author', 'created_at', 'id'], name='comment_author_created_idx'),
+        ]
+
     @property
     def points(self):
         return self.upvotes - self.downvotes
@@ -114,6 +162,56 @@ class Comment(models.Model):
         self.is_anonymous = True
         self.save()
 
+class Vote(models.Model):
+    UPVOTE = 1
+    DOWNVOTE = -1
+    VALUE_CHOICES = [
+        (UPVOTE, "Upvote"),
+        (DOWNVOTE, "Downvote"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='votes')
+    post = models.ForeignKey(Post, null=True, blank=True, on_delete=models.CASCADE, related_name='votes')
+    comment = models.ForeignKey(Comment, null=True, blank=True, on_delete=models.CASCADE, related_name='votes')
+    value = models.SmallIntegerField(choices=VALUE_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(post__isnull=False, comment__isnull=True) |
+                    models.Q(post__isnull=True, comment__isnull=False)
+                ),
+                name='vote_has_exactly_one_target',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                condition=models.Q(post__isnull=False),
+                name='unique_post_vote_per_user',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'comment'],
+                condition=models.Q(comment__isnull=False),
+                name='unique_comment_vote_per_user',
+            ),
+        ]
+
+    @property
+    def target(self):
+        return self.post if self.post_id else self.comment
+
+    def __str__(self):
+        return f'{self.get_value_display()} by {self.user} on {self.target}'
+
+class VoteFlushBatch(models.Model):
+    """Marks a write-behind vote batch as applied, so a replay after a crash never applies it twice."""
+    batch_id = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.batch_id
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     profile_picture = CloudinaryField('image', folder='profile_pictures', blank=True, null=True)
@@ -142,3 +240,188 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
+
+class MediaUpload(models.Model):
+    """
+    A post's image/video/audio file waiting in local staging to be pushed
+    to the media storage by the background pipeline in main.media.
+    """
+    KIND_CHOICES = [
+        ("image", "Image"),
+        ("video", "Video"),
+        ("audio", "Audio"),
+    ]
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    READY = 'ready'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (PROCESSING, "Processing"),
+        (READY, "Ready"),
+        (FAILED, "Failed"),
+    ]
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='media_uploads')
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    staged_path = models.CharField(max_length=500)
+    original_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='mediaupload_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} for post {self.post_id} ({self.status})'
+
+class ChunkedUpload(models.Model):
+    """
+    A resumable video/audio upload sent in chunks (see main.chunked_uploads).
+    `offset` is how many bytes of `length` have been received so far; once
+    complete the file can be attached to a post, which hands it to the
+    media pipeline.
+    """
+    KIND_CHOICES = [
+        ("video", "Video"),
+        ("audio", "Audio"),
+    ]
+    UPLOADING = 'uploading'
+    COMPLETE = 'complete'
+    ATTACHED = 'attached'
+    STATUS_CHOICES = [
+        (UPLOADING, "Uploading"),
+        (COMPLETE, "Complete"),
+        (ATTACHED, "Attached"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    length = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    path = models.CharField(max_length=500)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=UPLOADING)
+    post = models.ForeignKey(Post, null=True, blank=True, on_delete=models.SET_NULL, related_name='chunked_uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.kind} upload {self.id} ({self.offset}/{self.length})'
+
+class PostImageHash(models.Model):
+    """
+    Perceptual hash of a post's image for duplicate detection (see
+    main.duplicates). The 64-bit dHash is also split into four 16-bit bands,
+    each indexed, so near matches can be found with exact band lookups. The
+    indexes also carry `dhash` and `post` so lookups never touch the table.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='image_hash')
+    dhash = models.BigIntegerField()
+    band0 = models.IntegerField()
+    band1 = models.IntegerField()
+    band2 = models.IntegerField()
+    band3 = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['band0', 'dhash', 'post'], name='postimagehash_band0_idx'),
+            models.Index(fields=['band1', 'dhash', 'post'], name='postimagehash_band1_idx'),
+            models.Index(fields=['band2', 'dhash', 'post'], name='postimagehash_band2_idx'),
+            models.Index(fields=['band3', 'dhash', 'post'], name='postimagehash_band3_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.dhash & 0xFFFFFFFFFFFFFFFF:016x} for post {self.post_id}'
+
+class UserReputation(models.Model):
+    """
+    Per-user totals behind profile points, rank and badges, kept up to date
+    from post, comment and vote changes (see main.reputation) so reading
+    them is a single row lookup. `points` is stored for ordering.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='reputation')
+    points = models.IntegerField(default=0)
+    post_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+    post_upvotes = models.IntegerField(default=0)
+    post_downvotes = models.IntegerField(default=0)
+    comment_upvotes = models.IntegerField(default=0)
+    comment_downvotes = models.IntegerField(default=0)
+    eureka_count = models.IntegerField(default=0)
+    expert_answer_count = models.IntegerField(default=0)
+    upvoted_post_count = models.IntegerField(default=0)
+    anonymous_upvoted_post_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # The all-time user leaderboard walks this from the top
+            models.Index(fields=['-points', 'user'], name='userreputation_points_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} ({self.points} points)'
+
+
+class LeaderboardScore(models.Model):
+    """
+    One entry of a precomputed leaderboard: `subject_id` is a user or post
+    id, depending on the board, and `board` names the ranking, e.g.
+    `posts:points`, `users:points:week:2024-W07` or
+    `posts:activity:week:2024-W07:tag:spoon` (see main.leaderboards). Scores
+    are adjusted in place as votes and comments come in, and the index keeps
+    each board sorted so a page is a short range scan.
+    """
+    board = models.CharField(max_length=320)
+    subject_id = models.BigIntegerField()
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'subject_id'], name='leaderboardscore_unique_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['board', '-score', 'subject_id'], name='leaderboardscore_rank_idx'),
+            models.Index(fields=['subject_id', 'board'], name='leaderboardscore_subject_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.board}: {self.subject_id} ({self.score})'
+
+
+class AccountDeletion(models.Model):
+    """
+    A request to delete an account, carried out in batches by a background
+    worker for accounts too large to delete within one request (see
+    main.accounts). `processed` of `total` posts and comments have been
+    handed over to the deleted-user placeholder so far.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, related_name='+')
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Deletion of {self.username} ({self.status})'
@@ -0,0 +1,43 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Each page is a single indexed range scan (`created_at < cursor`), so the
+    cost of a page does not grow with how deep the client has paged, and
+    posts created while a client is paging only ever show up "above" the
+    cursor instead of shifting the rows underneath it.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class FeedCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over the post feed in the order picked by `?ordering=`
+    (see FEED_ORDERINGS). Each ordering is backed by a partial index on its
+    stored sort key, so pages stay index range scans.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return FEED_ORDERINGS[feed_ordering(request)]
+
+
+FEED_ORDERINGS = {
+    'new': ('-created_at', '-id'),
+    'hot': ('-hot_score', '-id'),
+    'top': ('-top_score', '-id'),
+    # Hottest of the posts without an accepted answer (filtered in the view)
+    'unsolved': ('-hot_score', '-id'),
+}
+
+
+def feed_ordering(request):
+    ordering = request.query_params.get('ordering') or 'new'
+    if ordering not in FEED_ORDERINGS:
+        raise ValidationError({'ordering': f'Must be one of: {", ".join(FEED_ORDERINGS)}.'})
+    return ordering
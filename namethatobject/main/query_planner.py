@@ -0,0 +1,126 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def _relation(model, source):
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation:
+        return None
+    return field
+
+
+def _is_column(model, source):
+    try:
+        return model._meta.get_field(source).concrete
+    except FieldDoesNotExist:
+        return False
+
+
+def _read_sources(serializer, name):
+    # Model paths a field reads that the planner can't see from the field
+    # itself, e.g. what a SerializerMethodField's method touches; '*' names
+    # what the serializer's own to_representation reads
+    return getattr(getattr(serializer, 'Meta', None), 'read_sources', {}).get(name)
+
+
+def _add_sources(sources, prefix, select, columns):
+    for source in sources:
+        relations = source.split('__')[:-1]
+        if relations:
+            select.append(prefix + '__'.join(relations))
+        columns.append(prefix + source)
+
+
+def _collect(serializer, model, prefix, select, prefetch, columns):
+    """
+    Gather the joins, prefetches and columns `serializer` needs. Returns False
+    when some field reads data the planner can't account for, in which case
+    `columns` is incomplete and must not be used to defer the rest.
+    """
+    complete = True
+    _add_sources(_read_sources(serializer, '*') or [], prefix, select, columns)
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        sources = _read_sources(serializer, name)
+        if sources is not None:
+            _add_sources(sources, prefix, select, columns)
+            continue
+        if isinstance(field, serializers.ModelField):
+            # Model fields DRF has no field class for (e.g. CloudinaryField)
+            columns.append(prefix + field.model_field.name)
+            continue
+        if field.source == '*' or '.' in field.source:
+            complete = False
+            continue
+        path = prefix + field.source
+        relation = _relation(model, field.source)
+        if relation is None:
+            if _is_column(model, field.source):
+                columns.append(path)
+            else:
+                complete = False
+            continue
+        related_model = relation.related_model
+
+        if isinstance(field, serializers.ListSerializer):
+            # Nested many=True serializer: prefetch the rows and plan their
+            # own joins inside the prefetch queryset.
+            child_queryset = plan_queryset(related_model.objects.all(), field.child)
+            prefetch.append(Prefetch(path, queryset=child_queryset))
+        elif isinstance(field, serializers.ManyRelatedField):
+            # List of primary keys, e.g. `replies`: only the key columns are needed.
+            related_columns = [related_model._meta.pk.name]
+            if relation.one_to_many:
+                related_columns.append(relation.field.attname)
+            prefetch.append(Prefetch(path, queryset=related_model.objects.only(*related_columns)))
+        elif isinstance(field, serializers.BaseSerializer):
+            if relation.many_to_many or relation.one_to_many:
+                continue
+            select.append(path)
+            if relation.concrete:
+                columns.append(path)
+            complete = _collect(field, related_model, path + '__', select, prefetch, columns) and complete
+        elif relation.concrete:
+            # Plain related fields on a forward FK render from `<field>_id`
+            # without touching the related row, so they need no join.
+            columns.append(path)
+        else:
+            # The key of a reverse one-to-one lives on the related row
+            select.append(path)
+            columns.append(f'{path}__{related_model._meta.pk.name}')
+    return complete
+
+
+def plan_queryset(queryset, serializer, only=False):
+    """
+    Apply the `select_related`/`prefetch_related` calls that `serializer`
+    needs to render rows of `queryset` without per-row queries.
+
+    Nested single-object serializers become joins (followed recursively),
+    nested `many=True` serializers and many-related primary key fields become
+    prefetches. `serializer` may be a serializer class or instance.
+
+    With `only`, the columns no field reads are deferred as well, e.g. for a
+    serializer pruned to a sparse fieldset. Fields whose reads the planner
+    can't follow (methods, properties) name them in the serializer's
+    `Meta.read_sources`; a serializer with any other such field loads all
+    columns.
+    """
+    if isinstance(serializer, type):
+        serializer = serializer()
+    select = []
+    prefetch = []
+    columns = []
+    complete = _collect(serializer, queryset.model, '', select, prefetch, columns)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only and complete:
+        queryset = queryset.only(*dict.fromkeys(columns))
+    return queryset
@@ -0,0 +1,117 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Comment, Post
+from .response_cache import POST_LIST, invalidate
+
+DEFAULTS = {
+    # Seconds of age that cost as much rank as a tenfold difference in votes
+    'GRAVITY': 45000,
+    # How many votes one comment is worth in the hot score
+    'COMMENT_WEIGHT': 1,
+    # Solved mysteries rank as if they were posted this many GRAVITY periods earlier
+    'SOLVED_PENALTY': 2.0,
+}
+
+# Scores count time from here rather than decaying with the clock: a newer
+# post simply starts higher. A stored score then only changes when its own
+# post does, so feeds can be read off an index without rescoring the table.
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+SCORE_FIELDS = ('upvotes', 'downvotes', 'comment_count', 'created_at', 'eureka_comment')
+
+
+def ranking_settings():
+    return {**DEFAULTS, **getattr(settings, 'FEED_RANKING', {})}
+
+
+def hot_score(upvotes, downvotes, comment_count, created_at, solved, config=None):
+    """
+    Reddit-style hot score: the order of magnitude of a post's engagement
+    (net votes plus weighted comments) plus its age in GRAVITY periods.
+    """
+    config = config or ranking_settings()
+    engagement = upvotes - downvotes + config['COMMENT_WEIGHT'] * comment_count
+    sign = (engagement > 0) - (engagement < 0)
+    order = math.log10(max(abs(engagement), 1))
+    age = (created_at - EPOCH).total_seconds() / config['GRAVITY']
+    return sign * order + age - (config['SOLVED_PENALTY'] if solved else 0)
+
+
+def top_score(upvotes, downvotes, created_at):
+    """
+    Net votes, with ties broken by creation time, packed into one integer.
+    Cursor pages are keyed on the first ordering column alone, so it has
+    to be close to unique to keep pages from degrading into offsets.
+    """
+    return (upvotes - downvotes) * 2 ** 32 + int((created_at - EPOCH).total_seconds())
+
+
+def scores(post, config=None):
+    """
+    The stored ranking columns for `post` (anything with the SCORE_FIELDS
+    attributes). A post that is being created has no `created_at` yet and
+    is scored as of now.
+    """
+    created_at = post.created_at or timezone.now()
+    return {
+        'hot_score': hot_score(
+            post.upvotes, post.downvotes, post.comment_count, created_at,
+            bool(post.eureka_comment), config
+        ),
+        'top_score': top_score(post.upvotes, post.downvotes, created_at),
+    }
+
+
+def apply_scores(post, config=None):
+    for field, value in scores(post, config).items():
+        setattr(post, field, value)
+
+
+def rescore(pks):
+    """Recompute the ranking columns of posts `pks` from their current rows."""
+    config = ranking_settings()
+    posts = list(Post.objects.filter(pk__in=pks).only(*SCORE_FIELDS))
+    for post in posts:
+        apply_scores(post, config)
+    Post.objects.bulk_update(posts, ['hot_score', 'top_score'])
+
+
+def comments_changed(post_id, delta):
+    """Count `delta` comments added to (or removed from) a post and move it in the feeds."""
+    Post.objects.filter(pk=post_id).update(comment_count=F('comment_count') + delta)
+    rescore([post_id])
+    invalidate(POST_LIST)
+
+
+def refresh(batch_size=1000, since=None):
+    """
+    Recount comments and recompute the ranking columns of every post (or
+    those created since `since`) in primary key batches, fixing any drift
+    from the incremental updates. Returns the number of posts rewritten.
+    """
+    config = ranking_settings()
+    posts = Post.objects.order_by('pk').only(*SCORE_FIELDS)
+    if since is not None:
+        posts = posts.filter(created_at__gte=since)
+    last_pk = 0
+    written = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            if written:
+                invalidate(POST_LIST)
+            return written
+        counts = dict(
+            Comment.objects.filter(post__in=batch).values('post').annotate(count=Count('pk')).values_list('post', 'count')
+        )
+        for post in batch:
+            post.comment_count = counts.get(post.pk, 0)
+            apply_scores(post, config)
+        Post.objects.bulk_update(batch, ['comment_count', 'hot_score', 'top_score'])
+        written += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,43 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # in requirements.txt; without it JSONRenderer's stdlib encoder is used
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Meant for the responses of the flat serializers (main/flat_serializers.py),
+    which hold only dicts, lists, strings, ints, bools and None: orjson writes
+    those byte for byte like JSONRenderer's compact, unicode output. Floats
+    are not safe (orjson spells 1e-05 as 1e-5), so views that return them keep
+    the stock renderer. Datetimes and other non-JSON types are handed to
+    DRF's encoder as usual. Indented output, non-default UNICODE_JSON,
+    COMPACT_JSON or STRICT_JSON settings, and anything orjson refuses fall
+    back to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of U+2028/U+2029 as JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def with_fast_json(renderers):
+    """`renderers` with the stock JSONRenderer swapped for FastJSONRenderer."""
+    return [FastJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
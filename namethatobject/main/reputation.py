@@ -0,0 +1,297 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, Q, Sum
+from django.dispatch import Signal
+
+from .models import Comment, Post, UserReputation
+
+# The profile page's scoring, except that anonymous comments earn nothing,
+# like anonymous posts
+POST_POINTS = 10
+COMMENT_POINTS = 5
+UPVOTED_POST_THRESHOLD = 10
+
+RANKS = [
+    (1000, 'God Like'),
+    (750, 'Master'),
+    (500, 'Expert'),
+    (250, 'Contributor'),
+    (100, 'Explorer'),
+    (0, 'Beginner'),
+]
+
+COUNTERS = [
+    'post_count', 'comment_count', 'post_upvotes', 'post_downvotes',
+    'comment_upvotes', 'comment_downvotes', 'eureka_count', 'expert_answer_count',
+    'upvoted_post_count', 'anonymous_upvoted_post_count',
+]
+
+# Sent after reputation changes are applied, with `points=[(user_id, post_id,
+# delta)]`: the points each user gained or lost, by the post they were
+# earned on (see main.leaderboards)
+points_changed = Signal()
+
+POST_FIELDS = ('id', 'author_id', 'upvotes', 'downvotes', 'is_anonymous', 'is_deleted', 'eureka_comment')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'upvotes', 'downvotes', 'tag', 'is_anonymous')
+
+
+def points_for(counters):
+    return (
+        counters.get('post_upvotes', 0) + counters.get('comment_upvotes', 0)
+        + POST_POINTS * counters.get('post_count', 0) + COMMENT_POINTS * counters.get('comment_count', 0)
+    )
+
+
+def rank_for(points):
+    return next(name for threshold, name in RANKS if points >= threshold)
+
+
+def badges_for(reputation):
+    badges = []
+    if reputation.post_count > 0:
+        badges.append('first_post')
+    if reputation.comment_count >= 10:
+        badges.append('commenter')
+    if reputation.upvoted_post_count > 0:
+        badges.append('upvoted_post')
+    if reputation.points >= 1000:
+        badges.append('top_contributor')
+    if reputation.expert_answer_count >= 10:
+        badges.append('helper')
+    if reputation.anonymous_upvoted_post_count > 0:
+        badges.append('anonymous_advocate')
+    return badges
+
+
+def stats(reputation):
+    return {
+        'username': reputation.user.username,
+        'points': reputation.points,
+        'rank': rank_for(reputation.points),
+        'badges': badges_for(reputation),
+        'posts': reputation.post_count,
+        'comments': reputation.comment_count,
+        'upvotes_received': reputation.post_upvotes + reputation.comment_upvotes,
+        'downvotes_received': reputation.post_downvotes + reputation.comment_downvotes,
+        'eureka_answers': reputation.eureka_count,
+        'expert_answers': reputation.expert_answer_count,
+    }
+
+
+# Contributions: what one post or comment adds to its author's counters.
+# Anonymous posts earn no points (that would give the author away) but do
+# count toward the anonymous_advocate badge; deleted posts and anonymized
+# comments count for nothing.
+
+def post_contribution(state):
+    if state is None or state['is_deleted']:
+        return {}
+    popular = int(state['upvotes'] >= UPVOTED_POST_THRESHOLD)
+    if state['is_anonymous']:
+        return {'anonymous_upvoted_post_count': popular}
+    return {
+        'post_count': 1,
+        'post_upvotes': state['upvotes'],
+        'post_downvotes': state['downvotes'],
+        'upvoted_post_count': popular,
+    }
+
+
+def comment_contribution(state):
+    if state is None or state['is_anonymous']:
+        return {}
+    return {
+        'comment_count': 1,
+        'comment_upvotes': state['upvotes'],
+        'comment_downvotes': state['downvotes'],
+        'expert_answer_count': int(state['tag'] == 'Expert Answer'),
+    }
+
+
+def eureka_author(state):
+    if state is None or state['is_deleted'] or not state['eureka_comment']:
+        return None
+    return Comment.objects.filter(pk=state['eureka_comment']).values_list('author_id', flat=True).first()
+
+
+def snapshot(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+
+class ReputationChanges:
+    """Counter deltas per user, applied together."""
+
+    def __init__(self):
+        self.deltas = defaultdict(lambda: defaultdict(int))
+        self.points = defaultdict(int)
+
+    def add(self, user_id, counters, sign=1, post_id=None):
+        if user_id is None:
+            return
+        for field, value in counters.items():
+            self.deltas[user_id][field] += sign * value
+        self.points[user_id, post_id] += sign * points_for(counters)
+
+    def replace(self, user_id, before, after, post_id=None):
+        self.add(user_id, before, -1, post_id)
+        self.add(user_id, after, 1, post_id)
+
+    def apply(self):
+        """
+        One UPDATE per affected user, with F() expressions so concurrent
+        changes add up. Users without a row yet are skipped: their row is
+        built from scratch when it is first read, which includes this change.
+        """
+        for user_id, counters in self.deltas.items():
+            counters = {field: value for field, value in counters.items() if value}
+            if not counters:
+                continue
+            updates = {field: F(field) + value for field, value in counters.items()}
+            updates['points'] = F('points') + points_for(counters)
+            UserReputation.objects.filter(user_id=user_id).update(**updates)
+        points = [(user_id, post_id, delta) for (user_id, post_id), delta in self.points.items() if delta]
+        if points:
+            points_changed.send(sender=UserReputation, points=points)
+
+
+def post_changed(before, after):
+    changes = ReputationChanges()
+    post_id = (after or before)['id']
+    if before is not None and after is not None and before['author_id'] != after['author_id']:
+        changes.add(before['author_id'], post_contribution(before), -1, post_id)
+        changes.add(after['author_id'], post_contribution(after), 1, post_id)
+    else:
+        author_id = (after or before)['author_id']
+        changes.replace(author_id, post_contribution(before), post_contribution(after), post_id)
+
+    old_eureka = eureka_author(before)
+    new_eureka = eureka_author(after)
+    if old_eureka != new_eureka:
+        changes.add(old_eureka, {'eureka_count': 1}, -1, post_id)
+        changes.add(new_eureka, {'eureka_count': 1}, 1, post_id)
+    changes.apply()
+
+
+def comment_changed(before, after):
+    changes = ReputationChanges()
+    if before is not None:
+        changes.add(before['author_id'], comment_contribution(before), -1, before['post_id'])
+    if after is not None:
+        changes.add(after['author_id'], comment_contribution(after), 1, after['post_id'])
+    elif before is not None:
+        # A deleted eureka comment takes its credit with it. Comments go
+        # before their post in a cascade, so this runs while the post still
+        # points at it and the post's own delete finds nothing to undo.
+        eureka = Post.objects.filter(eureka_comment=before['id'], is_deleted=False).count()
+        changes.add(before['author_id'], {'eureka_count': eureka}, -1, before['post_id'])
+    changes.apply()
+
+
+def votes_applied(model, deltas):
+    """
+    Fold vote counter deltas `[(pk, upvotes, downvotes)]` that were applied
+    with update() (see main.votes) into the authors' reputation. The rows
+    are read back after the update; their state before is the read value
+    minus the delta.
+    """
+    if model not in (Post, Comment):
+        return
+    by_pk = {pk: (upvotes, downvotes) for pk, upvotes, downvotes in deltas if upvotes or downvotes}
+    if not by_pk:
+        return
+    fields, contribution = (POST_FIELDS, post_contribution) if model is Post else (COMMENT_FIELDS, comment_contribution)
+    changes = ReputationChanges()
+    for after in model.objects.filter(pk__in=by_pk).values('pk', *fields):
+        upvotes, downvotes = by_pk[after['pk']]
+        before = {**after, 'upvotes': after['upvotes'] - upvotes, 'downvotes': after['downvotes'] - downvotes}
+        post_id = after['pk'] if model is Post else after['post_id']
+        changes.replace(after['author_id'], contribution(before), contribution(after), post_id)
+    changes.apply()
+
+
+def compute(user_ids):
+    """Reputation counters of `user_ids` computed from the posts and comments themselves."""
+    counters = {user_id: dict.fromkeys(COUNTERS, 0) for user_id in user_ids}
+    public = Q(is_anonymous=False)
+    popular = Q(upvotes__gte=UPVOTED_POST_THRESHOLD)
+    posts = (
+        Post.objects.filter(author_id__in=user_ids, is_deleted=False)
+        .values('author_id')
+        .annotate(
+            post_count=Count('pk', filter=public),
+            post_upvotes=Sum('upvotes', filter=public, default=0),
+            post_downvotes=Sum('downvotes', filter=public, default=0),
+            upvoted_post_count=Count('pk', filter=public & popular),
+            anonymous_upvoted_post_count=Count('pk', filter=~public & popular),
+        )
+    )
+    comments = (
+        Comment.objects.filter(author_id__in=user_ids, is_anonymous=False)
+        .values('author_id')
+        .annotate(
+            comment_count=Count('pk'),
+            comment_upvotes=Sum('upvotes', default=0),
+            comment_downvotes=Sum('downvotes', default=0),
+            expert_answer_count=Count('pk', filter=Q(tag='Expert Answer')),
+        )
+    )
+    eureka = (
+        Comment.objects.filter(
+            author_id__in=user_ids,
+            pk__in=Post.objects.filter(is_deleted=False, eureka_comment__isnull=False).values('eureka_comment'),
+        )
+        .values('author_id')
+        .annotate(eureka_count=Count('pk'))
+    )
+    for rows in (posts, comments, eureka):
+        for row in rows:
+            counters[row.pop('author_id')].update(row)
+    return counters
+
+
+def rebuild(user_ids=None, batch_size=1000):
+    """Recompute reputation rows from scratch, for `user_ids` or every user. Returns the number of rows written."""
+    if user_ids is None:
+        user_ids = User.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+    user_ids = iter(user_ids)
+    written = 0
+    while True:
+        batch = [user_id for _, user_id in zip(range(batch_size), user_ids)]
+        if not batch:
+            return written
+        rows = [
+            UserReputation(user_id=user_id, points=points_for(counters), **counters)
+            for user_id, counters in compute(batch).items()
+        ]
+        UserReputation.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['user'], update_fields=[*COUNTERS, 'points'],
+        )
+        written += len(rows)
+
+
+def recredit(user_ids):
+    """
+    Rebuild the rows of `user_ids` after their posts or comments changed
+    through update(), which the signals never see, and send points_changed
+    for the points that moved so the leaderboards follow.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    before = dict(UserReputation.objects.filter(user_id__in=user_ids).values_list('user_id', 'points'))
+    rebuild(user_ids)
+    after = UserReputation.objects.filter(user_id__in=user_ids).values_list('user_id', 'points')
+    points = [(user_id, None, score - before.get(user_id, 0)) for user_id, score in after]
+    points = [change for change in points if change[2]]
+    if points:
+        points_changed.send(sender=UserReputation, points=points)
+
+
+def get_reputation(user):
+    """`user`'s reputation row, built on first use."""
+    try:
+        return UserReputation.objects.select_related('user').get(user=user)
+    except UserReputation.DoesNotExist:
+        rebuild([user.pk])
+        return UserReputation.objects.select_related('user').get(user=user)
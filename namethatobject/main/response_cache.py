@@ -0,0 +1,212 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 3600,
+    # Post list pages are kept at most this long (seconds). Votes don't
+    # retire them, so their counters and hot/top order may be this stale.
+    'LIST_TIMEOUT': 30,
+}
+
+POST_LIST = 'posts'
+
+
+def cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def get_cache():
+    return caches[cache_settings()['ALIAS']]
+
+
+def post_key(pk):
+    return f'post:{pk}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+def _version_key(key):
+    return f'version:{key}'
+
+
+def get_versions(keys):
+    """
+    Current version of each dependency key. Versions start from a clock
+    reading rather than 1, so a version key that was evicted never comes
+    back with a number that old cached entries were stored under.
+    """
+    cache = get_cache()
+    found = cache.get_many([_version_key(key) for key in keys])
+    versions = {}
+    for key in keys:
+        version = found.get(_version_key(key))
+        if version is None:
+            cache.add(_version_key(key), time.time_ns(), timeout=None)
+            version = cache.get(_version_key(key))
+        versions[key] = version
+    return versions
+
+
+async def aget_versions(keys):
+    """get_versions through the cache's async API."""
+    cache = get_cache()
+    found = await cache.aget_many([_version_key(key) for key in keys])
+    versions = {}
+    for key in keys:
+        version = found.get(_version_key(key))
+        if version is None:
+            await cache.aadd(_version_key(key), time.time_ns(), timeout=None)
+            version = await cache.aget(_version_key(key))
+        versions[key] = version
+    return versions
+
+
+def _bump(keys):
+    cache = get_cache()
+    for key in keys:
+        try:
+            cache.incr(_version_key(key))
+        except ValueError:
+            cache.set(_version_key(key), time.time_ns(), timeout=None)
+
+
+def invalidate(*keys):
+    """
+    Retire every cached response that depends on `keys`.
+
+    Bumped right away and again once the surrounding transaction commits,
+    so a request that read the old rows mid-transaction can't leave them
+    cached under the new version.
+    """
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_post(pk, counters_only=False):
+    """
+    Retire the cached detail of post `pk` and, unless only its vote counters
+    changed, every cached list page. Counter changes reach the lists when
+    their pages expire after `LIST_TIMEOUT`, so votes don't empty the list
+    cache.
+    """
+    if counters_only:
+        invalidate(post_key(pk))
+    else:
+        invalidate(post_key(pk), POST_LIST)
+
+
+def etag_for(data):
+    payload = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    return '"%s"' % hashlib.sha1(payload).hexdigest()
+
+
+def _not_modified(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # If-None-Match uses weak comparison, so a W/ prefix doesn't matter
+    etags = [tag.removeprefix('W/') for tag in parse_etags(header)]
+    return '*' in etags or etag in etags
+
+
+def _respond(request, data, etag):
+    if _not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    return response
+
+
+def _cache_key(request, versions):
+    fingerprint = '|'.join([
+        request.get_host(),
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        *(f'{key}={version}' for key, version in versions.items()),
+    ])
+    return 'response:' + hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def _timeout(config, depends_on):
+    return config['LIST_TIMEOUT'] if POST_LIST in depends_on else config['TIMEOUT']
+
+
+def cached_response(request, depends_on, render, discover=None):
+    """
+    Serve a read-only GET from the response cache.
+
+    `depends_on` are the dependency keys known up front (e.g. the post);
+    the entry is stored under their current versions, so bumping any of
+    them makes it unreachable. `render()` builds the uncached Response and
+    `discover(data)` may name further keys found in the rendered data (e.g.
+    the author), which are checked on every hit. Answers carry an ETag and
+    a matching `If-None-Match` gets a 304.
+    """
+    config = cache_settings()
+    if not config['ENABLED']:
+        return render()
+
+    cache = get_cache()
+    cache_key = _cache_key(request, get_versions(depends_on))
+    entry = cache.get(cache_key)
+    if entry is not None and get_versions(list(entry['depends'])) == entry['depends']:
+        return _respond(request, entry['data'], entry['etag'])
+
+    extra_keys = []
+    response = render()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    if discover is not None:
+        extra_keys = discover(response.data)
+    etag = etag_for(response.data)
+    cache.set(cache_key, {
+        'data': response.data,
+        'etag': etag,
+        'depends': get_versions(extra_keys),
+    }, timeout=_timeout(config, depends_on))
+    return _respond(request, response.data, etag)
+
+
+async def acached_response(request, depends_on, render, discover=None):
+    """
+    cached_response for the async views (see main.async_views): the same
+    entries, versions and ETags, so both paths share one cache, but read
+    and written through the cache's async API and with `render` awaited.
+    """
+    config = cache_settings()
+    if not config['ENABLED']:
+        return await render()
+
+    cache = get_cache()
+    cache_key = _cache_key(request, await aget_versions(depends_on))
+    entry = await cache.aget(cache_key)
+    if entry is not None and await aget_versions(list(entry['depends'])) == entry['depends']:
+        return _respond(request, entry['data'], entry['etag'])
+
+    extra_keys = []
+    response = await render()
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    if discover is not None:
+        extra_keys = discover(response.data)
+    etag = etag_for(response.data)
+    await cache.aset(cache_key, {
+        'data': response.data,
+        'etag': etag,
+        'depends': await aget_versions(extra_keys),
+    }, timeout=_timeout(config, depends_on))
+    return _respond(request, response.data, etag)
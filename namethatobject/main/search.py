@@ -0,0 +1,206 @@
+import re
+from html import escape
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .tags import TAG_FIELDS, parse_tags
+
+INDEXED_FIELDS = {'title', 'description', 'tags'}
+FTS_TABLE = 'main_post_fts'
+
+# Control characters the database wraps matches in; mark_matches() turns
+# them into <mark> tags once the rest of the text has been escaped
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+
+def tag_text(tags):
+    """Flatten Post.tags (dicts of name/description/wikidata_id, or bare strings) into searchable text."""
+    words = []
+    for tag in parse_tags(tags):
+        if isinstance(tag, dict):
+            words.extend(str(tag[field]) for field in TAG_FIELDS if tag.get(field))
+        elif tag:
+            words.append(str(tag))
+    return ' '.join(words)
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def mark_matches(text):
+    """
+    HTML for a highlighted field: `text` escaped, with the spans between
+    START_SEL and STOP_SEL wrapped in <mark>. Stray selectors in the stored
+    text can only ever produce balanced <mark> tags.
+    """
+    if text is None:
+        return None
+    html = []
+    marking = False
+    for part in re.split(f'([{START_SEL}{STOP_SEL}])', text):
+        if part == START_SEL:
+            if not marking:
+                html.append('<mark>')
+            marking = True
+        elif part == STOP_SEL:
+            if marking:
+                html.append('</mark>')
+            marking = False
+        else:
+            html.append(escape(part, quote=False))
+    if marking:
+        html.append('</mark>')
+    return ''.join(html)
+
+
+class SearchResult:
+    """`title` and `description` carry the backend's selectors, see mark_matches()."""
+
+    def __init__(self, post, rank, title, description):
+        self.post = post
+        self.rank = rank
+        self.highlight = {'title': mark_matches(title), 'description': mark_matches(description)}
+
+
+class PostgresSearchBackend:
+    """Ranked search over a weighted `Post.search_vector` tsvector column with a GIN index."""
+    config = 'english'
+
+    def index(self, post):
+        from .models import Post
+        Post.objects.filter(pk=post.pk).update(search_vector=(
+            SearchVector(Value(post.title), weight='A', config=self.config) +
+            SearchVector(Value(tag_text(post.tags)), weight='B', config=self.config) +
+            SearchVector(Value(post.description), weight='C', config=self.config)
+        ))
+
+    def remove(self, post):
+        pass
+
+    def query(self, text):
+        # All terms must match and the last one matches as a prefix while
+        # typing, as with FTS5; the terms are plain words, so quoting them
+        # keeps user input from being parsed as tsquery syntax.
+        terms = search_terms(text)
+        if not terms:
+            return None
+        raw = ' & '.join([*(f"'{term}'" for term in terms[:-1]), f"'{terms[-1]}':*"])
+        return SearchQuery(raw, search_type='raw', config=self.config)
+
+    def filter(self, queryset, text):
+        query = self.query(text)
+        if query is None:
+            return queryset.none()
+        return queryset.filter(search_vector=query)
+
+    def search(self, queryset, text, offset, limit):
+        query = self.query(text)
+        if query is None:
+            return []
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            title_highlight=SearchHeadline(
+                'title', query, config=self.config,
+                start_sel=START_SEL, stop_sel=STOP_SEL, highlight_all=True
+            ),
+            description_highlight=SearchHeadline(
+                'description', query, config=self.config,
+                start_sel=START_SEL, stop_sel=STOP_SEL, max_words=35, min_words=15
+            ),
+        ).order_by('-rank', '-id')
+        return [
+            SearchResult(post, post.rank, post.title_highlight, post.description_highlight)
+            for post in queryset[offset:offset + limit]
+        ]
+
+
+class SqliteSearchBackend:
+    """
+    FTS5 fallback used by the SQLite test database.
+
+    `main_post_fts` is a separate FTS5 table keyed by post id (its rowid);
+    it is created by migration 0005 and kept in sync from the Post signals.
+    """
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, description, tags) VALUES (%s, %s, %s, %s)',
+                [post.pk, post.title, post.description, tag_text(post.tags)]
+            )
+
+    def remove(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+
+    def query(self, text):
+        # Quote every term so user input can never be parsed as FTS5 syntax;
+        # the trailing * makes the last term match as a prefix while typing.
+        terms = search_terms(text)
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+
+    def filter(self, queryset, text):
+        match = self.query(text)
+        if match is None:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+
+    def search(self, queryset, text, offset, limit):
+        match = self.query(text)
+        if match is None:
+            return []
+        candidates, params = queryset.values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({FTS_TABLE}, 10.0, 1.0, 5.0), "
+                f"highlight({FTS_TABLE}, 0, %s, %s), "
+                f"snippet({FTS_TABLE}, 1, %s, %s, '...', 35) "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid IN ({candidates}) "
+                f"ORDER BY 2, rowid DESC LIMIT %s OFFSET %s",
+                [START_SEL, STOP_SEL, START_SEL, STOP_SEL, match, *params, limit, offset]
+            )
+            rows = cursor.fetchall()
+
+        posts = queryset.in_bulk([row[0] for row in rows])
+        return [
+            SearchResult(posts[pk], -score, title, description)
+            for pk, score, title, description in rows if pk in posts
+        ]
+
+
+class BasicSearchBackend:
+    """Unranked `icontains` search for databases without a full-text index."""
+
+    def index(self, post):
+        pass
+
+    def remove(self, post):
+        pass
+
+    def filter(self, queryset, text):
+        return queryset.filter(
+            Q(title__icontains=text) |
+            Q(description__icontains=text) |
+            Q(tags__icontains=text)
+        )
+
+    def search(self, queryset, text, offset, limit):
+        posts = self.filter(queryset, text).order_by('-created_at', '-id')[offset:offset + limit]
+        return [SearchResult(post, None, post.title, post.description) for post in posts]
+
+
+def get_search_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if connection.vendor == 'sqlite':
+        return SqliteSearchBackend()
+    return BasicSearchBackend()
+
@@ -0,0 +1,190 @@
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .leaderboards import rebuild as rebuild_leaderboards
+from .models import Comment, Post, PostTag, UserProfile
+from .ranking import refresh as refresh_feed_scores
+from .reputation import rebuild as rebuild_reputation
+from .search import get_search_backend
+from .suggest import reset_suggest_index
+from .tags import tag_values
+
+# (facet, values) pairs for synthetic Wikidata-style tags; ids are made up
+FACETS = [
+    ('material', ['metal', 'plastic', 'glass', 'wood', 'ceramic', 'stone', 'fabric', 'rubber', 'paper', 'leather']),
+    ('color', ['black', 'white', 'red', 'blue', 'green', 'yellow', 'brown', 'purple', 'gray']),
+    ('shape', ['circular', 'oval', 'square', 'rectangular', 'cylindrical', 'spherical', 'flat', 'curved']),
+    ('size', ['tiny', 'small', 'medium', 'large']),
+    ('purpose', ['tool', 'gadget', 'toy', 'kitchenware', 'furniture', 'decorative', 'office supply', 'collectible']),
+    ('origin', ['handmade', 'antique', 'modern', 'mass-produced', 'cultural artifact']),
+]
+OBJECTS = [
+    'spoon', 'key', 'gear', 'hinge', 'valve', 'spindle', 'buckle', 'clamp', 'nozzle', 'bobbin', 'crank',
+    'ferrule', 'grommet', 'sprocket', 'thimble', 'whisk', 'awl', 'caliper', 'pestle', 'trivet',
+]
+WORDS = (
+    'found this in my grandfather shed strange metal object with a handle and two holes '
+    'it has markings on one side and feels heavy does anyone know what it was used for '
+    'looks like part of a machine maybe kitchen tool or something from a workshop'
+).split()
+
+
+def tag_vocabulary():
+    """Every synthetic tag as a Post.tags entry: `{'name', 'description', 'wikidata_id'}`."""
+    tags = []
+    for facet, values in FACETS:
+        tags.extend({'name': value, 'description': facet} for value in values)
+    tags.extend({'name': name, 'description': 'object'} for name in OBJECTS)
+    return [{**tag, 'wikidata_id': f'Q{900000 + i}'} for i, tag in enumerate(tags)]
+
+
+def skewed(rng, maximum, alpha=1.3):
+    """A heavy-tailed count in [0, maximum]: most values small, a few large (votes, comments per post)."""
+    return min(maximum, int(rng.paretovariate(alpha)) - 1)
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def percentile(samples, fraction):
+    """The sample at `fraction` (e.g. 0.95) of the sorted timings, as the benchmarks report them."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+@contextmanager
+def explicit_created_at(*models):
+    """Let bulk_create keep the `created_at` values given instead of stamping now."""
+    fields = [model._meta.get_field('created_at') for model in models]
+    try:
+        for field in fields:
+            field.auto_now_add = False
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _batches(rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def seed(users=1000, posts=10000, comments=50000, days=365, max_depth=8, seed=573,
+         batch_size=5000, log=None):
+    """
+    Bulk-insert a synthetic community: `users` users, `posts` posts spread
+    over the last `days` days with two to six tags each, and `comments`
+    comments in reply trees up to `max_depth` deep, concentrated on a few
+    busy posts. Votes go straight into the counters (no ledger rows) with
+    the same heavy tail. Rows are written with bulk_create, so the derived
+    data that signals normally maintain (tag index, search index, feed
+    scores, reputation, leaderboards) is rebuilt once at the end.
+
+    Returns `{'users': [ids], 'posts': [ids], 'comments': [ids], 'tags': [names]}`.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now()
+    run = uuid.uuid4().hex[:6]
+    vocabulary = tag_vocabulary()
+
+    user_rows = User.objects.bulk_create(
+        [User(username=f'seed_{run}_{i}', password='!') for i in range(users)], batch_size=batch_size
+    )
+    UserProfile.objects.bulk_create([UserProfile(user=user) for user in user_rows], batch_size=batch_size)
+    user_ids = [user.pk for user in user_rows]
+    log(f'{len(user_ids)} users')
+
+    post_rows = []
+    for i in range(posts):
+        post_rows.append(Post(
+            title=f'{sentence(rng, 4)} {i}',
+            description=sentence(rng, rng.randint(10, 40)),
+            author_id=rng.choice(user_ids),
+            tags=rng.sample(vocabulary, rng.randint(2, 6)),
+            upvotes=skewed(rng, 5000),
+            downvotes=skewed(rng, 200, alpha=2.5),
+            is_anonymous=rng.random() < 0.05,
+            is_deleted=rng.random() < 0.02,
+            created_at=now - timedelta(seconds=rng.uniform(0, days * 86400)),
+        ))
+    with explicit_created_at(Post):
+        Post.objects.bulk_create(post_rows, batch_size=batch_size)
+    PostTag.objects.bulk_create(
+        [PostTag(post_id=post.pk, **values) for post in post_rows for values in tag_values(post.tags)],
+        batch_size=batch_size,
+    )
+    log(f'{len(post_rows)} posts')
+
+    # A few posts draw most of the discussion
+    weights = [1 + skewed(rng, 1000) for _ in post_rows]
+    targets = rng.choices(post_rows, weights=weights, k=comments)
+    targets.sort(key=lambda post: post.pk)
+    comment_ids = []
+    solved = []
+    with explicit_created_at(Comment):
+        for chunk in _batches(targets, batch_size):
+            # Comments of one post are created in order, so each can reply
+            # to any earlier one; depth is tracked to bound the trees
+            rows, depths, parents = [], {}, []
+            previous = {}
+            for post in chunk:
+                created_at = max(previous.get(post.pk, post.created_at), post.created_at) + timedelta(
+                    seconds=rng.uniform(60, 86400)
+                )
+                previous[post.pk] = created_at
+                earlier = [row for row in rows[-50:] if row.post_id == post.pk and depths[id(row)] < max_depth]
+                parent = rng.choice(earlier) if earlier and rng.random() < 0.6 else None
+                row = Comment(
+                    post_id=post.pk,
+                    author_id=rng.choice(user_ids),
+                    text=sentence(rng, rng.randint(5, 30)),
+                    tag=rng.choices(['Question', 'Hint', 'Expert Answer'], weights=[6, 3, 1])[0],
+                    upvotes=skewed(rng, 500),
+                    downvotes=skewed(rng, 50, alpha=2.5),
+                    created_at=min(created_at, now),
+                )
+                depths[id(row)] = depths[id(parent)] + 1 if parent is not None else 1
+                rows.append(row)
+                parents.append(parent)
+            # Parents must have ids before their replies are inserted
+            for depth in range(1, max_depth + 1):
+                level = [(row, parent) for row, parent in zip(rows, parents) if depths[id(row)] == depth]
+                for row, parent in level:
+                    row.parent_id = parent.pk if parent is not None else None
+                Comment.objects.bulk_create([row for row, _ in level], batch_size=batch_size)
+            comment_ids.extend(row.pk for row in rows)
+            solved.extend(
+                (row.post_id, row.pk) for row in rows
+                if row.tag == 'Expert Answer' and rng.random() < 0.3
+            )
+    answers = dict(solved)
+    for chunk in _batches(list(answers.items()), batch_size):
+        posts_by_pk = Post.objects.in_bulk([post_id for post_id, _ in chunk])
+        for post_id, comment_id in chunk:
+            posts_by_pk[post_id].eureka_comment = comment_id
+        Post.objects.bulk_update(posts_by_pk.values(), ['eureka_comment'])
+    log(f'{len(comment_ids)} comments, {len(answers)} solved posts')
+
+    backend = get_search_backend()
+    for post in post_rows:
+        backend.index(post)
+    reset_suggest_index()
+    refresh_feed_scores(batch_size=batch_size)
+    rebuild_reputation(user_ids, batch_size=batch_size)
+    rebuild_leaderboards(batch_size=batch_size)
+    log('search index, feed scores, reputation and leaderboards rebuilt')
+
+    return {
+        'users': user_ids,
+        'posts': [post.pk for post in post_rows],
+        'comments': comment_ids,
+        'tags': [tag['name'] for tag in vocabulary],
+    }
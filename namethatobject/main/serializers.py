@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from .images import srcset
 from .models import Post, Comment, UserProfile
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -32,6 +33,8 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'password', 'email', 'profile', 'profile_picture']
         extra_kwargs = {'password': {'write_only': True}}
+        # What the method fields read, for the query planner
+        read_sources = {'profile_picture': ['profile__profile_picture_url']}
 
     def create(self, validated_data):
         user = User.objects.create_user(
@@ -90,15 +93,21 @@ def clean_cloudinary_url(url):
 
 class PostSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
+    # `{format: "url 160w, url 320w, ..."}`, ready for <source srcset>
+    image_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
         fields = ['id', 'title', 'description', 'image',
-                 'image_url', 'created_at', 'tags',
+                 'image_url', 'image_srcset', 'image_placeholder',
+                 'video', 'video_url', 'audio', 'audio_url',
+                 'media_status', 'created_at', 'tags',
                  'author', 'upvotes', 'downvotes', 'eureka_comment',
                  'is_anonymous', 'parts_relation']
         read_only_fields = ['author', 'created_at', 'upvotes', 'downvotes', 
-                           'eureka_comment', 'image_url']
+                           'eureka_comment', 'image_url', 'video_url', 'audio_url',
+                           'media_status', 'image_placeholder']
+        read_sources = {'image_srcset': ['image_variants'], '*': ['is_deleted']}
 
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
@@ -121,6 +130,9 @@ class PostSerializer(serializers.ModelSerializer):
     def get_image_url(self, obj):
         return obj.image_url if obj.image_url else None
 
+    def get_image_srcset(self, obj):
+        return srcset(obj.image_variants)
+
     def get_video_url(self, obj):
         return obj.video_url if obj.video_url else None
 
@@ -141,3 +153,10 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'post', 'text', 'created_at', 'author', 'parent', 'replies', 'points', 'upvotes', 'downvotes', 'tag']
+        read_sources = {'points': ['upvotes', 'downvotes']}
+
+class ThreadCommentSerializer(CommentSerializer):
+    """Comment node of a `/posts/{id}/thread/` tree; `replies` is filled in with nested nodes."""
+
+    class Meta(CommentSerializer.Meta):
+        fields = [field for field in CommentSerializer.Meta.fields if field != 'replies']
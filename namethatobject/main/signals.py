@@ -0,0 +1,208 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import events, leaderboards, ranking
+from .models import Comment, Post, UserProfile, UserReputation
+from .reputation import (
+    COMMENT_FIELDS, POST_FIELDS, comment_changed, points_changed, post_changed, snapshot, votes_applied,
+)
+from .response_cache import POST_LIST, invalidate, invalidate_post, post_key, user_key
+from .search import INDEXED_FIELDS, get_search_backend
+from .suggest import update_suggest_index
+from .tags import sync_post_tags
+from .votes import vote_counters_changed
+
+
+@receiver(post_save, sender=Post)
+def index_post_for_search(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
+    update_suggest_index(instance, deleted=True)
+
+
+@receiver(post_save, sender=Post)
+def update_post_tag_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'tags' not in update_fields:
+        return
+    sync_post_tags(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_post_suggestions(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'tags', 'is_deleted'}.intersection(update_fields):
+        return
+    update_suggest_index(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    invalidate_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_cached_comment_post(sender, instance, **kwargs):
+    invalidate(post_key(instance.post_id))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_author(sender, instance, **kwargs):
+    # Saving a User saves its profile too, so this also covers username changes
+    invalidate(user_key(instance.user_id), POST_LIST)
+
+
+# Reputation: each save compares the row as it was in the database with
+# what is being written and applies the difference to the authors' totals.
+
+REPUTATION_FIELDS = {Post: POST_FIELDS, Comment: COMMENT_FIELDS}
+UNCHANGED = object()
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def remember_reputation_state(sender, instance, update_fields=None, **kwargs):
+    fields = REPUTATION_FIELDS[sender]
+    instance._reputation_before = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {field.removesuffix('_id') for field in fields}.intersection(update_fields):
+        # e.g. save(update_fields=['title']) can't change anything counted
+        instance._reputation_before = UNCHANGED
+        return
+    instance._reputation_before = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_reputation_on_save(sender, instance, **kwargs):
+    before = getattr(instance, '_reputation_before', None)
+    if before is UNCHANGED:
+        return
+    after = snapshot(instance, REPUTATION_FIELDS[sender])
+    if sender is Post:
+        post_changed(before, after)
+    else:
+        comment_changed(before, after)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def update_reputation_on_delete(sender, instance, **kwargs):
+    before = snapshot(instance, REPUTATION_FIELDS[sender])
+    if sender is Post:
+        post_changed(before, None)
+    else:
+        comment_changed(before, None)
+
+
+@receiver(vote_counters_changed)
+def update_reputation_on_vote(sender, deltas, **kwargs):
+    votes_applied(sender, deltas)
+
+
+@receiver(post_save, sender=User)
+def create_user_reputation(sender, instance, created, **kwargs):
+    if created:
+        UserReputation.objects.get_or_create(user=instance)
+
+
+# Leaderboards (see main.leaderboards)
+
+LEADERBOARD_FIELDS = {'tags', 'is_deleted', 'eureka_comment', 'upvotes', 'downvotes'}
+
+
+@receiver(post_save, sender=Post)
+def update_post_leaderboards(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not LEADERBOARD_FIELDS.intersection(update_fields):
+        return
+    leaderboards.post_saved(instance, created=created)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_leaderboards(sender, instance, **kwargs):
+    leaderboards.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_leaderboards(sender, instance, created, **kwargs):
+    if created:
+        leaderboards.comment_created(instance)
+
+
+@receiver(vote_counters_changed)
+def update_leaderboards_on_vote(sender, deltas, **kwargs):
+    leaderboards.votes_applied(sender, deltas)
+
+
+@receiver(points_changed)
+def update_user_leaderboards(sender, points, **kwargs):
+    leaderboards.credit_points(points)
+
+
+@receiver(post_delete, sender=User)
+def remove_user_from_leaderboards(sender, instance, **kwargs):
+    leaderboards.remove_user(instance.pk)
+
+
+# Feed ranking (see main.ranking). Full saves score the instance as it is
+# written; partial saves and counter updates rescore from the row.
+
+@receiver(pre_save, sender=Post)
+def score_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None:
+        ranking.apply_scores(instance)
+
+
+@receiver(post_save, sender=Post)
+def rescore_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(ranking.SCORE_FIELDS).intersection(update_fields):
+        ranking.rescore([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        ranking.comments_changed(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    ranking.comments_changed(instance.post_id, -1)
+
+
+@receiver(vote_counters_changed)
+def rescore_voted_posts(sender, deltas, **kwargs):
+    if sender is Post:
+        ranking.rescore([pk for pk, _, _ in deltas])
+
+
+# Live post event streams (see main.events)
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, **kwargs):
+    if created:
+        events.comment_created(instance)
+
+
+@receiver(vote_counters_changed)
+def publish_vote_counters(sender, deltas, **kwargs):
+    events.votes_applied(sender, deltas)
+
+
+@receiver(post_save, sender=Post)
+def publish_eureka(sender, instance, created, **kwargs):
+    # Reuses the row remember_reputation_state read before the save
+    before = getattr(instance, '_reputation_before', None)
+    if created or before is None or before is UNCHANGED:
+        return
+    if before['eureka_comment'] != instance.eureka_comment:
+        events.eureka_marked(instance)
@@ -0,0 +1,250 @@
+import itertools
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Post, PostTag
+from .tags import tag_values
+
+DEFAULT_MAX_TERMS = 500_000
+# Keys a search may scan per result asked for, so a one-letter prefix with a
+# `kinds` filter can't walk the whole index while holding its lock
+SCAN_FACTOR = 20
+
+
+def normalize_term(text):
+    return ' '.join(re.findall(r'\w+', (text or '').lower()))
+
+
+def term_keys(text):
+    """Every word-start suffix of `text`, so "brass sp" and "spoon" both find "Strange brass spoon"."""
+    words = normalize_term(text).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index for search-as-you-type.
+
+    Terms live in one sorted list of `(key, kind, ref)` tuples; a lookup is
+    a `bisect` to the first key >= the prefix followed by a forward scan of
+    at most `limit * SCAN_FACTOR` keys, so it costs O(log n + limit) however
+    many terms are indexed.
+    Entries are added and removed incrementally. Once `max_terms` keys are
+    stored, the least recently added entries are evicted first.
+    """
+
+    def __init__(self, max_terms=DEFAULT_MAX_TERMS):
+        self.max_terms = max_terms
+        self.lock = threading.RLock()
+        self.keys = []
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, kind, ref, label, extra=None, text=None):
+        """Index `(kind, ref)` under every word start of `text` (defaults to `label`)."""
+        keys = sorted(term_keys(text if text is not None else label))
+        if not keys:
+            return
+        with self.lock:
+            self._remove((kind, ref))
+            self.entries[(kind, ref)] = (label, extra or {}, keys)
+            for key in keys:
+                insort(self.keys, (key, kind, ref))
+            while len(self.keys) > self.max_terms and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)))
+
+    def bulk_add(self, items):
+        """
+        Add many `(kind, ref, label, extra)` entries with a single sort,
+        instead of one `insort` each. Later items win when the cap is hit.
+        """
+        batch = OrderedDict()
+        for kind, ref, label, extra in items:
+            keys = sorted(term_keys(label))
+            if keys:
+                batch[(kind, ref)] = (label, extra or {}, keys)
+
+        # Drop the earliest items up front rather than inserting and evicting them
+        budget = self.max_terms
+        kept = []
+        for entry, stored in reversed(batch.items()):
+            budget -= len(stored[2])
+            if budget < 0 and kept:
+                break
+            kept.append((entry, stored))
+
+        with self.lock:
+            for entry, _ in kept:
+                self._remove(entry)
+            for entry, stored in reversed(kept):
+                self.entries[entry] = stored
+                self.keys.extend((key,) + entry for key in stored[2])
+            self.keys.sort()
+            while len(self.keys) > self.max_terms and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)))
+
+    def remove(self, kind, ref):
+        with self.lock:
+            self._remove((kind, ref))
+
+    def _remove(self, entry):
+        stored = self.entries.pop(entry, None)
+        if stored is None:
+            return
+        for key in stored[2]:
+            position = bisect_left(self.keys, (key,) + entry)
+            if position < len(self.keys) and self.keys[position] == (key,) + entry:
+                del self.keys[position]
+
+    def contains(self, kind, ref):
+        with self.lock:
+            return (kind, ref) in self.entries
+
+    def search(self, prefix, limit=5, kinds=None):
+        prefix = normalize_term(prefix)
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self.lock:
+            position = bisect_left(self.keys, (prefix,))
+            end = min(len(self.keys), position + limit * SCAN_FACTOR)
+            while position < end and len(results) < limit:
+                key, kind, ref = self.keys[position]
+                position += 1
+                if not key.startswith(prefix):
+                    break
+                if (kind, ref) in seen or (kinds and kind not in kinds):
+                    continue
+                seen.add((kind, ref))
+                label, extra, _ = self.entries[(kind, ref)]
+                results.append({'kind': kind, 'id': ref, 'label': label, **extra})
+        return results
+
+
+def index_post(index, post):
+    if post.is_deleted:
+        index.remove('post', post.pk)
+        return
+    index.add('post', post.pk, post.title)
+    for values in tag_values(post.tags):
+        add_tag(index, values['name'], values['description'], values['wikidata_id'])
+
+
+def tag_entry(name, description, wikidata_id):
+    ref = wikidata_id or f'{description}:{name}'
+    return 'tag', ref, name, {'description': description, 'wikidata_id': wikidata_id or None}
+
+
+def add_tag(index, name, description, wikidata_id):
+    kind, ref, label, extra = tag_entry(name, description, wikidata_id)
+    if not index.contains(kind, ref):
+        index.add(kind, ref, label, extra)
+
+
+def build_index(max_terms=None):
+    """Build an index from the newest posts and every known tag, within the term cap."""
+    if max_terms is None:
+        max_terms = getattr(settings, 'SUGGEST_INDEX_MAX_TERMS', DEFAULT_MAX_TERMS)
+    index = PrefixIndex(max_terms=max_terms)
+    tags = PostTag.objects.values_list('name', 'description', 'wikidata_id').distinct()
+    # Oldest posts last in line, so when the cap is hit it is old posts that get evicted
+    posts = Post.objects.filter(is_deleted=False).order_by('created_at', 'id')
+    index.bulk_add(itertools.chain(
+        (tag_entry(*tag) for tag in tags.iterator()),
+        (('post', pk, title, None) for pk, title in posts.values_list('pk', 'title').iterator()),
+    ))
+    return index
+
+
+_index = None
+_index_built_at = 0.0
+_index_lock = threading.Lock()
+# The background rebuild in progress, and the changes made while it runs,
+# which its snapshot of the tables may have missed
+_rebuild = None
+_missed_changes = []
+
+
+def get_suggest_index():
+    """
+    The process-wide index, built on first use. Signals keep it current for
+    changes made in this process; every `SUGGEST_INDEX_TTL` seconds it is
+    rebuilt in a background thread to pick up changes made by other workers,
+    while requests keep using the old index until the new one is swapped in.
+    """
+    global _index, _index_built_at, _rebuild
+    ttl = getattr(settings, 'SUGGEST_INDEX_TTL', 600)
+    with _index_lock:
+        if _index is None:
+            _index = build_index()
+            _index_built_at = time.monotonic()
+        elif _rebuild is None and time.monotonic() - _index_built_at > ttl:
+            _rebuild = threading.Thread(target=_rebuild_index, name='suggest-index-rebuild', daemon=True)
+            _rebuild.start()
+        return _index
+
+
+def _rebuild_index():
+    global _index, _index_built_at, _rebuild
+    index = None
+    try:
+        index = build_index()
+    except Exception as e:
+        print(f"Error rebuilding suggest index: {e}")
+    finally:
+        connection.close()
+    with _index_lock:
+        if index is not None and _index is not None:
+            for change in _missed_changes:
+                _apply_change(index, *change)
+            _index = index
+        # Retried after another TTL when the build failed
+        _index_built_at = time.monotonic()
+        _missed_changes.clear()
+        _rebuild = None
+
+
+def _apply_change(index, post, deleted):
+    if deleted:
+        index.remove('post', post.pk)
+    else:
+        index_post(index, post)
+
+
+def _record_change(post, deleted):
+    with _index_lock:
+        if _rebuild is not None:
+            _missed_changes.append((post, deleted))
+
+
+def update_suggest_index(post, deleted=False):
+    """Apply a Post change to the index if it has been built in this process."""
+    if _index is None:
+        return
+    _record_change(post, deleted)
+    _apply_change(_index, post, deleted)
+
+
+def remove_posts_from_suggest_index(post_ids):
+    """Drop posts that were deleted with update() from the index if it has been built in this process."""
+    if _index is None:
+        return
+    for pk in post_ids:
+        post = Post(pk=pk)
+        _record_change(post, True)
+        _apply_change(_index, post, True)
+
+
+def reset_suggest_index():
+    global _index
+    with _index_lock:
+        _index = None
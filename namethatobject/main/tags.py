@@ -0,0 +1,99 @@
+import json
+
+from django.db.models import Count, Exists, OuterRef
+
+from .models import PostTag
+
+TAG_FIELDS = ('name', 'description', 'wikidata_id')
+MAX_LENGTHS = {'name': 255, 'description': 255, 'wikidata_id': 32}
+
+
+def parse_tags(tags):
+    """
+    Post.tags as a list. Multipart post forms send the tag list as a JSON
+    string, which the JSONField then stores as-is, so decode that here.
+    """
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except ValueError:
+            return []
+    if not isinstance(tags, list):
+        return []
+    return tags
+
+
+def normalize(field, value):
+    """Index key for a tag value; name and description (the facet) match case-insensitively."""
+    value = str(value or '').strip()
+    if field != 'wikidata_id':
+        value = value.lower()
+    return value[:MAX_LENGTHS[field]]
+
+
+def tag_values(tags):
+    """Normalized, de-duplicated PostTag field values for a Post.tags value."""
+    rows = {}
+    for tag in parse_tags(tags):
+        if isinstance(tag, dict):
+            values = {field: normalize(field, tag.get(field)) for field in TAG_FIELDS}
+        else:
+            values = {'name': normalize('name', tag), 'description': '', 'wikidata_id': ''}
+        if values['name'] or values['wikidata_id']:
+            rows[tuple(values.values())] = values
+    return list(rows.values())
+
+
+def sync_post_tags(post):
+    """Rebuild the PostTag rows of one post from its `tags` JSON."""
+    PostTag.objects.filter(post_id=post.pk).delete()
+    PostTag.objects.bulk_create(PostTag(post_id=post.pk, **values) for values in tag_values(post.tags))
+
+
+def parse_facet(facet):
+    """`"material:metal"` -> ('material', 'metal'); a bare `"material"` matches any tag in that facet."""
+    description, _, name = facet.partition(':')
+    return normalize('description', description), normalize('name', name)
+
+
+def filter_by_tags(queryset, name=None, description=None, wikidata_id=None, tags=(), facets=()):
+    """
+    Narrow a Post queryset through the PostTag index.
+
+    `name`/`description`/`wikidata_id` each match any one tag of the post;
+    every entry of `tags` (Wikidata ids) and `facets` (`description[:name]`)
+    must be matched by some tag, so each one is a separate indexed
+    EXISTS lookup rather than a scan of the tags JSON.
+    """
+    lookups = []
+    for field, value in (('name', name), ('description', description), ('wikidata_id', wikidata_id)):
+        if value:
+            lookups.append({field: normalize(field, value)})
+    for wikidata in tags:
+        lookups.append({'wikidata_id': normalize('wikidata_id', wikidata)})
+    for facet in facets:
+        facet_description, facet_name = parse_facet(facet)
+        lookup = {'description': facet_description}
+        if facet_name:
+            lookup['name'] = facet_name
+        lookups.append(lookup)
+
+    for lookup in lookups:
+        queryset = queryset.filter(Exists(PostTag.objects.filter(post=OuterRef('pk'), **lookup)))
+    return queryset
+
+
+def facet_counts(queryset, descriptions=None):
+    """
+    `{facet: {name: post count}}` over the posts of `queryset`, computed with
+    a single GROUP BY on the PostTag index.
+    """
+    rows = PostTag.objects.filter(post__in=queryset.values('pk')).exclude(description='')
+    if descriptions:
+        rows = rows.filter(description__in=[normalize('description', d) for d in descriptions])
+    rows = rows.values('description', 'name').annotate(count=Count('post', distinct=True))
+
+    counts = {}
+    for row in rows.order_by('description', '-count', 'name'):
+        counts.setdefault(row['description'], {})[row['name']] = row['count']
+    return counts
@@ -0,0 +1,124 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.accounts import DELETED_USERNAME, delete_account, deleted_user
+from main.models import AccountDeletion, Post, Comment, LeaderboardScore, UserReputation, Vote
+from main.reputation import COUNTERS, UPVOTED_POST_THRESHOLD, compute, get_reputation
+from main.votes import cast_vote
+
+class DeleteAccountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser')
+        self.other = User.objects.create_user(username='other')
+        self.client.force_authenticate(user=self.user)
+
+    def create_content(self, posts=3):
+        """`posts` posts by the user, every other one with comments."""
+        created = []
+        for i in range(posts):
+            post = Post.objects.create(title=f'Post {i}', description='Test Description', author=self.user)
+            if i % 2 == 0:
+                Comment.objects.create(post=post, author=self.other, text='Test Comment')
+                Comment.objects.create(post=post, author=self.user, text='My Comment')
+            cast_vote(self.other, post, Vote.UPVOTE, vote_buffer=None)
+            created.append(post)
+        return created
+
+    def test_posts_and_comments_outlive_the_account(self):
+        commented, quiet, _ = self.create_content()
+        response = self.client.delete(reverse('delete_account'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertFalse(User.objects.filter(username='testuser').exists())
+        placeholder = User.objects.get(username=DELETED_USERNAME)
+        self.assertFalse(placeholder.is_active)
+        self.assertFalse(placeholder.has_usable_password())
+
+        commented.refresh_from_db()
+        quiet.refresh_from_db()
+        self.assertEqual((commented.author, commented.is_anonymous, commented.is_deleted), (placeholder, True, False))
+        self.assertEqual((quiet.author, quiet.is_deleted), (placeholder, True))
+        self.assertEqual(Comment.objects.filter(author=placeholder, is_anonymous=True).count(), 2)
+        self.assertEqual(Comment.objects.filter(author=self.other).count(), 2)
+        self.assertFalse(LeaderboardScore.objects.filter(subject_id=quiet.pk, board__startswith='posts:').exists())
+
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual([post['title'] for post in response.data['results']], ['Post 2', 'Post 0'])
+
+    def test_other_users_keep_their_reputation(self):
+        commented, _, _ = self.create_content()
+        eureka = Comment.objects.get(post=commented, author=self.other)
+        commented.eureka_comment = eureka.pk
+        commented.save()
+        before = get_reputation(self.other)
+        self.assertEqual(before.eureka_count, 1)
+
+        delete_account(self.user)
+        after = get_reputation(self.other)
+        self.assertEqual(
+            (after.eureka_count, after.comment_count, after.points),
+            (1, before.comment_count, before.points)
+        )
+
+    def test_placeholder_reputation_follows_the_hand_over(self):
+        placeholder = deleted_user()
+        get_reputation(placeholder)
+        post, _, _ = self.create_content()
+        Post.objects.filter(pk=post.pk).update(upvotes=UPVOTED_POST_THRESHOLD)
+
+        delete_account(self.user)
+        row = UserReputation.objects.get(user=placeholder)
+        self.assertEqual(row.anonymous_upvoted_post_count, 1)
+        self.assertEqual(
+            {counter: getattr(row, counter) for counter in COUNTERS},
+            compute([placeholder.pk])[placeholder.pk]
+        )
+
+    def test_query_count_does_not_grow_with_the_account(self):
+        def count_queries(user, posts):
+            self.user = user
+            self.create_content(posts)
+            with CaptureQueriesContext(connection) as queries:
+                delete_account(user)
+            return len(queries)
+
+        deleted_user()
+        few = count_queries(self.user, 2)
+        many = count_queries(User.objects.create_user(username='prolific'), 40)
+        self.assertEqual(few, many)
+        self.assertLess(many, 40)
+
+    @override_settings(ACCOUNT_DELETION={'BACKGROUND_THRESHOLD': 5, 'BATCH_SIZE': 2, 'EAGER': True})
+    def test_large_accounts_are_deleted_in_the_background(self):
+        self.create_content(posts=4)
+        Token.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('delete_account'))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['total'], 6)
+
+        status_response = self.client.get(response.data['status_url'])
+        self.assertEqual(status_response.data['status'], AccountDeletion.DONE)
+        self.assertEqual(status_response.data['progress'], 1.0)
+        self.assertFalse(User.objects.filter(username='testuser').exists())
+        self.assertEqual(Post.objects.filter(author__username=DELETED_USERNAME).count(), 4)
+
+    def test_background_jobs_resume(self):
+        self.create_content(posts=2)
+        with override_settings(ACCOUNT_DELETION={'EAGER': False}):
+            response = self.client.delete(reverse('delete_account') + '?background=true')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+
+        call_command('process_account_deletions', stdout=io.StringIO())
+        self.assertEqual(AccountDeletion.objects.get().status, AccountDeletion.DONE)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
@@ -0,0 +1,69 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from main.models import Post, Comment
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class AsyncReadViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser')
+        self.posts = [
+            Post.objects.create(
+                title=f'Brass spoon {i}', description='Test Description', author=self.user,
+                tags=[{'name': 'spoon', 'description': 'object', 'wikidata_id': 'Q81980'}] if i % 2 else [],
+            )
+            for i in range(5)
+        ]
+        post = self.posts[0]
+        root = Comment.objects.create(post=post, author=self.user, text='Root Comment')
+        reply = Comment.objects.create(post=post, author=self.user, text='Reply', parent=root)
+        Comment.objects.create(post=post, author=self.user, text='Nested Reply', parent=reply)
+
+    async def assertSameResponse(self, sync_url, async_url):
+        sync_response = await self.async_client.get(sync_url)
+        async_response = await self.async_client.get(async_url)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response['Content-Type'], sync_response['Content-Type'])
+        # Pagination links point back at whichever path was asked
+        sync_content = sync_response.content.replace(b'/posts/', b'/async/posts/')
+        self.assertEqual(async_response.content, sync_content)
+
+    async def test_list_matches_sync_view(self):
+        for query in ['', '?ordering=hot&page_size=2', '?ordering=unsolved', '?tag_name=spoon', '?search=spoon',
+                      '?ordering=random']:
+            await self.assertSameResponse(reverse('post-list') + query, reverse('async_post_list') + query)
+
+        first = await self.async_client.get(reverse('async_post_list') + '?page_size=2')
+        second = await self.async_client.get(first.json()['next'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()['results']), 2)
+
+    async def test_detail_thread_and_search_match_sync_views(self):
+        pk = self.posts[0].pk
+        await self.assertSameResponse(reverse('post-detail', args=[pk]), reverse('async_post_detail', args=[pk]))
+        await self.assertSameResponse(reverse('post-detail', args=[999]), reverse('async_post_detail', args=[999]))
+        for query in ['', '?depth=1', '?limit=0', '?limit=1&depth=2']:
+            await self.assertSameResponse(
+                reverse('post-thread', args=[pk]) + query, reverse('async_post_thread', args=[pk]) + query
+            )
+        for query in ['?q=spoon', '?q=spoon&limit=2', '?q=', '?q=spoon&offset=-1']:
+            await self.assertSameResponse(reverse('post-search') + query, reverse('async_post_search') + query)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': True})
+    async def test_cached_responses_are_invalidated(self):
+        url = reverse('async_post_detail', args=[self.posts[0].pk])
+        response = await self.async_client.get(url)
+        etag = response['ETag']
+        response = await self.async_client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        post = self.posts[0]
+        post.title = 'Renamed'
+        await post.asave(update_fields=['title'])
+        response = await self.async_client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Renamed')
+
+    async def test_writes_are_not_allowed(self):
+        response = await self.async_client.post(reverse('async_post_list'), {})
+        self.assertEqual(response.status_code, 405)
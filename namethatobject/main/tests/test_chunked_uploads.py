@@ -0,0 +1,220 @@
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import tracemalloc
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.chunked_uploads import BLOCK_SIZE, attach_upload, purge_expired, write_chunk
+from main.models import ChunkedUpload, MediaUpload, Post
+
+def checksum(data):
+    return 'sha256 ' + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+class GeneratedStream:
+    """Request body stand-in that produces `size` bytes on demand without holding them."""
+
+    def __init__(self, size):
+        self.remaining = size
+
+    def read(self, size):
+        block = b'\x07' * min(size, self.remaining)
+        self.remaining -= len(block)
+        return block
+
+
+class ChunkedUploadTest(TestCase):
+    def setUp(self):
+        self.upload_dir = tempfile.mkdtemp()
+        self.staging_dir = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        for directory in (self.upload_dir, self.staging_dir, self.media_root):
+            self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+            CHUNKED_UPLOADS={'DIR': self.upload_dir, 'MAX_SIZE': 1024 ** 3},
+            MEDIA_PIPELINE={'BACKEND': 'local', 'STAGING_DIR': self.staging_dir, 'EAGER': True},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.data = os.urandom(300 * 1024)
+
+    def start_upload(self, kind='video', length=None):
+        response = self.client.post(reverse('chunked_upload_list'), {
+            'kind': kind,
+            'filename': 'clip.mp4',
+            'length': len(self.data) if length is None else length,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response
+
+    def send(self, location, offset, chunk, digest=None):
+        return self.client.generic(
+            'PATCH', location, chunk,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+            HTTP_UPLOAD_CHECKSUM=digest or checksum(chunk),
+        )
+
+    def upload_all(self, location, chunk_size=100 * 1024):
+        for offset in range(0, len(self.data), chunk_size):
+            response = self.send(location, offset, self.data[offset:offset + chunk_size])
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_upload_in_chunks(self):
+        location = self.start_upload()['Location']
+        self.upload_all(location)
+
+        response = self.client.head(location)
+        self.assertEqual(response['Upload-Offset'], str(len(self.data)))
+        upload = ChunkedUpload.objects.get()
+        self.assertEqual(upload.status, ChunkedUpload.COMPLETE)
+        with open(upload.path, 'rb') as part:
+            self.assertEqual(part.read(), self.data)
+
+    def test_resume_after_checksum_mismatch(self):
+        location = self.start_upload()['Location']
+        self.assertEqual(self.send(location, 0, self.data[:1000]).status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.send(location, 1000, self.data[1000:2000], digest=checksum(b'something else'))
+        self.assertEqual(response.status_code, 460)
+        self.assertEqual(response['Upload-Offset'], '1000')
+        self.assertEqual(os.path.getsize(ChunkedUpload.objects.get().path), 1000)
+
+        # The client asks where to resume and sends the rest
+        self.assertEqual(self.client.get(location).data['offset'], 1000)
+        self.assertEqual(self.send(location, 1000, self.data[1000:]).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.COMPLETE)
+
+    def test_rejects_bad_chunks(self):
+        location = self.start_upload()['Location']
+        self.assertEqual(self.send(location, 5, self.data[:10]).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            self.send(location, 0, self.data + b'extra').status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        self.assertEqual(self.send(location, 0, self.data[:10], digest='crc32 AAAA').status_code, 400)
+        response = self.client.patch(location, {'chunk': 'x'}, format='json', HTTP_UPLOAD_OFFSET='0')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_validates_new_uploads(self):
+        url = reverse('chunked_upload_list')
+        self.assertEqual(self.client.post(url, {'kind': 'image', 'length': 10}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'kind': 'video', 'length': 'big'}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'kind': 'video', 'length': 1024 ** 4}).status_code, 413)
+
+    def test_uploads_are_private(self):
+        location = self.start_upload()['Location']
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.head(location).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.send(location, 0, self.data).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_attach_to_new_post(self):
+        location = self.start_upload()['Location']
+        self.upload_all(location)
+        upload_id = location.rstrip('/').split('/')[-1]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post-list'), {
+                'title': 'Test Post',
+                'description': 'Test Description',
+                'video_upload': upload_id,
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        post = Post.objects.get()
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertEqual(post.video_url, '/media/mystery_videos/clip.mp4')
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.ATTACHED)
+        with open(os.path.join(self.media_root, 'mystery_videos', 'clip.mp4'), 'rb') as video:
+            self.assertEqual(video.read(), self.data)
+
+    def test_incomplete_uploads_cannot_be_attached(self):
+        location = self.start_upload()['Location']
+        self.send(location, 0, self.data[:10])
+        response = self.client.post(reverse('post-list'), {
+            'title': 'Test Post',
+            'description': 'Test Description',
+            'video_upload': location.rstrip('/').split('/')[-1],
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+
+    def test_attach_to_existing_post(self):
+        post = Post.objects.create(title='Test Post', description='Test Description', author=self.user)
+        location = self.start_upload(kind='audio')['Location']
+        self.upload_all(location)
+        upload_id = location.rstrip('/').split('/')[-1]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post-attach-media', kwargs={'pk': post.pk}), {'upload': upload_id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(MediaUpload.objects.get().kind, 'audio')
+        self.assertEqual(Post.objects.get().audio_url, '/media/mystery_audio/clip.mp4')
+
+        response = self.client.post(reverse('post-attach-media', kwargs={'pk': post.pk}), {'upload': upload_id})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_rolled_back_attach_leaves_the_file(self):
+        post = Post.objects.create(title='Test Post', description='Test Description', author=self.user)
+        self.upload_all(self.start_upload()['Location'])
+        upload = ChunkedUpload.objects.get()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                attach_upload(upload, post)
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, ChunkedUpload.COMPLETE)
+        with open(upload.path, 'rb') as part:
+            self.assertEqual(part.read(), self.data)
+        self.assertEqual(os.listdir(self.staging_dir), [])
+
+    def test_cancel_and_expire(self):
+        location = self.start_upload()['Location']
+        path = ChunkedUpload.objects.get().path
+        self.assertEqual(self.client.delete(location).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(os.path.exists(path))
+
+        self.start_upload()
+        ChunkedUpload.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(purge_expired(), 1)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_memory_does_not_grow_with_chunk_size(self):
+        size = 32 * 1024 * 1024
+        upload = ChunkedUpload.objects.create(
+            user=self.user, kind='video', filename='big.mp4', length=size,
+            path=os.path.join(self.upload_dir, 'big.part')
+        )
+        open(upload.path, 'wb').close()
+        digest = hashlib.sha256(b'\x07' * size).digest()
+
+        tracemalloc.start()
+        try:
+            write_chunk(upload, 0, GeneratedStream(size), size, 'sha256 ' + base64.b64encode(digest).decode())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(os.path.getsize(upload.path), size)
+        self.assertLess(peak, 8 * BLOCK_SIZE)
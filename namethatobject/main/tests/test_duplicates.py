@@ -0,0 +1,147 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image, ImageDraw
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.duplicates import band_neighbours, distance, find_similar, hash_fields, to_signed, to_unsigned
+from main.models import Post, PostImageHash
+
+def picture(seed, size=(640, 480), quality=90):
+    """A few shapes on a gradient; different seeds give unrelated pictures."""
+    image = Image.linear_gradient('L').resize((640, 480)).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for i in range(4):
+        x, y = (seed * 97 + i * 151) % 640, (seed * 61 + i * 89) % 480
+        draw.ellipse([x - 80, y - 60, x + 80, y + 60], fill=((seed * 50 + i * 70) % 256, 40 * i, 200))
+    buffer = io.BytesIO()
+    image.resize(size).save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class DuplicateIndexTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+
+    def add_hash(self, value, **kwargs):
+        post = Post.objects.create(title='Test Post', description='Test Description', author=self.user, **kwargs)
+        PostImageHash.objects.create(post=post, **hash_fields(value))
+        return post
+
+    def test_signed_storage_round_trips(self):
+        for value in (0, 1, 2 ** 63 - 1, 2 ** 63, 2 ** 64 - 1):
+            self.assertEqual(to_unsigned(to_signed(value)), value)
+        post = self.add_hash(2 ** 64 - 1)
+        self.assertEqual(find_similar(2 ** 64 - 1)[0]['id'], post.pk)
+
+    def test_band_neighbours(self):
+        self.assertEqual(band_neighbours(0, 0), [0])
+        self.assertEqual(len(band_neighbours(0, 1)), 17)
+        self.assertEqual(len(set(band_neighbours(0b1010, 2))), 1 + 16 + 120)
+
+    def test_finds_every_hash_within_max_distance(self):
+        base = 0x0123456789ABCDEF
+        # Six flipped bits spread over all four bands: no band matches exactly
+        near = base ^ (0b11 | 0b11 << 16 | 0b1 << 32 | 0b1 << 48)
+        self.assertEqual(distance(base, near), 6)
+        close = self.add_hash(near)
+        far = self.add_hash(base ^ 0xFF)
+        self.add_hash(~base & (2 ** 64 - 1))
+
+        results = find_similar(base, max_distance=6)
+        self.assertEqual([result['id'] for result in results], [close.pk])
+        self.assertEqual(results[0]['distance'], 6)
+        self.assertEqual([result['id'] for result in find_similar(base, max_distance=8)], [close.pk, far.pk])
+
+    def test_excludes_deleted_posts_and_self(self):
+        own = self.add_hash(42)
+        self.add_hash(43, is_deleted=True)
+        self.assertEqual(find_similar(42, exclude=own.pk), [])
+
+
+class DuplicateDetectionApiTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.staging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.staging_dir, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+            MEDIA_PIPELINE={'BACKEND': 'local', 'STAGING_DIR': self.staging_dir, 'EAGER': True},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_post(self, data, name='photo.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post-list'), {
+                'title': 'Test Post',
+                'description': 'Test Description',
+                'image': SimpleUploadedFile(name, data, content_type='image/jpeg'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response
+
+    def test_create_reports_reposts(self):
+        first = self.create_post(picture(1))
+        self.assertEqual(first.data['similar_mysteries'], [])
+        self.create_post(picture(2))
+
+        # Same picture, smaller and recompressed
+        repost = self.create_post(picture(1, size=(320, 240), quality=50), name='again.jpg')
+        similar = repost.data['similar_mysteries']
+        self.assertEqual([match['id'] for match in similar], [first.data['id']])
+        self.assertEqual(similar[0]['title'], 'Test Post')
+
+        response = self.client.get(reverse('post-similar', kwargs={'pk': first.data['id']}))
+        self.assertEqual([match['id'] for match in response.data['results']], [repost.data['id']])
+
+    def test_posts_without_images(self):
+        response = self.client.post(reverse('post-list'), {'title': 'Test Post', 'description': 'Test Description'})
+        self.assertEqual(response.data['similar_mysteries'], [])
+        self.assertEqual(self.client.get(reverse('post-similar', kwargs={'pk': response.data['id']})).data['results'], [])
+
+    def test_unreadable_images_are_not_indexed(self):
+        response = self.create_post(b'not an image')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(PostImageHash.objects.exists())
+
+    def test_backfill_command(self):
+        os.makedirs(os.path.join(self.media_root, 'mystery_images'))
+        for name, seed in (('old.jpg', 1), ('older.jpg', 1), ('other.jpg', 2)):
+            with open(os.path.join(self.media_root, 'mystery_images', name), 'wb') as original:
+                original.write(picture(seed))
+            Post.objects.create(
+                title=name, description='Test Description', author=self.user,
+                image_url=f'/media/mystery_images/{name}'
+            )
+        Post.objects.create(title='missing', description='', author=self.user, image_url='/media/nowhere.jpg')
+
+        stderr = io.StringIO()
+        call_command('backfill_image_hashes', workers=2, stdout=io.StringIO(), stderr=stderr)
+        self.assertEqual(PostImageHash.objects.count(), 3)
+        self.assertIn('Post', stderr.getvalue())
+
+        old, older = Post.objects.get(title='old.jpg'), Post.objects.get(title='older.jpg')
+        self.assertEqual(
+            [match['id'] for match in find_similar(to_unsigned(old.image_hash.dhash), exclude=old.pk)],
+            [older.pk]
+        )
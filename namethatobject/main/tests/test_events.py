@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from main.events import get_broker, reset_broker, stream
+from main.models import Post, Comment, Vote
+from main.votes import cast_vote
+
+def parse_event(chunk):
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+class PostEventStreamTest(TestCase):
+    def setUp(self):
+        reset_broker()
+        self.user = User.objects.create_user(username='testuser')
+        self.voter = User.objects.create_user(username='voter')
+        self.post = Post.objects.create(title='Test Post', description='Test Description', author=self.user)
+
+    def tearDown(self):
+        reset_broker()
+
+    def act(self, action):
+        """Run `action` as a committed request would, so its events are published."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return action()
+
+    async def next_event(self, stream):
+        return parse_event(await asyncio.wait_for(anext(stream), timeout=5))
+
+    async def test_stream_pushes_comments_votes_and_eureka(self):
+        response = await self.async_client.get(reverse('post_events', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        self.assertEqual(get_broker().watched(), {self.post.pk})
+
+        # Activity on other posts doesn't reach this stream
+        other = await Post.objects.acreate(title='Other Post', description='Test Description', author=self.user)
+        await sync_to_async(self.act)(
+            lambda: Comment.objects.create(post=other, author=self.user, text='Test Comment')
+        )
+        await sync_to_async(self.act)(lambda: cast_vote(self.voter, other, Vote.UPVOTE, vote_buffer=None))
+
+        comment = await sync_to_async(self.act)(
+            lambda: Comment.objects.create(post=self.post, author=self.user, text='Test Comment')
+        )
+        event, data = await self.next_event(stream)
+        self.assertEqual(event, 'comment')
+        self.assertEqual(data['id'], comment.pk)
+        self.assertEqual(data['replies'], [])
+        self.assertEqual(data['author']['username'], 'testuser')
+
+        await sync_to_async(self.act)(lambda: cast_vote(self.voter, self.post, Vote.UPVOTE, vote_buffer=None))
+        self.assertEqual(await self.next_event(stream), ('votes', {'post': self.post.pk, 'upvotes': 1, 'downvotes': 0, 'points': 1}))
+
+        await sync_to_async(self.act)(lambda: cast_vote(self.voter, comment, Vote.DOWNVOTE, vote_buffer=None))
+        self.assertEqual(await self.next_event(stream), ('votes', {'comment': comment.pk, 'upvotes': 0, 'downvotes': 1, 'points': -1}))
+
+        def mark_eureka():
+            self.post.eureka_comment = comment.pk
+            self.post.save()
+        await sync_to_async(self.act)(mark_eureka)
+        self.assertEqual(await self.next_event(stream), ('eureka', {'post': self.post.pk, 'eureka_comment': comment.pk}))
+
+    async def test_closing_the_stream_unsubscribes(self):
+        events = stream(self.post.pk)
+        await anext(events)
+        self.assertEqual(get_broker().watched(), {self.post.pk})
+        await events.aclose()
+        self.assertEqual(get_broker().watched(), set())
+
+    async def test_slow_subscribers_are_told_to_resync(self):
+        with self.settings(POST_EVENTS={'QUEUE_SIZE': 2}):
+            events = stream(self.post.pk)
+            await anext(events)
+            for i in range(5):
+                get_broker().publish(self.post.pk, 'votes', {'post': self.post.pk, 'upvotes': i})
+            await asyncio.sleep(0)
+            self.assertEqual(await self.next_event(events), ('resync', {}))
+            await events.aclose()
+
+    async def test_missing_post(self):
+        response = await self.async_client.get(reverse('post_events', args=[self.post.pk + 100]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,124 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from main.fieldsets import ALL, parse_fieldset, shape_serializer
+from main.models import Post, Comment, UserProfile
+from main.query_planner import plan_queryset
+from main.serializers import PostSerializer
+
+class FakeRequest:
+    def __init__(self, **params):
+        self.query_params = params
+
+class ParseFieldsetTest(TestCase):
+    def test_parses_dotted_fields_and_expand(self):
+        self.assertIsNone(parse_fieldset(FakeRequest()))
+        self.assertIsNone(parse_fieldset(FakeRequest(fields='', expand='author')))
+        self.assertEqual(
+            parse_fieldset(FakeRequest(fields='title, author.username,author.profile.bio,tags', expand='author.profile')),
+            {'title': None, 'author': {'username': None, 'profile': ALL}, 'tags': None}
+        )
+        self.assertEqual(parse_fieldset(FakeRequest(fields='author,author.username')), {'author': {'username': None}})
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser')
+        UserProfile.objects.filter(user=self.user).update(bio='Collector', profession='Curator')
+        self.client.force_authenticate(user=self.user)
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', description='Test Description', author=self.user, upvotes=i)
+            for i in range(3)
+        ]
+        self.comment = Comment.objects.create(post=self.posts[0], author=self.user, text='Root Comment')
+        Comment.objects.create(post=self.posts[0], author=self.user, text='Reply', parent=self.comment)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), [query['sql'] for query in queries.captured_queries]
+
+    def test_list_selects_and_joins_only_requested_fields(self):
+        data, queries = self.get(reverse('post-list'), fields='id,title,upvotes,author.username')
+        self.assertEqual(data['results'][0], {
+            'id': self.posts[2].pk, 'title': 'Post 2', 'upvotes': 2,
+            'author': {'id': self.user.pk, 'username': 'testuser'}
+        })
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('main_userprofile', queries[0])
+        self.assertNotIn('"description"', queries[0])
+
+        data, queries = self.get(reverse('post-list'), fields='title,author')
+        self.assertEqual(data['results'][0], {'title': 'Post 2', 'author': self.user.pk})
+        self.assertNotIn('auth_user', queries[0])
+
+        data, _ = self.get(reverse('post-list'), fields='title', expand='author')
+        self.assertEqual(data['results'][0]['author']['profile']['bio'], 'Collector')
+
+        full, _ = self.get(reverse('post-list'))
+        self.assertEqual(len(full['results'][0]), len(PostSerializer().fields))
+
+    def test_paging_keeps_working_without_the_sort_keys(self):
+        for ordering in ('new', 'hot', 'top'):
+            data, _ = self.get(reverse('post-list'), fields='title', ordering=ordering, page_size=2)
+            self.assertEqual(len(data['results']), 2)
+            second = self.client.get(data['next']).json()
+            self.assertEqual(len(second['results']), 1)
+
+    def test_flat_and_drf_paths_shape_alike(self):
+        params = {'fields': 'id,title,image_srcset,created_at,author.profile_picture,author.profile.bio'}
+        listed, _ = self.get(reverse('post-list'), **params)
+        for data in listed['results']:
+            retrieved, queries = self.get(reverse('post-detail', args=[data['id']]), **params)
+            self.assertEqual(retrieved, data)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('"description"', queries[0])
+
+        params = {'fields': 'id,text,points,replies,author'}
+        listed, _ = self.get(reverse('comment-list'), post=self.posts[0].pk, **params)
+        retrieved, _ = self.get(reverse('comment-detail', args=[self.comment.pk]), **params)
+        self.assertIn(retrieved, listed['results'])
+        self.assertEqual(retrieved['replies'], [self.comment.pk + 1])
+
+        thread, _ = self.get(reverse('post-thread', args=[self.posts[0].pk]), fields='text')
+        self.assertEqual(thread['results'][0]['text'], 'Root Comment')
+        self.assertEqual(thread['results'][0]['replies'][0]['text'], 'Reply')
+        self.assertNotIn('author', thread['results'][0])
+
+    async def test_async_views_match_sync_views(self):
+        pk = self.posts[0].pk
+        for sync_url, async_url, fields in [
+            (reverse('post-list'), reverse('async_post_list'), 'title,author.username'),
+            (reverse('post-detail', args=[pk]), reverse('async_post_detail', args=[pk]), 'title,author'),
+            (reverse('post-thread', args=[pk]), reverse('async_post_thread', args=[pk]), 'text,points'),
+            (reverse('post-search'), reverse('async_post_search'), 'title'),
+        ]:
+            params = {'fields': fields, 'q': 'post'}
+            sync_response = await self.async_client.get(sync_url, params)
+            async_response = await self.async_client.get(async_url, params)
+            self.assertEqual(sync_response.status_code, 200)
+            self.assertEqual(async_response.content, sync_response.content.replace(b'/posts/', b'/async/posts/'))
+
+    def test_user_profile_fields(self):
+        data, queries = self.get(reverse('user_profile_detail', args=['testuser']), fields='username,profile.bio')
+        self.assertEqual(data, {'username': 'testuser', 'profile': {'bio': 'Collector'}})
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_fields_are_rejected(self):
+        for fields in ('title,color', 'author.color', 'title.length'):
+            response = self.client.get(reverse('post-list'), {'fields': fields})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('fields', response.json())
+        response = self.client.get(reverse('post-detail', args=[self.posts[0].pk]), {'fields': 'color'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_planner_defers_unused_columns(self):
+        serializer = shape_serializer(PostSerializer(), {'title': None, 'author': None})
+        queryset = plan_queryset(Post.objects.all(), serializer, only=True)
+        self.assertEqual(queryset.query.deferred_loading, ({'title', 'author', 'is_deleted'}, False))
+        self.assertFalse(queryset.query.select_related)
@@ -0,0 +1,94 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.renderers import JSONRenderer
+from main.flat_serializers import FlatCommentSerializer, FlatPostSerializer, FlatThreadCommentSerializer
+from main.models import Post, Comment, UserProfile
+from main.query_planner import plan_queryset
+from main.renderers import FastJSONRenderer
+from main.serializers import PostSerializer, CommentSerializer, ThreadCommentSerializer
+
+class FlatSerializerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser')
+        UserProfile.objects.filter(user=self.user).update(
+            bio='Collector of odd things', profession='Curator',
+            profile_picture='image/upload/v1/profile_pictures/me.jpg',
+            profile_picture_url='https://example.com/me.jpg'
+        )
+        # A user whose profile row is missing altogether
+        self.bare = User.objects.create_user(username='bare')
+        UserProfile.objects.filter(user=self.bare).delete()
+
+        self.post = Post.objects.create(
+            title='Brass spoon   ünïcode', description='Test Description', author=self.user,
+            image='image/upload/v1/mystery_images/spoon.jpg', image_url='https://example.com/spoon.jpg',
+            image_variants={'webp': {'160': 'https://example.com/160.webp', '320': 'https://example.com/320.webp'}},
+            image_placeholder='data:image/jpeg;base64,AAAA', media_status=Post.MEDIA_READY,
+            tags=[{'name': 'spoon', 'description': 'object', 'wikidata_id': 'Q81980'}], parts_relation='handle'
+        )
+        self.other = Post.objects.create(title='Key', description='Test Description', author=self.bare, is_anonymous=True)
+        self.deleted = Post.objects.create(title='Gone', description='Test Description', author=self.user, is_deleted=True)
+
+        root = Comment.objects.create(post=self.post, author=self.user, text='Root Comment', upvotes=3, downvotes=1)
+        reply = Comment.objects.create(post=self.post, author=self.bare, text='Reply', parent=root, tag='Answer')
+        Comment.objects.create(post=self.post, author=self.user, text='Second Reply', parent=root)
+        Comment.objects.create(post=self.post, author=self.user, text='Nested Reply', parent=reply)
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def flat(self, serializer_class, queryset, fieldset=None):
+        serializer = serializer_class(fieldset)
+        return serializer.serialize(list(serializer.rows(queryset)))
+
+    def test_posts_match_post_serializer(self):
+        posts = Post.objects.order_by('id')
+        expected = PostSerializer(plan_queryset(posts, PostSerializer), many=True).data
+        self.assertEqual(self.render(self.flat(FlatPostSerializer, posts)), self.render(expected))
+        self.assertIsNone(self.flat(FlatPostSerializer, posts.filter(pk=self.deleted.pk))[0])
+
+    def test_comments_match_comment_serializers(self):
+        comments = Comment.objects.order_by('created_at', 'id')
+        expected = CommentSerializer(plan_queryset(comments, CommentSerializer), many=True).data
+        self.assertEqual(self.render(self.flat(FlatCommentSerializer, comments)), self.render(expected))
+        expected = ThreadCommentSerializer(plan_queryset(comments, ThreadCommentSerializer), many=True).data
+        self.assertEqual(self.render(self.flat(FlatThreadCommentSerializer, comments)), self.render(expected))
+        self.assertEqual(FlatCommentSerializer().serialize([]), [])
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {'text': 'line separator   ünïcode "quoted" \n\t', 'posts': [None, True, 1, [], {}],
+                'created_at': self.post.created_at}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4')
+        )
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_list_endpoints_use_flat_path(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post['id'] for post in response.json()['results']], [self.other.pk, self.post.pk])
+        self.assertEqual(response.json()['results'][1]['author']['profile']['bio'], 'Collector of odd things')
+
+        response = self.client.get(reverse('comment-list') + f'?post={self.post.pk}&page_size=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+        second = self.client.get(response.json()['next'])
+        self.assertEqual(len(second.json()['results']), 2)
+
+    def test_bench_serializers_reports_identical_output(self):
+        out = io.StringIO()
+        call_command('bench_serializers', rows=30, runs=1, json=True, stdout=out, stderr=io.StringIO())
+        report = json.loads(out.getvalue())
+
+        self.assertEqual([result['model'] for result in report['results']], ['post', 'comment'])
+        for result in report['results']:
+            self.assertTrue(result['identical'], result['model'])
+            self.assertGreater(result['flat']['rows_per_sec'], 0)
+        self.assertEqual(Post.objects.count(), 3)
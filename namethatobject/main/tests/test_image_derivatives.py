@@ -0,0 +1,117 @@
+import io
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.images import target_widths
+from main.models import Post
+
+def photo(width, height, format='JPEG'):
+    """A noisy gradient, which compresses about as badly as a real photo."""
+    size = (width, height)
+    image = Image.merge('RGB', [
+        Image.effect_noise(size, 40),
+        Image.linear_gradient('L').resize(size),
+        Image.radial_gradient('L').resize(size),
+    ])
+    buffer = io.BytesIO()
+    image.save(buffer, format, quality=92)
+    return buffer.getvalue()
+
+
+class ImageDerivativeTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.staging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.staging_dir, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+            MEDIA_PIPELINE={'BACKEND': 'local', 'STAGING_DIR': self.staging_dir, 'EAGER': True},
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_post(self, data, name='photo.jpg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('post-list'), {
+                'title': 'Test Post',
+                'description': 'Test Description',
+                'image': SimpleUploadedFile(name, data, content_type='image/jpeg'),
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Post.objects.get(pk=response.data['id'])
+
+    def local_path(self, url):
+        return os.path.join(self.media_root, url[len('/media/'):])
+
+    def test_derivatives_are_generated(self):
+        post = self.create_post(photo(2000, 1500))
+
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertEqual(set(post.image_variants), {'webp', 'jpeg'})
+        self.assertEqual(list(post.image_variants['webp']), ['160', '320', '640', '1280'])
+        for format, urls in post.image_variants.items():
+            for width, url in urls.items():
+                with Image.open(self.local_path(url)) as image:
+                    self.assertEqual(image.format, format.upper())
+                    self.assertEqual(image.size, (int(width), int(width) * 3 // 4))
+        self.assertTrue(post.image_placeholder.startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(post.image_placeholder), 1024)
+
+    def test_serializer_exposes_srcset(self):
+        post = self.create_post(photo(800, 600))
+        data = self.client.get(reverse('post-detail', kwargs={'pk': post.pk})).data
+
+        webp = post.image_variants['webp']
+        self.assertEqual(data['image_srcset']['webp'], f"{webp['160']} 160w, {webp['320']} 320w, {webp['640']} 640w")
+        self.assertEqual(data['image_placeholder'], post.image_placeholder)
+        self.assertEqual(data['image_url'], '/media/mystery_images/photo.jpg')
+
+    def test_card_sized_derivative_is_an_order_of_magnitude_smaller(self):
+        original = photo(2400, 1600)
+        post = self.create_post(original)
+        card = os.path.getsize(self.local_path(post.image_variants['webp']['640']))
+        self.assertLess(card * 10, len(original))
+
+    def test_small_images_are_not_upscaled(self):
+        self.assertEqual(target_widths(100, [160, 320]), [100])
+        post = self.create_post(photo(200, 100, 'PNG'), name='small.png')
+        self.assertEqual(list(post.image_variants['jpeg']), ['160'])
+
+    def test_unreadable_images_keep_the_original(self):
+        post = self.create_post(b'not an image')
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertEqual(post.image_url, '/media/mystery_images/photo.jpg')
+        self.assertIsNone(post.image_variants)
+        self.assertEqual(self.client.get(reverse('post-detail', kwargs={'pk': post.pk})).data['image_srcset'], {})
+
+    def test_backfill_command(self):
+        os.makedirs(os.path.join(self.media_root, 'mystery_images'))
+        with open(os.path.join(self.media_root, 'mystery_images', 'old.jpg'), 'wb') as original:
+            original.write(photo(700, 700))
+        post = Post.objects.create(
+            title='Test Post', description='Test Description', author=self.user,
+            image_url='/media/mystery_images/old.jpg'
+        )
+
+        call_command('generate_image_derivatives', stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertEqual(list(post.image_variants['webp']), ['160', '320', '640'])
+        self.assertTrue(post.image_placeholder)
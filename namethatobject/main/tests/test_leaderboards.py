@@ -0,0 +1,175 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.leaderboards import board_key, prune, top, week_key
+from main.models import Post, Comment, LeaderboardScore, Vote
+from main.votes import cast_vote
+
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser')
+        self.other = User.objects.create_user(username='other')
+        self.voters = [User.objects.create_user(username=f'voter{i}') for i in range(5)]
+        self.week = week_key()
+
+    def create_post(self, **kwargs):
+        kwargs.setdefault('tags', [{'name': 'Spoon', 'description': 'kitchen'}])
+        return Post.objects.create(title='Test Post', description='Test Description', author=self.user, **kwargs)
+
+    def scores(self, board):
+        return dict(LeaderboardScore.objects.filter(board=board).values_list('subject_id', 'score'))
+
+    def test_votes_move_mystery_boards(self):
+        post = self.create_post()
+        other = self.create_post(tags=[])
+        with self.captureOnCommitCallbacks(execute=True):
+            for voter in self.voters[:3]:
+                cast_vote(voter, post, Vote.UPVOTE, vote_buffer=None)
+            cast_vote(self.voters[0], other, Vote.DOWNVOTE, vote_buffer=None)
+
+        self.assertEqual(self.scores('posts:points'), {post.pk: 3, other.pk: -1})
+        self.assertEqual(self.scores('posts:points:tag:spoon'), {post.pk: 3})
+        self.assertEqual(top('posts:points'), [(post.pk, 3), (other.pk, -1)])
+        self.assertEqual(self.scores(board_key('posts', 'activity', self.week, 'spoon')), {post.pk: 3})
+        self.assertEqual(self.scores(board_key('posts', 'hot', self.week)), {post.pk: 3, other.pk: 1})
+
+    def test_vote_query_count_does_not_grow_with_tags(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = self.create_post(tags=[f'tag{i}' for i in range(6)])
+        for voter in self.voters[:2]:
+            # The vote, reputation and ranking writes, then one upsert each
+            # for the mystery boards and the user boards after the commit
+            with self.assertNumQueries(15), self.captureOnCommitCallbacks(execute=True):
+                cast_vote(voter, post, Vote.UPVOTE, vote_buffer=None)
+        self.assertEqual(self.scores('posts:points:tag:tag5'), {post.pk: 2})
+        self.assertEqual(self.scores(board_key('posts', 'hot', self.week, 'tag0')), {post.pk: 2})
+        self.assertEqual(self.scores('users:points:tag:tag3'), {self.user.pk: 12})
+
+    def test_comments_count_as_activity(self):
+        post = self.create_post()
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(post=post, author=self.other, text='Test Comment')
+            cast_vote(self.voters[0], comment, Vote.UPVOTE, vote_buffer=None)
+        self.assertEqual(self.scores(board_key('posts', 'activity', self.week)), {post.pk: 3})
+
+    def test_solved_and_deleted_posts_leave_boards(self):
+        post = self.create_post()
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(post=post, author=self.other, text='It is a spoon')
+        post.eureka_comment = comment.pk
+        post.save()
+        self.assertEqual(self.scores(board_key('posts', 'hot', self.week)), {})
+        self.assertEqual(self.scores(board_key('posts', 'activity', self.week)), {post.pk: 2})
+
+        post.is_deleted = True
+        post.save()
+        self.assertFalse(LeaderboardScore.objects.filter(board__startswith='posts:').exists())
+
+    def test_retagging_moves_post(self):
+        post = self.create_post()
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.voters[0], post, Vote.UPVOTE, vote_buffer=None)
+        post.refresh_from_db()
+        post.tags = [{'name': 'Fork'}]
+        post.save()
+        self.assertEqual(self.scores('posts:points:tag:spoon'), {})
+        self.assertEqual(self.scores('posts:points:tag:fork'), {post.pk: 1})
+        self.assertEqual(self.scores(board_key('posts', 'activity', self.week, 'fork')), {post.pk: 1})
+
+    def test_users_earn_weekly_and_tag_points(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = self.create_post()
+            Comment.objects.create(post=post, author=self.other, text='Test Comment')
+            cast_vote(self.voters[0], post, Vote.UPVOTE, vote_buffer=None)
+
+        self.assertEqual(self.scores(board_key('users', 'points', self.week)), {self.user.pk: 11, self.other.pk: 5})
+        self.assertEqual(self.scores('users:points:tag:spoon'), {self.user.pk: 11, self.other.pk: 5})
+
+        self.other.delete()
+        self.assertEqual(self.scores('users:points:tag:spoon'), {self.user.pk: 11})
+
+    def test_rebuild_matches_incremental_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = self.create_post()
+            self.create_post(is_anonymous=True)
+            comment = Comment.objects.create(post=post, author=self.other, text='Test Comment')
+            for voter in self.voters:
+                cast_vote(voter, post, Vote.UPVOTE, vote_buffer=None)
+            cast_vote(self.voters[0], comment, Vote.DOWNVOTE, vote_buffer=None)
+        boards = ['posts:points', 'posts:points:tag:spoon', 'users:points:tag:spoon']
+        before = {board: self.scores(board) for board in boards}
+
+        LeaderboardScore.objects.filter(board__in=boards).update(score=0)
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        self.assertEqual({board: self.scores(board) for board in boards}, before)
+
+    def test_prune_drops_old_weeks(self):
+        today = datetime.date(2024, 3, 1)
+        old = board_key('posts', 'activity', week_key(today - datetime.timedelta(weeks=4)), 'spoon')
+        recent = board_key('posts', 'activity', week_key(today - datetime.timedelta(weeks=1)))
+        LeaderboardScore.objects.create(board=old, subject_id=1, score=1)
+        LeaderboardScore.objects.create(board=recent, subject_id=1, score=1)
+        LeaderboardScore.objects.create(board='posts:points', subject_id=1, score=1)
+
+        self.assertEqual(prune(keep_weeks=2, today=today), 1)
+        self.assertEqual(
+            set(LeaderboardScore.objects.values_list('board', flat=True)),
+            {recent, 'posts:points'}
+        )
+
+
+class LeaderboardApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [User.objects.create_user(username=f'user{i}') for i in range(5)]
+        with self.captureOnCommitCallbacks(execute=True):
+            for i, user in enumerate(self.users):
+                for _ in range(i):
+                    Post.objects.create(title='Test Post', description='Test Description', author=user, tags=['spoon'])
+
+    def test_users_all_time(self):
+        url = reverse('user_leaderboard')
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(entry['rank'], entry['username'], entry['score']) for entry in response.data['results']],
+            [(1, 'user4', 40), (2, 'user3', 30)]
+        )
+        self.assertEqual(response.data['next'], 2)
+
+        response = self.client.get(url, {'limit': 2, 'offset': 2})
+        self.assertEqual([entry['username'] for entry in response.data['results']], ['user2', 'user1'])
+        self.assertIsNone(response.data['next'])
+
+    def test_users_weekly_and_by_tag(self):
+        url = reverse('user_leaderboard')
+        for params in ({'period': 'week'}, {'period': week_key()}, {'tag': 'Spoon'}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.data['results'][0]['username'], 'user4', params)
+        self.assertEqual(self.client.get(url, {'period': '2001-W01'}).data['results'], [])
+
+    def test_mysteries(self):
+        post = Post.objects.create(title='Popular', description='Test Description', author=self.users[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.users[1], post, Vote.UPVOTE, vote_buffer=None)
+        url = reverse('mystery_leaderboard')
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['post'], {'id': post.pk, 'title': 'Popular', 'image_url': None})
+        self.assertEqual(response.data['results'][0]['score'], 1)
+        response = self.client.get(url, {'metric': 'hot'})
+        self.assertEqual([entry['post']['id'] for entry in response.data['results']], [post.pk])
+
+    def test_unavailable_boards(self):
+        url = reverse('mystery_leaderboard')
+        for params in ({'metric': 'views'}, {'metric': 'points', 'period': 'week'}, {'period': 'yesterday'}):
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST, params)
+        response = self.client.get(reverse('user_leaderboard'), {'period': 'week', 'tag': 'spoon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main import media
+from main.models import MediaUpload, Post
+
+class FailingBackend:
+    def upload(self, path, kind):
+        raise OSError('CDN unavailable')
+
+
+class MediaPipelineTestMixin:
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.staging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.staging_dir, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            MEDIA_URL='/media/',
+            MEDIA_PIPELINE={
+                'BACKEND': 'local',
+                'STAGING_DIR': self.staging_dir,
+                'EAGER': self.eager,
+                'RETRY_DELAY': 0,
+            },
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_post(self, **files):
+        return self.client.post(reverse('post-list'), {
+            'title': 'Test Post',
+            'description': 'Test Description',
+            **files,
+        }, format='multipart')
+
+
+class MediaIngestTest(MediaPipelineTestMixin, TestCase):
+    eager = True
+
+    def test_create_returns_before_upload(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.create_post(image=SimpleUploadedFile('photo.jpg', b'jpeg' * 1000, content_type='image/jpeg'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['media_status'], Post.MEDIA_PENDING)
+        self.assertIsNone(response.data['image_url'])
+        upload = MediaUpload.objects.get()
+        self.assertEqual(upload.status, MediaUpload.PENDING)
+        self.assertTrue(os.path.exists(upload.staged_path))
+
+    def test_pipeline_fills_in_urls(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.create_post(
+                image=SimpleUploadedFile('photo.jpg', b'jpeg' * 1000, content_type='image/jpeg'),
+                audio=SimpleUploadedFile('clue.mp3', b'mp3' * 1000, content_type='audio/mpeg'),
+            )
+
+        post = Post.objects.get(pk=response.data['id'])
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertEqual(post.image_url, '/media/mystery_images/photo.jpg')
+        self.assertEqual(post.audio_url, '/media/mystery_audio/clue.mp3')
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'mystery_images', 'photo.jpg')))
+        self.assertFalse(any(os.scandir(self.staging_dir)))
+
+        detail = self.client.get(reverse('post-detail', kwargs={'pk': post.pk}))
+        self.assertEqual(detail.data['media_status'], Post.MEDIA_READY)
+        self.assertEqual(detail.data['image_url'], '/media/mystery_images/photo.jpg')
+
+    def test_posts_without_media(self):
+        response = self.create_post()
+        self.assertEqual(response.data['media_status'], Post.MEDIA_NONE)
+        self.assertFalse(MediaUpload.objects.exists())
+
+    def test_failed_uploads_are_retried_then_marked_failed(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.create_post(image=SimpleUploadedFile('photo.jpg', b'jpeg', content_type='image/jpeg'))
+        upload = MediaUpload.objects.get()
+
+        original = media.BACKENDS['local']
+        media.BACKENDS['local'] = FailingBackend
+        try:
+            self.assertEqual(media.process_upload(upload.pk), MediaUpload.FAILED)
+        finally:
+            media.BACKENDS['local'] = original
+
+        upload.refresh_from_db()
+        self.assertEqual(upload.attempts, 3)
+        self.assertIn('CDN unavailable', upload.error)
+        self.assertEqual(Post.objects.get(pk=response.data['id']).media_status, Post.MEDIA_FAILED)
+
+    def test_uploads_are_processed_once(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.create_post(image=SimpleUploadedFile('photo.jpg', b'jpeg', content_type='image/jpeg'))
+        upload = MediaUpload.objects.get()
+
+        self.assertEqual(media.process_upload(upload.pk), MediaUpload.READY)
+        self.assertIsNone(media.process_upload(upload.pk))
+
+
+class MediaWorkerPoolTest(MediaPipelineTestMixin, TransactionTestCase):
+    eager = False
+
+    def test_worker_pool_uploads_in_background(self):
+        self.addCleanup(media.shutdown_media_pipeline)
+        response = self.create_post(image=SimpleUploadedFile('photo.jpg', b'jpeg' * 1000, content_type='image/jpeg'))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Shutting down waits for the queued upload to finish
+        media.shutdown_media_pipeline()
+        post = Post.objects.get()
+        self.assertEqual(post.media_status, Post.MEDIA_READY)
+        self.assertEqual(post.image_url, '/media/mystery_images/photo.jpg')
@@ -0,0 +1,83 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.posts = [
+            Post.objects.create(
+                title=f'Post {i}',
+                description='Test Description',
+                author=self.user
+            )
+            for i in range(5)
+        ]
+
+    def collect_pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(post['id'] for post in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_list_is_paginated_newest_first(self):
+        response = self.client.get(reverse('post-list'), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+        self.assertEqual(
+            [post['id'] for post in response.data['results']],
+            [self.posts[4].id, self.posts[3].id]
+        )
+
+    def test_walking_cursors_returns_every_post_once(self):
+        ids = self.collect_pages(reverse('post-list') + '?page_size=2')
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+    def test_cursor_is_stable_while_new_posts_arrive(self):
+        response = self.client.get(reverse('post-list'), {'page_size': 2})
+        seen = [post['id'] for post in response.data['results']]
+
+        Post.objects.create(
+            title='Fresh Post',
+            description='Test Description',
+            author=self.user
+        )
+
+        seen.extend(self.collect_pages(response.data['next']))
+        self.assertEqual(seen, [post.id for post in reversed(self.posts)])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('post-list'), {'page_size': 10000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_comments_are_paginated_and_filterable_by_post(self):
+        other_post = Post.objects.create(
+            title='Other Post',
+            description='Test Description',
+            author=self.user
+        )
+        for post in (self.posts[0], self.posts[0], other_post):
+            Comment.objects.create(post=post, author=self.user, text='Test Comment')
+
+        ids = self.collect_pages(
+            reverse('comment-list') + f'?post={self.posts[0].id}&page_size=1'
+        )
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(
+            set(ids),
+            set(Comment.objects.filter(post=self.posts[0]).values_list('id', flat=True))
+        )
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment
+from main.query_planner import plan_queryset
+from main.serializers import PostSerializer, CommentSerializer
+
+class QueryPlannerTest(TestCase):
+    def test_plans_joins_and_prefetches_from_serializer_fields(self):
+        queryset = plan_queryset(Post.objects.all(), PostSerializer)
+        self.assertEqual(queryset.query.select_related, {'author': {'profile': {}}})
+
+        queryset = plan_queryset(Comment.objects.all(), CommentSerializer)
+        self.assertEqual(queryset.query.select_related, {'author': {'profile': {}}})
+        self.assertEqual(
+            [lookup.prefetch_through for lookup in queryset._prefetch_related_lookups],
+            ['replies']
+        )
+
+class ListQueryCountTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='testpass123')
+            for i in range(10)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+        self.post = None
+        for user in self.users:
+            self.post = Post.objects.create(
+                title='Test Post',
+                description='Test Description',
+                author=user
+            )
+            parent = Comment.objects.create(post=self.post, author=user, text='Test Comment')
+            Comment.objects.create(post=self.post, author=user, text='Reply', parent=parent)
+
+    def assertQueriesIndependentOfPageSize(self, url, expected):
+        for page_size in (1, 5, 20):
+            with self.assertNumQueries(expected):
+                response = self.client.get(url, {'page_size': page_size})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_post_list_query_count(self):
+        self.assertQueriesIndependentOfPageSize(reverse('post-list'), 1)
+
+    def test_comment_list_query_count(self):
+        # One query for the comments, one to prefetch their reply ids
+        self.assertQueriesIndependentOfPageSize(reverse('comment-list'), 2)
+
+    def test_thread_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('post-thread', args=[self.post.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
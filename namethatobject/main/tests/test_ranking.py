@@ -0,0 +1,130 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment, Vote
+from main.ranking import hot_score, scores
+from main.votes import cast_vote
+
+class HotScoreTest(TestCase):
+    def test_newer_and_busier_posts_rank_higher(self):
+        now = timezone.now()
+        self.assertGreater(hot_score(10, 0, 0, now, False), hot_score(1, 0, 0, now, False))
+        self.assertGreater(hot_score(1, 0, 0, now, False), hot_score(1, 0, 0, now - timedelta(days=1), False))
+        self.assertGreater(hot_score(0, 0, 5, now, False), hot_score(0, 0, 0, now, False))
+        self.assertLess(hot_score(0, 5, 0, now, False), hot_score(0, 0, 0, now, False))
+        self.assertLess(hot_score(10, 0, 0, now, True), hot_score(10, 0, 0, now, False))
+
+    def test_ten_times_the_votes_outlasts_gravity(self):
+        now = timezone.now()
+        older = now - timedelta(seconds=45000)
+        self.assertAlmostEqual(hot_score(100, 0, 0, older, False), hot_score(10, 0, 0, now, False))
+
+
+class FeedScoreUpdateTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser')
+        self.voters = [User.objects.create_user(username=f'voter{i}') for i in range(3)]
+        self.post = Post.objects.create(title='Test Post', description='Test Description', author=self.user)
+
+    def assertScoresCurrent(self):
+        self.post.refresh_from_db()
+        expected = scores(self.post)
+        self.assertAlmostEqual(self.post.hot_score, expected['hot_score'])
+        self.assertEqual(self.post.top_score, expected['top_score'])
+
+    def test_new_posts_are_scored(self):
+        self.assertScoresCurrent()
+        self.assertNotEqual(self.post.hot_score, 0)
+
+    def test_votes_comments_and_solving_rescore(self):
+        for voter in self.voters:
+            cast_vote(voter, self.post, Vote.UPVOTE, vote_buffer=None)
+        self.assertScoresCurrent()
+        voted = self.post.hot_score
+
+        comment = Comment.objects.create(post=self.post, author=self.user, text='Test Comment')
+        self.assertScoresCurrent()
+        self.assertEqual(self.post.comment_count, 1)
+        self.assertGreater(self.post.hot_score, voted)
+
+        self.post.eureka_comment = comment.pk
+        self.post.save(update_fields=['eureka_comment'])
+        self.assertScoresCurrent()
+
+        comment.delete()
+        self.assertScoresCurrent()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_refresh_command_repairs_drift(self):
+        Comment.objects.create(post=self.post, author=self.user, text='Test Comment')
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7, hot_score=0, top_score=0)
+
+        call_command('refresh_feed_scores', stdout=io.StringIO())
+        self.assertScoresCurrent()
+        self.assertEqual(self.post.comment_count, 1)
+
+
+class FeedOrderingTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser')
+        self.voters = [User.objects.create_user(username=f'voter{i}') for i in range(5)]
+        now = timezone.now()
+        # (age in hours, upvotes, solved)
+        specs = {'old_popular': (48, 5, False), 'fresh': (0, 0, False), 'recent_liked': (2, 2, False),
+                 'solved': (1, 3, True), 'middling': (10, 1, False)}
+        self.posts = {}
+        for title, (hours, upvotes, solved) in specs.items():
+            post = Post.objects.create(title=title, description='Test Description', author=self.user)
+            Post.objects.filter(pk=post.pk).update(created_at=now - timedelta(hours=hours))
+            for voter in self.voters[:upvotes]:
+                cast_vote(voter, post, Vote.UPVOTE, vote_buffer=None)
+            if solved:
+                comment = Comment.objects.create(post=post, author=self.voters[0], text='It is a spoon')
+                post.refresh_from_db()
+                post.eureka_comment = comment.pk
+                post.save()
+            self.posts[title] = post
+        call_command('refresh_feed_scores', stdout=io.StringIO())
+
+    def feed(self, ordering, page_size=2):
+        titles = []
+        url = reverse('post-list') + f'?ordering={ordering}&page_size={page_size}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(post['title'] for post in response.data['results'])
+            url = response.data['next']
+        return titles
+
+    def expected(self, key, solved=True):
+        posts = Post.objects.filter(is_deleted=False)
+        if not solved:
+            posts = posts.filter(eureka_comment__isnull=True)
+        return [post.title for post in sorted(posts, key=key)]
+
+    def test_orderings(self):
+        self.assertEqual(self.feed('new'), self.expected(lambda post: -post.created_at.timestamp()))
+        self.assertEqual(self.feed('hot'), self.expected(lambda post: -post.hot_score))
+        self.assertEqual(self.feed('top')[:2], ['old_popular', 'solved'])
+        self.assertEqual(self.feed('top'), self.expected(lambda post: (-post.points, -post.created_at.timestamp())))
+        unsolved = self.feed('unsolved')
+        self.assertNotIn('solved', unsolved)
+        self.assertEqual(unsolved, self.expected(lambda post: -post.hot_score, solved=False))
+
+    def test_ties_page_cleanly(self):
+        for i in range(6):
+            Post.objects.create(title=f'Tied {i}', description='Test Description', author=self.user)
+        self.assertEqual(len(self.feed('top', page_size=1)), Post.objects.count())
+
+    def test_default_and_unknown_orderings(self):
+        self.assertEqual(self.feed('')[0], 'fresh')
+        response = self.client.get(reverse('post-list'), {'ordering': 'random'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
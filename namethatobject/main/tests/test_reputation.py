@@ -0,0 +1,166 @@
+import io
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment, UserReputation, Vote
+from main.reputation import COUNTERS, compute, get_reputation
+from main.vote_buffer import VoteBuffer
+from main.votes import cast_vote
+
+class ReputationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.voters = [User.objects.create_user(username=f'voter{i}') for i in range(10)]
+
+    def reputation(self, user=None):
+        return UserReputation.objects.get(user=user or self.user)
+
+    def assertMatchesRebuild(self, *users):
+        for user in users or (self.user, self.other):
+            row = self.reputation(user)
+            self.assertEqual({field: getattr(row, field) for field in COUNTERS}, compute([user.pk])[user.pk])
+
+    def create_post(self, **kwargs):
+        return Post.objects.create(title='Test Post', description='Test Description', author=self.user, **kwargs)
+
+    def test_new_users_start_at_zero(self):
+        self.assertEqual(self.reputation().points, 0)
+
+    def test_posts_and_comments(self):
+        post = self.create_post()
+        Comment.objects.create(post=post, author=self.other, text='Test Comment', tag='Expert Answer')
+        Comment.objects.create(post=post, author=self.user, text='Test Comment')
+
+        reputation = self.reputation()
+        self.assertEqual((reputation.post_count, reputation.comment_count, reputation.points), (1, 1, 15))
+        self.assertEqual(self.reputation(self.other).expert_answer_count, 1)
+        self.assertMatchesRebuild()
+
+    def test_votes(self):
+        post = self.create_post()
+        comment = Comment.objects.create(post=post, author=self.other, text='Test Comment')
+        for voter in self.voters:
+            cast_vote(voter, post, Vote.UPVOTE, vote_buffer=None)
+        cast_vote(self.voters[0], comment, Vote.UPVOTE, vote_buffer=None)
+        cast_vote(self.voters[1], comment, Vote.DOWNVOTE, vote_buffer=None)
+
+        reputation = self.reputation()
+        self.assertEqual((reputation.post_upvotes, reputation.upvoted_post_count, reputation.points), (10, 1, 20))
+        other = self.reputation(self.other)
+        self.assertEqual((other.comment_upvotes, other.comment_downvotes, other.points), (1, 1, 6))
+
+        # Changing a vote crosses back under the popular-post threshold
+        cast_vote(self.voters[0], post, Vote.DOWNVOTE, vote_buffer=None)
+        self.assertEqual(self.reputation().upvoted_post_count, 0)
+        self.assertMatchesRebuild()
+
+    def test_buffered_votes_count_once_flushed(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        vote_buffer = VoteBuffer(journal_dir, flush_interval=3600)
+        self.addCleanup(vote_buffer.journal.close)
+        post = self.create_post()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for voter in self.voters[:3]:
+                cast_vote(voter, post, Vote.UPVOTE, vote_buffer=vote_buffer)
+        self.assertEqual(self.reputation().post_upvotes, 0)
+        vote_buffer.flush()
+        self.assertEqual(self.reputation().post_upvotes, 3)
+        self.assertMatchesRebuild()
+
+    def test_anonymous_and_deleted_posts_earn_no_points(self):
+        post = self.create_post()
+        for voter in self.voters:
+            cast_vote(voter, post, Vote.UPVOTE, vote_buffer=None)
+        post.refresh_from_db()
+        post.anonymize()
+
+        reputation = self.reputation()
+        self.assertEqual((reputation.post_count, reputation.points), (0, 0))
+        self.assertEqual(reputation.anonymous_upvoted_post_count, 1)
+
+        post.is_deleted = True
+        post.save()
+        self.assertEqual(self.reputation().anonymous_upvoted_post_count, 0)
+        self.assertMatchesRebuild()
+
+    def test_eureka_answers(self):
+        post = self.create_post()
+        comment = Comment.objects.create(post=post, author=self.other, text='It is a spoon')
+        post.eureka_comment = comment.pk
+        post.save()
+        self.assertEqual(self.reputation(self.other).eureka_count, 1)
+
+        post.delete()
+        other = self.reputation(self.other)
+        self.assertEqual((other.eureka_count, other.comment_count, other.points), (0, 0, 0))
+        self.assertEqual(self.reputation().post_count, 0)
+        self.assertMatchesRebuild()
+
+    def test_saves_of_other_fields_skip_the_lookup(self):
+        post = self.create_post()
+        post.title = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            post.save(update_fields=['title'])
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT') or 'userreputation' in query['sql']
+        ])
+
+    def test_missing_rows_are_built_on_read(self):
+        self.create_post()
+        UserReputation.objects.all().delete()
+        self.create_post()
+        self.assertEqual(get_reputation(self.user).post_count, 2)
+
+    def test_rebuild_command(self):
+        post = self.create_post()
+        Comment.objects.create(post=post, author=self.other, text='Test Comment')
+        UserReputation.objects.update(points=0, post_count=0, comment_count=0)
+
+        call_command('rebuild_reputation', stdout=io.StringIO())
+        self.assertEqual(self.reputation().points, 10)
+        self.assertEqual(self.reputation(self.other).points, 5)
+
+
+class UserStatsViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_stats(self):
+        for i in range(25):
+            post = Post.objects.create(title=f'Post {i}', description='Test Description', author=self.user)
+            Comment.objects.create(post=post, author=self.user, text='Test Comment')
+        for _ in range(4):
+            Comment.objects.create(post=post, author=self.user, text='Test Comment', tag='Expert Answer')
+
+        url = reverse('user_stats', kwargs={'username': 'testuser'})
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['points'], 25 * 10 + 29 * 5)
+        self.assertEqual(response.data['rank'], 'Contributor')
+        self.assertEqual(response.data['badges'], ['first_post', 'commenter'])
+        self.assertEqual(response.data['expert_answers'], 4)
+
+    def test_unknown_user(self):
+        response = self.client.get(reverse('user_stats', kwargs={'username': 'nobody'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,118 @@
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment
+
+class PostResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.post = Post.objects.create(
+            title='Test Post',
+            description='Test Description',
+            author=self.user
+        )
+        self.url = reverse('post-detail', kwargs={'pk': self.post.pk})
+
+    def test_detail_is_served_from_cache(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_unchanged_detail_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_post_changes_invalidate_detail_and_list(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.get(reverse('post-list'))
+
+        self.post.title = 'Renamed'
+        self.post.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Renamed')
+        self.assertEqual(self.client.get(reverse('post-list')).data['results'][0]['title'], 'Renamed')
+
+    def test_votes_invalidate_detail_but_not_lists(self):
+        voter = User.objects.create_user(username='voter', password='testpass123')
+        self.client.get(self.url)
+        self.client.get(reverse('post-list'))
+        self.client.force_authenticate(user=voter)
+        self.client.post(reverse('post-upvote', kwargs={'pk': self.post.pk}))
+        self.assertEqual(self.client.get(self.url).data['upvotes'], 1)
+
+        self.client.force_authenticate(user=None)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(response.data['results'][0]['upvotes'], 0)
+
+    def test_author_profile_changes_invalidate_detail(self):
+        self.client.get(self.url)
+        self.client.get(reverse('post-list'))
+
+        self.user.username = 'renamed'
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).data['author']['username'], 'renamed')
+        self.assertEqual(
+            self.client.get(reverse('post-list')).data['results'][0]['author']['username'],
+            'renamed'
+        )
+
+    def test_comment_changes_invalidate_detail(self):
+        self.client.get(self.url)
+        Comment.objects.create(post=self.post, author=self.user, text='Test Comment')
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_new_posts_invalidate_list(self):
+        self.client.get(reverse('post-list'))
+        Post.objects.create(title='Second Post', description='Test Description', author=self.user)
+        self.assertEqual(len(self.client.get(reverse('post-list')).data['results']), 2)
+
+    def test_deleted_post_is_not_served(self):
+        self.client.get(self.url)
+        self.post.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }}):
+                self.client.get(self.url)
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+                self.post.title = 'Renamed'
+                self.post.save()
+                self.assertEqual(self.client.get(self.url).data['title'], 'Renamed')
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_disabled(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,96 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post
+from main.search import PostgresSearchBackend
+
+class PostSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.spoon = Post.objects.create(
+            title='Strange brass spoon',
+            description='Found in my grandmother\'s kitchen drawer.',
+            author=self.user,
+            tags=[{'name': 'Brass', 'description': 'material', 'wikidata_id': 'Q39782'}]
+        )
+        self.key = Post.objects.create(
+            title='Old iron key',
+            description='It has a small brass ring on the handle.',
+            author=self.user,
+            tags=[{'name': 'Iron', 'description': 'material', 'wikidata_id': 'Q677'}]
+        )
+        self.deleted = Post.objects.create(
+            title='Brass gadget',
+            description='Deleted post',
+            author=self.user,
+            is_deleted=True
+        )
+
+    def search(self, **params):
+        response = self.client.get(reverse('post-search'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_results_are_ranked_and_highlighted(self):
+        results = self.search(q='brass')
+        self.assertEqual([post['id'] for post in results], [self.spoon.id, self.key.id])
+        self.assertIn('<mark>brass</mark>', results[0]['highlight']['title'])
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+
+    def test_prefix_matches_while_typing(self):
+        results = self.search(q='gran')
+        self.assertEqual([post['id'] for post in results], [self.spoon.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.key.title = 'Old iron bell'
+        self.key.save()
+        self.assertEqual(self.search(q='key'), [])
+        self.assertEqual([post['id'] for post in self.search(q='bell')], [self.key.id])
+
+        self.key.delete()
+        self.assertEqual(self.search(q='bell'), [])
+
+    def test_exact_tag_filters(self):
+        results = self.search(q='brass', tag_wikidata_id='Q677')
+        self.assertEqual([post['id'] for post in results], [self.key.id])
+
+        response = self.client.get(reverse('post-list'), {'tag_name': 'Brass'})
+        self.assertEqual([post['id'] for post in response.data['results']], [self.spoon.id])
+
+        response = self.client.get(reverse('post-list'), {'tag_name': 'bras'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_list_search_param_uses_index(self):
+        response = self.client.get(reverse('post-list'), {'search': 'kitchen'})
+        self.assertEqual([post['id'] for post in response.data['results']], [self.spoon.id])
+
+    def test_search_input_is_not_parsed_as_query_syntax(self):
+        self.assertEqual(self.search(q='"brass OR NEAR('), [])
+        self.assertEqual(len(self.search(q='brass"*')), 2)
+
+    def test_plain_string_tags_match_by_name(self):
+        tagged = Post.objects.create(title='Tagged', description='x', author=self.user, tags=['test'])
+        response = self.client.get(reverse('post-list'), {'tag_name': 'test'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data['results']], [tagged.id])
+
+    def test_highlights_escape_stored_markup(self):
+        Post.objects.create(
+            title='<img src=x onerror=alert(1)> brass', description='<b>brass</b> & more', author=self.user
+        )
+        results = self.search(q='onerror')
+        self.assertEqual(results[0]['highlight']['title'], '&lt;img src=x <mark>onerror</mark>=alert(1)&gt; brass')
+        self.assertNotIn('<b>', results[0]['highlight']['description'])
+
+    def test_postgres_query_prefix_matches_last_term(self):
+        query = PostgresSearchBackend().query('brass spo')
+        self.assertEqual(query.source_expressions[-1].value, "'brass' & 'spo':*")
+        self.assertEqual(query.function, 'to_tsquery')
+        self.assertIsNone(PostgresSearchBackend().query('"*('))
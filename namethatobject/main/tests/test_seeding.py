@@ -0,0 +1,43 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from main.models import Comment, Post, PostTag, UserReputation
+from main.seeding import seed
+
+class SeedTest(TestCase):
+    def test_seeded_data_is_consistent(self):
+        seeded = seed(users=20, posts=100, comments=600, max_depth=3, batch_size=50)
+
+        self.assertEqual(Post.objects.count(), 100)
+        self.assertEqual(Comment.objects.count(), 600)
+        self.assertEqual(UserReputation.objects.count(), 20)
+        self.assertEqual(PostTag.objects.count(), sum(len(tags) for tags in Post.objects.values_list('tags', flat=True)))
+
+        counts = dict(Comment.objects.values('post').annotate(count=Count('pk')).values_list('post', 'count'))
+        for post in Post.objects.all():
+            self.assertEqual(post.comment_count, counts.get(post.pk, 0))
+            self.assertNotEqual(post.hot_score, 0)
+
+        parents = dict(Comment.objects.values_list('pk', 'parent_id'))
+        for pk in seeded['comments']:
+            depth, parent = 1, parents[pk]
+            while parent is not None:
+                depth, parent = depth + 1, parents[parent]
+            self.assertLessEqual(depth, 3)
+        self.assertTrue(any(parent for parent in parents.values()))
+
+        for post in Post.objects.exclude(eureka_comment=None):
+            self.assertTrue(Comment.objects.filter(pk=post.eureka_comment, post=post).exists())
+
+    def test_bench_queries_reports_every_endpoint(self):
+        out = io.StringIO()
+        call_command('bench_queries', users=10, posts=50, comments=200, runs=1, json=True, stdout=out, stderr=io.StringIO())
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(Post.objects.count(), 0)
+        for result in report['endpoints']:
+            self.assertEqual(result['status'], 200, result['endpoint'])
+            self.assertTrue(result['plans'], result['endpoint'])
@@ -0,0 +1,153 @@
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post
+from main import suggest
+from main.suggest import PrefixIndex, get_suggest_index, reset_suggest_index
+
+class PrefixIndexTest(TestCase):
+    def test_matches_any_word_start(self):
+        index = PrefixIndex()
+        index.add('post', 1, 'Strange brass spoon')
+        index.add('post', 2, 'Brass key')
+
+        self.assertEqual({r['id'] for r in index.search('bra')}, {1, 2})
+        self.assertEqual([r['id'] for r in index.search('SPO')], [1])
+        self.assertEqual([r['id'] for r in index.search('brass sp')], [1])
+        self.assertEqual(index.search('rass'), [])
+        self.assertEqual(index.search('  '), [])
+
+    def test_limit_and_kinds(self):
+        index = PrefixIndex()
+        for i in range(10):
+            index.add('post', i, f'Spoon {i}')
+        index.add('tag', 'Q81895', 'spoon', {'description': 'eating utensil'})
+
+        self.assertEqual(len(index.search('spoon', limit=3)), 3)
+        self.assertEqual(
+            index.search('spoon', kinds=['tag']),
+            [{'kind': 'tag', 'id': 'Q81895', 'label': 'spoon', 'description': 'eating utensil'}]
+        )
+
+    def test_scan_is_capped(self):
+        index = PrefixIndex()
+        for i in range(100):
+            index.add('post', i, f'Spoon {i}')
+        index.add('tag', 'Q81895', 'spoons')
+
+        # The tag sorts after every post key, out of reach of a small limit
+        self.assertEqual(index.search('spoon', limit=1, kinds=['tag']), [])
+        self.assertEqual(len(index.search('spoon', limit=6, kinds=['tag'])), 1)
+
+    def test_re_adding_replaces_old_terms(self):
+        index = PrefixIndex()
+        index.add('post', 1, 'Old title')
+        index.add('post', 1, 'New title')
+
+        self.assertEqual(index.search('old'), [])
+        self.assertEqual(index.search('title'), [{'kind': 'post', 'id': 1, 'label': 'New title'}])
+        self.assertEqual(len(index), 2)
+
+    def test_oldest_entries_are_evicted_at_the_cap(self):
+        index = PrefixIndex(max_terms=4)
+        index.add('post', 1, 'red cup')
+        index.add('post', 2, 'blue cup')
+        index.add('post', 3, 'green cup')
+
+        self.assertFalse(index.contains('post', 1))
+        self.assertEqual([r['id'] for r in index.search('cup')], [2, 3])
+
+    def test_bulk_add_keeps_the_latest_items_within_the_cap(self):
+        index = PrefixIndex(max_terms=4)
+        index.bulk_add([
+            ('post', 1, 'red cup', None),
+            ('post', 2, 'blue cup', None),
+            ('post', 3, 'green cup', None),
+        ])
+
+        self.assertEqual([r['id'] for r in index.search('cup')], [2, 3])
+        self.assertEqual(len(index), 4)
+
+
+class SearchSuggestViewTest(TestCase):
+    def setUp(self):
+        reset_suggest_index()
+        self.addCleanup(reset_suggest_index)
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.spoon = Post.objects.create(
+            title='Strange brass spoon',
+            description='Test Description',
+            author=self.user,
+            tags=[{'name': 'Spoon', 'description': 'eating utensil', 'wikidata_id': 'Q81895'}]
+        )
+        self.url = reverse('search_suggest')
+
+    def suggest(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_suggests_posts_and_tags(self):
+        results = self.suggest({'q': 'spo'})
+        self.assertIn({'kind': 'post', 'id': self.spoon.id, 'label': 'Strange brass spoon'}, results)
+        self.assertIn({
+            'kind': 'tag', 'id': 'Q81895', 'label': 'spoon',
+            'description': 'eating utensil', 'wikidata_id': 'Q81895'
+        }, results)
+
+        self.assertEqual([r['kind'] for r in self.suggest({'q': 'spo', 'kind': 'post'})], ['post'])
+
+    def test_follows_post_changes(self):
+        self.suggest({'q': 'spo'})
+
+        self.spoon.title = 'Copper ladle'
+        self.spoon.save()
+        self.assertEqual(self.suggest({'q': 'brass', 'kind': 'post'}), [])
+        self.assertEqual(self.suggest({'q': 'lad', 'kind': 'post'})[0]['id'], self.spoon.id)
+
+        self.spoon.is_deleted = True
+        self.spoon.save(update_fields=['is_deleted'])
+        self.assertEqual(self.suggest({'q': 'lad', 'kind': 'post'}), [])
+
+        other = Post.objects.create(title='Ladder rung', description='Test Description', author=self.user)
+        other.delete()
+        self.assertEqual(self.suggest({'q': 'lad', 'kind': 'post'}), [])
+
+    def test_invalid_limit(self):
+        response = self.client.get(self.url, {'q': 'spo', 'limit': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(SUGGEST_INDEX_TTL=0)
+class SuggestIndexRebuildTest(TransactionTestCase):
+    def setUp(self):
+        reset_suggest_index()
+        self.addCleanup(reset_suggest_index)
+        self.user = User.objects.create_user(username='testuser')
+
+    def wait_for_rebuild(self):
+        rebuild = suggest._rebuild
+        if rebuild is not None:
+            rebuild.join()
+
+    def test_stale_index_is_served_while_rebuilding(self):
+        old = get_suggest_index()
+        # Written by another worker, so no signal reaches this process's index
+        Post.objects.bulk_create([Post(title='Brass spoon', description='x', author=self.user)])
+
+        self.assertIs(get_suggest_index(), old)
+        # A change made here while the rebuild runs survives the swap
+        kept = Post.objects.create(title='Brass key', description='x', author=self.user)
+        self.wait_for_rebuild()
+
+        index = get_suggest_index()
+        self.wait_for_rebuild()
+        self.assertIsNot(index, old)
+        self.assertEqual(len(index.search('brass', kinds=['post'])), 2)
+        self.assertTrue(index.contains('post', kept.pk))
@@ -0,0 +1,90 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, PostTag
+
+class PostTagIndexTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.spoon = self.create_post('Spoon', [
+            {'name': 'Metal', 'description': 'Material', 'wikidata_id': None},
+            {'name': 'Small', 'description': 'Size', 'wikidata_id': None},
+            {'name': 'spoon', 'description': 'eating utensil', 'wikidata_id': 'Q81895'},
+        ])
+        self.cup = self.create_post('Cup', [
+            {'name': 'Ceramic', 'description': 'Material', 'wikidata_id': None},
+            {'name': 'Small', 'description': 'Size', 'wikidata_id': None},
+        ])
+        self.knife = self.create_post('Knife', [
+            {'name': 'Metal', 'description': 'Material', 'wikidata_id': None},
+            {'name': 'Large', 'description': 'Size', 'wikidata_id': None},
+        ])
+
+    def create_post(self, title, tags):
+        return Post.objects.create(
+            title=title,
+            description='Test Description',
+            author=self.user,
+            tags=tags
+        )
+
+    def list_ids(self, params):
+        response = self.client.get(reverse('post-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {post['id'] for post in response.data['results']}
+
+    def test_index_follows_post_tags(self):
+        self.assertEqual(PostTag.objects.filter(post=self.spoon).count(), 3)
+        self.assertTrue(PostTag.objects.filter(
+            post=self.spoon, description='material', name='metal'
+        ).exists())
+
+        self.spoon.tags = [{'name': 'Wood', 'description': 'Material', 'wikidata_id': None}]
+        self.spoon.save()
+        self.assertEqual(
+            list(PostTag.objects.filter(post=self.spoon).values_list('name', flat=True)),
+            ['wood']
+        )
+
+    def test_json_string_tags_from_multipart_forms_are_indexed(self):
+        post = self.create_post('Form Post', json.dumps([
+            {'name': 'Glass', 'description': 'Material', 'wikidata_id': None}
+        ]))
+        self.assertEqual(self.list_ids({'facet': 'material:glass'}), {post.id})
+
+    def test_facets_combine_with_and(self):
+        self.assertEqual(self.list_ids({'facet': 'Material:Metal'}), {self.spoon.id, self.knife.id})
+        self.assertEqual(
+            self.list_ids({'facet': ['Material:Metal', 'Size:Small']}),
+            {self.spoon.id}
+        )
+        self.assertEqual(self.list_ids({'facet': 'Size'}), {self.spoon.id, self.cup.id, self.knife.id})
+        self.assertEqual(self.list_ids({'tag': 'Q81895', 'facet': 'size:small'}), {self.spoon.id})
+        self.assertEqual(self.list_ids({'tag': 'Q81895', 'facet': 'size:large'}), set())
+
+    def test_facet_counts(self):
+        response = self.client.get(reverse('post-facets'), {'only': 'Material,Size'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'material': {'metal': 2, 'ceramic': 1},
+            'size': {'small': 2, 'large': 1},
+        })
+
+        response = self.client.get(reverse('post-facets'), {'only': 'Size', 'facet': 'Material:Metal'})
+        self.assertEqual(response.data, {'size': {'large': 1, 'small': 1}})
+
+    def test_facet_filter_query_count_is_fixed(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('post-list'), {
+                'facet': ['Material:Metal', 'Size:Small'],
+                'tag': 'Q81895'
+            })
@@ -0,0 +1,88 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment
+
+class PostThreadTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(
+            title='Test Post',
+            description='Test Description',
+            author=self.user
+        )
+        self.first = self.comment('First')
+        self.reply = self.comment('Reply', parent=self.first)
+        self.nested_reply = self.comment('Nested Reply', parent=self.reply)
+        self.second = self.comment('Second')
+
+        other_post = Post.objects.create(
+            title='Other Post',
+            description='Test Description',
+            author=self.user
+        )
+        Comment.objects.create(post=other_post, author=self.user, text='Elsewhere')
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(
+            post=self.post,
+            author=self.user,
+            text=text,
+            parent=parent
+        )
+
+    def thread_url(self):
+        return reverse('post-thread', args=[self.post.id])
+
+    def test_thread_nests_replies(self):
+        response = self.client.get(self.thread_url())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 4)
+        self.assertIsNone(response.data['next'])
+
+        first, second = response.data['results']
+        self.assertEqual(first['text'], 'First')
+        self.assertEqual(second['text'], 'Second')
+        self.assertEqual(first['reply_count'], 1)
+        self.assertEqual(first['replies'][0]['text'], 'Reply')
+        self.assertEqual(first['replies'][0]['replies'][0]['text'], 'Nested Reply')
+        self.assertEqual(second['replies'], [])
+
+    def test_depth_limit_marks_truncated_replies(self):
+        response = self.client.get(self.thread_url(), {'depth': 2})
+        reply = response.data['results'][0]['replies'][0]
+        self.assertEqual(reply['replies'], [])
+        self.assertEqual(reply['reply_count'], 1)
+        self.assertTrue(reply['has_more_replies'])
+
+        response = self.client.get(self.thread_url(), {'parent': reply['id']})
+        self.assertEqual(
+            [node['text'] for node in response.data['results']],
+            ['Nested Reply']
+        )
+
+    def test_top_level_comments_are_paged_with_cursor(self):
+        response = self.client.get(self.thread_url(), {'limit': 1})
+        self.assertEqual([node['text'] for node in response.data['results']], ['First'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(
+            self.thread_url(),
+            {'limit': 1, 'cursor': response.data['next']}
+        )
+        self.assertEqual([node['text'] for node in response.data['results']], ['Second'])
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_params_are_rejected(self):
+        response = self.client.get(self.thread_url(), {'depth': 'deep'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.thread_url(), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
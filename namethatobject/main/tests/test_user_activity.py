@@ -0,0 +1,80 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from main.models import Post, Comment
+from main.reputation import get_reputation, rebuild
+
+class UserActivityTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser')
+        self.other = User.objects.create_user(username='otheruser')
+        self.client.force_authenticate(user=self.user)
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', description='Test Description', author=self.user)
+            for i in range(3)
+        ]
+        Post.objects.create(title='Secret', description='Test Description', author=self.user, is_anonymous=True)
+        Post.objects.create(title='Gone', description='Test Description', author=self.user, is_deleted=True)
+        Post.objects.create(title='Theirs', description='Test Description', author=self.other)
+        self.comments = [
+            Comment.objects.create(post=self.posts[0], author=self.user, text=f'Comment {i}')
+            for i in range(2)
+        ]
+        Comment.objects.create(post=self.posts[0], author=self.other, text='Their Comment')
+        Comment.objects.create(post=self.posts[0], author=self.user, text='Anonymized').anonymize()
+
+    def get(self, name, username='testuser', **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name, args=[username]), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), len(queries)
+
+    def test_lists_public_posts_newest_first(self):
+        data, _ = self.get('user_posts')
+        self.assertEqual([post['title'] for post in data['results']], ['Post 2', 'Post 1', 'Post 0'])
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['results'][0]['author']['username'], 'testuser')
+
+    def test_lists_comments_newest_first(self):
+        data, _ = self.get('user_comments')
+        self.assertEqual([comment['id'] for comment in data['results']], [c.pk for c in reversed(self.comments)])
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(get_reputation(self.user).comment_count, 2)
+        rebuild([self.user.pk])
+        self.assertEqual(get_reputation(self.user).comment_count, 2)
+
+    def test_counts_come_from_reputation(self):
+        reputation = get_reputation(self.user)
+        reputation.post_count = 1000
+        reputation.save()
+        data, _ = self.get('user_posts', fields='id')
+        self.assertEqual(data['count'], 1000)
+
+    def test_pages_with_cursor(self):
+        data, _ = self.get('user_posts', page_size=2, fields='title')
+        self.assertEqual(data['results'], [{'title': 'Post 2'}, {'title': 'Post 1'}])
+        self.assertIsNone(data['previous'])
+        second = self.client.get(data['next']).json()
+        self.assertEqual(second['results'], [{'title': 'Post 0'}])
+        self.assertIsNone(second['next'])
+
+    def test_query_count_does_not_grow_with_activity(self):
+        get_reputation(self.user)
+        _, before = self.get('user_posts')
+        for i in range(20):
+            Post.objects.create(title=f'More {i}', description='Test Description', author=self.user)
+        _, after = self.get('user_posts')
+        self.assertEqual(before, after)
+
+    def test_unknown_user_and_fields(self):
+        response = self.client.get(reverse('user_posts', args=['nobody']))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('user_comments', args=['testuser']), {'fields': 'color'})
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('user_posts', args=['testuser']))
+        self.assertEqual(response.status_code, 401)
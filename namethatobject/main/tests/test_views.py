@@ -38,7 +38,7 @@ class PostViewSetTest(TestCase):
         )
         response = self.client.get(reverse('post-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
 class CommentViewSetTest(TestCase):
     def setUp(self):
@@ -80,4 +80,4 @@ class CommentViewSetTest(TestCase):
         )
         response = self.client.get(reverse('comment-list'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1) 
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1) 
\ No newline at end of file
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from main.models import Post, Comment, Vote, VoteFlushBatch
+from main.vote_buffer import VoteBuffer
+from main.votes import cast_vote
+
+DEAD_PID = 999999999
+
+class VoteBufferTest(TransactionTestCase):
+    def setUp(self):
+        self.journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.journal_dir)
+        self.buffer = VoteBuffer(self.journal_dir, flush_interval=3600)
+        self.addCleanup(self.buffer.journal.close)
+
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.post = Post.objects.create(
+            title='Test Post',
+            description='Test Description',
+            author=self.user
+        )
+        self.comment = Comment.objects.create(
+            post=self.post,
+            author=self.user,
+            text='Test Comment'
+        )
+
+    def write_journal(self, name, rows):
+        with open(os.path.join(self.journal_dir, name), 'w') as journal:
+            for row in rows:
+                journal.write(json.dumps(row) + '\n')
+
+    def test_votes_are_deferred_until_flush(self):
+        voters = [
+            User.objects.create_user(username=f'voter{i}', password='testpass123')
+            for i in range(3)
+        ]
+        for voter in voters:
+            post = cast_vote(voter, self.post, Vote.UPVOTE, vote_buffer=self.buffer)
+
+        # The voter sees their own vote straight away...
+        self.assertEqual(post.upvotes, 3)
+        # ...while the row itself is only written on flush.
+        self.assertEqual(Post.objects.get(pk=self.post.pk).upvotes, 0)
+
+        cast_vote(voters[0], self.comment, Vote.DOWNVOTE, vote_buffer=self.buffer)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        self.post.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertEqual((self.post.upvotes, self.post.downvotes), (3, 0))
+        self.assertEqual((self.comment.upvotes, self.comment.downvotes), (0, 1))
+        self.assertEqual(self.buffer.pending_for(Post, self.post.pk), (0, 0))
+        self.assertEqual(os.listdir(self.journal_dir), [os.path.basename(self.buffer.journal_path)])
+
+    def test_replay_applies_journal_of_dead_process(self):
+        self.write_journal(f'votes-{DEAD_PID}.log', [
+            ['main.Post', self.post.pk, 1, 0],
+            ['main.Post', self.post.pk, 1, 0],
+        ])
+        with open(os.path.join(self.journal_dir, f'votes-{DEAD_PID}.log'), 'a') as journal:
+            journal.write('["main.Post", ')  # torn write
+
+        self.buffer.replay()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.upvotes, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.journal_dir, f'votes-{DEAD_PID}.log')))
+
+    def test_replay_skips_batches_that_were_already_applied(self):
+        VoteFlushBatch.objects.create(batch_id='applied')
+        self.write_journal(f'votes-{DEAD_PID}-applied.batch', [['main.Post', self.post.pk, 5, 0]])
+        self.write_journal(f'votes-{DEAD_PID}-pending.batch', [['main.Post', self.post.pk, 0, 2]])
+
+        self.buffer.replay()
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.upvotes, self.post.downvotes), (0, 2))
+        self.assertTrue(VoteFlushBatch.objects.filter(batch_id='pending').exists())
+
+    def test_replay_applies_identical_journals_of_different_processes(self):
+        for pid in (DEAD_PID, DEAD_PID - 1):
+            self.write_journal(f'votes-{pid}.log', [['main.Post', self.post.pk, 1, 0]])
+
+        self.buffer.replay()
+        self.buffer.replay()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.upvotes, 2)
+
+    def test_flush_prunes_old_batch_ids(self):
+        VoteFlushBatch.objects.create(batch_id='old')
+        VoteFlushBatch.objects.create(batch_id='recent')
+        VoteFlushBatch.objects.filter(batch_id='old').update(created_at=timezone.now() - timedelta(days=30))
+
+        cast_vote(self.user, self.post, Vote.UPVOTE, vote_buffer=self.buffer)
+        self.buffer.flush()
+        self.assertFalse(VoteFlushBatch.objects.filter(batch_id='old').exists())
+        self.assertTrue(VoteFlushBatch.objects.filter(batch_id='recent').exists())
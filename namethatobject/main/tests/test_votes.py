@@ -0,0 +1,99 @@
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from main.models import Post, Comment, Vote
+from main.votes import cast_vote
+
+class VoteLedgerTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(
+            title='Test Post',
+            description='Test Description',
+            author=self.user
+        )
+        self.comment = Comment.objects.create(
+            post=self.post,
+            author=self.user,
+            text='Test Comment'
+        )
+
+    def test_post_upvote_is_recorded_once_per_user(self):
+        url = reverse('post-upvote', args=[self.post.id])
+        for _ in range(3):
+            response = self.client.post(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['upvotes'], 1)
+        self.assertEqual(Vote.objects.filter(post=self.post, user=self.user).count(), 1)
+
+    def test_changing_vote_moves_counters(self):
+        self.client.post(reverse('post-upvote', args=[self.post.id]))
+        response = self.client.post(reverse('post-downvote', args=[self.post.id]))
+        self.assertEqual(response.data['upvotes'], 0)
+        self.assertEqual(response.data['downvotes'], 1)
+        self.assertEqual(Vote.objects.get(post=self.post).value, Vote.DOWNVOTE)
+
+    def test_comment_votes(self):
+        other = User.objects.create_user(username='other', password='testpass123')
+        cast_vote(other, self.comment, Vote.UPVOTE)
+
+        response = self.client.post(reverse('comment-upvote', args=[self.comment.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['upvotes'], 2)
+        self.assertEqual(response.data['points'], 2)
+
+        response = self.client.post(reverse('comment-downvote', args=[self.comment.id]))
+        self.assertEqual(response.data['upvotes'], 1)
+        self.assertEqual(response.data['downvotes'], 1)
+        self.assertEqual(Vote.objects.filter(comment=self.comment).count(), 2)
+
+    def test_vote_updates_only_counter_columns(self):
+        Post.objects.filter(pk=self.post.pk).update(title='Changed Elsewhere')
+        cast_vote(self.user, self.post, Vote.UPVOTE)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.title, 'Changed Elsewhere')
+        self.assertEqual(self.post.upvotes, 1)
+
+    def test_anonymous_users_cannot_vote(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.post(reverse('post-upvote', args=[self.post.id]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Vote.objects.exists())
+
+class ConcurrentVoteTest(TransactionTestCase):
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_concurrent_votes_do_not_drift(self):
+        author = User.objects.create_user(username='author', password='testpass123')
+        post = Post.objects.create(title='Test Post', description='Test Description', author=author)
+        voters = [
+            User.objects.create_user(username=f'voter{i}', password='testpass123')
+            for i in range(20)
+        ]
+
+        def vote(user):
+            try:
+                for value in (Vote.UPVOTE, Vote.DOWNVOTE, Vote.UPVOTE):
+                    cast_vote(user, Post.objects.get(pk=post.pk), value)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=vote, args=(user,)) for user in voters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        post.refresh_from_db()
+        self.assertEqual(post.upvotes, len(voters))
+        self.assertEqual(post.downvotes, 0)
+        self.assertEqual(Vote.objects.filter(post=post, value=Vote.UPVOTE).count(), len(voters))
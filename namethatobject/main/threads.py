@@ -0,0 +1,99 @@
+import base64
+import json
+from datetime import datetime
+
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(comment):
+    payload = json.dumps([comment.created_at.isoformat(), comment.id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, comment_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        created_at = datetime.fromisoformat(created_at)
+        comment_id = int(comment_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+    if created_at.tzinfo is None:
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+    return created_at, comment_id
+
+
+class CommentThread:
+    """
+    Parent/reply tree for the comments of one post.
+
+    `comments` must already be ordered by (created_at, id); the tree is built
+    in a single pass over them, so building a thread is O(n) in the number of
+    comments on the post regardless of how deep the replies go.
+    """
+
+    def __init__(self, comments):
+        self.comments = list(comments)
+        self.children = {}
+        self.roots = []
+        for comment in self.comments:
+            self.children.setdefault(comment.id, [])
+        for comment in self.comments:
+            if comment.parent_id is None or comment.parent_id not in self.children:
+                self.roots.append(comment)
+            else:
+                self.children[comment.parent_id].append(comment)
+
+    def window(self, parent_id=None, cursor=None, limit=50):
+        """
+        Return the top-level slice of the thread (or of one comment's
+        replies when `parent_id` is given) after `cursor`, plus the cursor
+        for the next slice, or None when there is nothing left.
+        """
+        if parent_id is None:
+            siblings = self.roots
+        else:
+            siblings = self.children.get(parent_id, [])
+
+        if cursor:
+            created_at, comment_id = decode_cursor(cursor)
+            siblings = [
+                comment for comment in siblings
+                if (comment.created_at, comment.id) > (created_at, comment_id)
+            ]
+
+        page = siblings[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(siblings) > limit else None
+        return page, next_cursor
+
+    def render(self, roots, serialize, max_depth=None):
+        """
+        Nest the serialized form of `roots` and their replies.
+
+        Replies below `max_depth` are not rendered; their parent instead
+        reports `has_more_replies` so the client can fetch them lazily with
+        `?parent=<id>`.
+        """
+        selected = []
+        stack = [(comment, 1) for comment in roots]
+        while stack:
+            comment, depth = stack.pop()
+            selected.append(comment)
+            if max_depth is None or depth < max_depth:
+                stack.extend((child, depth + 1) for child in self.children[comment.id])
+
+        nodes = {}
+        for comment, data in zip(selected, serialize(selected)):
+            data['reply_count'] = len(self.children[comment.id])
+            data['has_more_replies'] = False
+            data['replies'] = []
+            nodes[comment.id] = data
+
+        for comment in selected:
+            node = nodes[comment.id]
+            for child in self.children[comment.id]:
+                if child.id in nodes:
+                    node['replies'].append(nodes[child.id])
+                else:
+                    node['has_more_replies'] = True
+
+        return [nodes[comment.id] for comment in roots]
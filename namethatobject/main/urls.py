@@ -3,7 +3,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import PostViewSet, CommentViewSet, UserProfileView, SignUpView, delete_account  # Removed TagViewSet
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet)
@@ -12,9 +12,24 @@ router.register(r'comments', CommentViewSet)
 # Define URL patterns
 urlpatterns = [
     path('', include(router.urls)),
+    path('posts/<int:pk>/events/', views.post_events, name='post_events'),
+    # Async twins of the hot read endpoints, for ASGI deployments (see main/async_views.py)
+    path('async/posts/', async_views.post_list, name='async_post_list'),
+    path('async/posts/search/', async_views.post_search, name='async_post_search'),
+    path('async/posts/<int:pk>/', async_views.post_detail, name='async_post_detail'),
+    path('async/posts/<int:pk>/thread/', async_views.post_thread, name='async_post_thread'),
     path('user/profile/', UserProfileView.as_view(), name='user_profile'),  # User profile endpoint
     path('user/profile/<str:username>/', UserProfileView.as_view(), name='user_profile_detail'),
+    path('user/profile/<str:username>/stats/', views.user_stats, name='user_stats'),
+    path('user/profile/<str:username>/posts/', views.user_posts, name='user_posts'),
+    path('user/profile/<str:username>/comments/', views.user_comments, name='user_comments'),
     path('api/signup/', SignUpView.as_view(), name='signup'),  # Signup endpoint
+    path('uploads/', views.ChunkedUploadListView.as_view(), name='chunked_upload_list'),
+    path('uploads/<uuid:upload_id>/', views.ChunkedUploadDetailView.as_view(), name='chunked_upload_detail'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
+    path('leaderboards/users/', views.user_leaderboard, name='user_leaderboard'),
+    path('leaderboards/mysteries/', views.mystery_leaderboard, name='mystery_leaderboard'),
     path('user/delete-account/', delete_account, name='delete_account'),
+    path('user/delete-account/<uuid:job_id>/', views.account_deletion_status, name='account_deletion_status'),
     path('api/run-tests/', views.run_tests, name='run-tests'),
 ]
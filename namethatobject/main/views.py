@@ -1,20 +1,58 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from rest_framework import viewsets, generics, status, filters
+from rest_framework import viewsets, generics, status
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.views import APIView
-from rest_framework.decorators import action, api_view, permission_classes
-from .models import Post, Comment, UserProfile
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
+from rest_framework.renderers import BrowsableAPIRenderer
+from .models import Post, Comment, UserProfile, Vote, ChunkedUpload, PostImageHash, AccountDeletion
 from .forms import CommentForm
 from .serializers import PostSerializer, CommentSerializer, UserSerializer, UserProfileSerializer
+from .flat_serializers import FlatCommentSerializer, FlatPostSerializer, FlatThreadCommentSerializer
+from .fieldsets import parse_fieldset, related_id, shape_serializer
+from .renderers import FastJSONRenderer, with_fast_json
+from .threads import CommentThread
+from .query_planner import plan_queryset
+from .pagination import CreatedAtCursorPagination, FeedCursorPagination, feed_ordering
+from .votes import cast_vote
+from .search import get_search_backend
+from .tags import facet_counts, filter_by_tags
+from .suggest import get_suggest_index
+from .media import MEDIA_KINDS, ingest_media
+from .duplicates import duplicate_settings, find_similar, index_image
+from .reputation import get_reputation, stats as reputation_stats
+from .accounts import content_count, delete_account as delete_user_account, deletion_settings, deletion_state, start_deletion
+from .leaderboards import LeaderboardError, leaderboard_settings, post_page, resolve_board, user_page
+from .chunked_uploads import UploadError, attach_upload, create_upload, discard_upload, upload_state, write_chunk
+from .response_cache import POST_LIST, cached_response, post_key, user_key
+from . import events
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.authtoken.views import ObtainAuthToken
 import subprocess
-from django.db.models import Q
+from django.core.files.uploadedfile import UploadedFile
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 import os
 
+def int_query_param(request, name, default=None, minimum=1, maximum=None):
+    value = request.query_params.get(name, None)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be an integer.'})
+    if value < minimum:
+        raise ValidationError({name: f'Must be at least {minimum}.'})
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
 def post_list(request):
     posts = Post.objects.all()
     return render(request, 'main/post_list.html', {'posts': posts})
@@ -39,27 +77,128 @@ def post_detail(request, post_id):
         'form': form
     })
 
+def read_serializer(request, serializer):
+    """`serializer`, pruned to the request's sparse fieldset (`?fields=`/`?expand=`) on reads."""
+    if request.method == 'GET':
+        shape_serializer(serializer, parse_fieldset(request))
+    return serializer
+
+def sparse_read(request):
+    """Whether the request is a read asking for a sparse fieldset, so planned querysets may defer columns."""
+    return request.method == 'GET' and parse_fieldset(request) is not None
+
+def post_queryset(request, action, serializer=PostSerializer):
+    """Visible posts narrowed by the request's filters, planned for `serializer` (a class or instance)."""
+    queryset = Post.objects.filter(is_deleted=False)
+    if action == 'list' and feed_ordering(request) == 'unsolved':
+        queryset = queryset.filter(eureka_comment__isnull=True)
+    queryset = filter_by_tags(
+        queryset,
+        name=request.query_params.get('tag_name', None),
+        description=request.query_params.get('tag_description', None),
+        wikidata_id=request.query_params.get('tag_wikidata_id', None),
+        tags=request.query_params.getlist('tag'),
+        facets=request.query_params.getlist('facet')
+    )
+    search_query = request.query_params.get('search', None)
+    if search_query:
+        queryset = get_search_backend().filter(queryset, search_query)
+    return plan_queryset(queryset, serializer, only=sparse_read(request))
+
+def flat_list(view, serializer_class):
+    """`view.list()`, with the page rendered by a flat serializer in the request's fieldset."""
+    serializer = serializer_class(parse_fieldset(view.request))
+    queryset = serializer.rows(view.filter_queryset(view.get_queryset()))
+    page = view.paginate_queryset(queryset)
+    if page is None:
+        return Response(serializer.serialize(queryset))
+    return view.get_paginated_response(serializer.serialize(page))
+
 class PostViewSet(viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['title', 'description', 'tags']
     parser_classes = (JSONParser, MultiPartParser, FormParser)
+    pagination_class = FeedCursorPagination
 
     def get_queryset(self):
-        queryset = Post.objects.filter(is_deleted=False)
-        search_query = self.request.query_params.get('search', None)
-        if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(tags__icontains=search_query)
-            )
-        return queryset
+        return post_queryset(self.request, self.action, self.get_serializer())
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        # The fieldset of a thread is that of its comments
+        if self.action == 'thread':
+            return serializer
+        return read_serializer(self.request, serializer)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action in ('list', 'thread'):
+            return with_fast_json(renderers)
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, [POST_LIST],
+            lambda: flat_list(self, FlatPostSerializer)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, [post_key(self.kwargs['pk'])],
+            lambda: super(PostViewSet, self).retrieve(request, *args, **kwargs),
+            discover=lambda data: [user_key(related_id(data['author']))] if data.get('author') else []
+        )
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        # Earlier posts of what looks like the same object, so the author can
+        # join that discussion instead of splitting it
+        response.data['similar_mysteries'] = getattr(self, 'similar_mysteries', [])
+        return response
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        # Uploaded files are staged locally and pushed to media storage by
+        # the background pipeline, so the response doesn't wait on the CDN.
+        files = {
+            kind: serializer.validated_data.pop(kind)
+            for kind in MEDIA_KINDS
+            if isinstance(serializer.validated_data.get(kind), UploadedFile)
+        }
+        uploads = self.completed_uploads(self.request.data)
+        post = serializer.save(author=self.request.user)
+        staged = ingest_media(post, files)
+        for upload in uploads:
+            attach_upload(upload, post)
+        self.similar_mysteries = self.find_duplicates(post, staged)
+
+    def find_duplicates(self, post, staged):
+        """Hash the staged image of a new post into the duplicate index and look up near matches."""
+        image = next((upload for upload in staged if upload.kind == 'image'), None)
+        if image is None or not duplicate_settings()['ENABLED']:
+            return []
+        try:
+            value = index_image(post, image.staged_path)
+        except Exception as e:
+            print(f"Error hashing image for post {post.pk}: {e}")
+            return []
+        return find_similar(value, exclude=post.pk)
+
+    def completed_uploads(self, data):
+        """Finished chunked uploads named by `video_upload`/`audio_upload`, checked before the post is saved."""
+        uploads = []
+        for kind, _ in ChunkedUpload.KIND_CHOICES:
+            upload_id = data.get(f'{kind}_upload')
+            if not upload_id:
+                continue
+            try:
+                upload = ChunkedUpload.objects.get(
+                    pk=upload_id, user=self.request.user, kind=kind, status=ChunkedUpload.COMPLETE
+                )
+            except (ChunkedUpload.DoesNotExist, DjangoValidationError):
+                raise ValidationError({f'{kind}_upload': 'No completed upload with this id.'})
+            uploads.append(upload)
+        return uploads
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -125,20 +264,118 @@ class PostViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def upvote(self, request, pk=None):
-        post = self.get_object()
-        post.upvotes += 1
-        post.save()
+        post = cast_vote(request.user, self.get_object(), Vote.UPVOTE)
         serializer = self.get_serializer(post)
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
     def downvote(self, request, pk=None):
-        post = self.get_object()
-        post.downvotes += 1
-        post.save()
+        post = cast_vote(request.user, self.get_object(), Vote.DOWNVOTE)
         serializer = self.get_serializer(post)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'], url_path='attach-media')
+    def attach_media(self, request, pk=None):
+        """Attach a completed chunked upload (`upload`) to this post as its video or audio."""
+        post = self.get_object()
+        if post.author != request.user:
+            return Response({'error': 'You do not have permission to edit this post'}, status=403)
+        try:
+            upload = ChunkedUpload.objects.get(pk=request.data.get('upload'), user=request.user)
+        except (ChunkedUpload.DoesNotExist, DjangoValidationError):
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            attach_upload(upload, post)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status)
+        post.refresh_from_db()
+        return Response(self.get_serializer(post).data)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Other mysteries whose image looks like this one's, closest first (`distance` in bits)."""
+        post = self.get_object()
+        try:
+            image_hash = post.image_hash
+        except PostImageHash.DoesNotExist:
+            return Response({'results': []})
+        limit = int_query_param(request, 'limit', default=duplicate_settings()['LIMIT'], maximum=50)
+        return Response({'results': find_similar(image_hash.dhash, exclude=post.pk, limit=limit)})
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over title, tags and description.
+
+        `q` is the search text; results carry a `rank` and a `highlight`
+        of HTML-escaped text with `<mark>`-wrapped matches. Accepts the
+        same `tag_name`, `tag_description` and `tag_wikidata_id` exact
+        filters as the list, and pages with `limit`/`offset`.
+        """
+        text = request.query_params.get('q', '').strip()
+        limit = int_query_param(request, 'limit', default=20, maximum=50)
+        offset = int_query_param(request, 'offset', default=0, minimum=0)
+        if not text:
+            return Response({'next': None, 'results': []})
+
+        queryset = self.get_queryset()
+        matches = get_search_backend().search(queryset, text, offset, limit + 1)
+        results = []
+        for match in matches[:limit]:
+            data = self.get_serializer(match.post).data
+            data['rank'] = match.rank
+            data['highlight'] = match.highlight
+            results.append(data)
+        return Response({
+            'next': offset + limit if len(matches) > limit else None,
+            'results': results
+        })
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Per-facet tag counts over the posts the list would return for the
+        same filters (`tag`, `facet`, `search`, ...). `only` is a
+        comma-separated list of facets to count.
+        """
+        only = request.query_params.get('only', '')
+        descriptions = [description for description in only.split(',') if description.strip()]
+        return Response(facet_counts(self.get_queryset(), descriptions or None))
+
+    @action(detail=True, methods=['get'])
+    def thread(self, request, pk=None):
+        """
+        Nested comment tree of one post.
+
+        Query params: `depth` caps how many reply levels are rendered,
+        `limit`/`cursor` page through top-level comments, and `parent`
+        returns the replies of a single comment instead (used to lazily
+        load replies that were cut off by `depth`).
+        """
+        post = self.get_object()
+        max_depth = int_query_param(request, 'depth')
+        limit = int_query_param(request, 'limit', default=50, maximum=200)
+        parent_id = int_query_param(request, 'parent')
+
+        serializer = FlatThreadCommentSerializer(parse_fieldset(request))
+        thread = CommentThread(serializer.rows(Comment.objects.filter(post=post).order_by('created_at', 'id')))
+        roots, next_cursor = thread.window(
+            parent_id=parent_id,
+            cursor=request.query_params.get('cursor', None),
+            limit=limit
+        )
+        results = thread.render(
+            roots,
+            serializer.serialize,
+            max_depth=max_depth
+        )
+        return Response({
+            'post': post.id,
+            'count': len(thread.comments),
+            'next': next_cursor,
+            'results': results
+        })
+
     def destroy(self, request, *args, **kwargs):
         post = self.get_object()
 
@@ -164,6 +401,27 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_queryset(self):
+        queryset = Comment.objects.all()
+        post_id = self.request.query_params.get('post', None)
+        if post_id is not None:
+            if not post_id.isdigit():
+                return queryset.none()
+            queryset = queryset.filter(post_id=post_id)
+        return plan_queryset(queryset, self.get_serializer(), only=sparse_read(self.request))
+
+    def get_serializer(self, *args, **kwargs):
+        return read_serializer(self.request, super().get_serializer(*args, **kwargs))
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == 'list':
+            return with_fast_json(renderers)
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        return flat_list(self, FlatCommentSerializer)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -189,9 +447,7 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def upvote(self, request, pk=None):
-        comment = self.get_object()
-        comment.upvotes += 1
-        comment.save()
+        comment = cast_vote(request.user, self.get_object(), Vote.UPVOTE)
         return Response(
             {
                 'points': comment.points,
@@ -204,9 +460,7 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def downvote(self, request, pk=None):
-        comment = self.get_object()
-        comment.downvotes += 1
-        comment.save()
+        comment = cast_vote(request.user, self.get_object(), Vote.DOWNVOTE)
         return Response(
             {
                 'points': comment.points,
@@ -238,10 +492,11 @@ class UserProfileView(APIView):
 
     def get(self, request, username=None):
         if username:
-            user = get_object_or_404(User, username=username)
+            users = plan_queryset(User.objects.all(), read_serializer(request, UserSerializer()), only=sparse_read(request))
+            user = get_object_or_404(users, username=username)
         else:
             user = request.user
-        serializer = UserSerializer(user)
+        serializer = read_serializer(request, UserSerializer(user))
         return Response(serializer.data)
 
     def patch(self, request):
@@ -264,38 +519,238 @@ class UserProfileView(APIView):
         # Add this method to handle PUT requests as well
         return self.patch(request)
 
+class ChunkedUploadListView(APIView):
+    """
+    Start a resumable video/audio upload.
+
+    POST `{kind, filename, length}` (or an `Upload-Length` header) returns
+    the upload with `offset` 0 and its URL in `Location`; the file is then
+    sent in chunks to that URL with PATCH.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        length = request.data.get('length', request.headers.get('Upload-Length'))
+        try:
+            upload = create_upload(request.user, request.data.get('kind'), request.data.get('filename'), length)
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status)
+        response = Response(upload_state(upload), status=status.HTTP_201_CREATED)
+        response['Location'] = reverse('chunked_upload_detail', kwargs={'upload_id': upload.id})
+        response['Upload-Offset'] = upload.offset
+        return response
+
+class ChunkedUploadDetailView(APIView):
+    """
+    One resumable upload, following the tus protocol's core and checksum
+    extension: HEAD/GET report `Upload-Offset`, PATCH with an
+    `application/offset+octet-stream` body, `Upload-Offset` and
+    `Upload-Checksum: sha256 <base64>` appends a chunk, DELETE cancels.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_upload(self, request, upload_id):
+        return get_object_or_404(ChunkedUpload, pk=upload_id, user=request.user)
+
+    def offset_response(self, upload, data=None, status_code=status.HTTP_200_OK):
+        response = Response(data, status=status_code)
+        response['Upload-Offset'] = upload.offset
+        response['Upload-Length'] = upload.length
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def head(self, request, upload_id):
+        return self.offset_response(self.get_upload(request, upload_id))
+
+    def get(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        return self.offset_response(upload, upload_state(upload))
+
+    def patch(self, request, upload_id):
+        upload = self.get_upload(request, upload_id)
+        if request.content_type != 'application/offset+octet-stream':
+            return Response(
+                {'error': 'Chunks must be sent as application/offset+octet-stream.'},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            content_length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return Response({'error': 'Upload-Offset and Content-Length must be integers.'}, status=400)
+        try:
+            # Read the body straight from the request rather than request.data,
+            # which would buffer the whole chunk in memory
+            write_chunk(upload, offset, request.stream, content_length, request.headers.get('Upload-Checksum'))
+        except UploadError as e:
+            upload.refresh_from_db(fields=['offset'])
+            return self.offset_response(upload, {'error': str(e)}, e.status)
+        return self.offset_response(upload, status_code=status.HTTP_204_NO_CONTENT)
+
+    def delete(self, request, upload_id):
+        try:
+            discard_upload(self.get_upload(request, upload_id))
+        except UploadError as e:
+            return Response({'error': str(e)}, status=e.status)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_suggest(request):
+    """
+    Search-as-you-type suggestions from post titles and known tags.
+
+    `q` is the typed prefix, `limit` caps the number of suggestions and
+    `kind` (`post`, `tag` or both comma-separated) restricts what is returned.
+    """
+    limit = int_query_param(request, 'limit', default=5, maximum=20)
+    kinds = [kind for kind in request.query_params.get('kind', '').split(',') if kind] or None
+    results = get_suggest_index().search(request.query_params.get('q', ''), limit=limit, kinds=kinds)
+    return Response({'results': results})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def user_stats(request, username):
+    """Points, rank, badges and activity totals of a user, read from their reputation row."""
+    user = get_object_or_404(User, username=username)
+    return Response(reputation_stats(get_reputation(user)))
+
+
+def user_activity(request, username, queryset, serializer_class, count):
+    """
+    One cursor page of a user's public posts or comments, newest first.
+    `count` reads the total from the user's reputation row, which tracks the
+    same rows, so the page is the only query that touches the content tables.
+    """
+    user = get_object_or_404(User, username=username)
+    paginator = CreatedAtCursorPagination()
+    serializer = serializer_class(parse_fieldset(request))
+    page = paginator.paginate_queryset(serializer.rows(queryset.filter(author=user)), request)
+    return Response({
+        'count': count(get_reputation(user)),
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': serializer.serialize(page)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def user_posts(request, username):
+    """A user's posts, leaving out the ones posted anonymously. Takes `fields` like `/posts/`."""
+    return user_activity(
+        request, username, Post.objects.filter(is_anonymous=False, is_deleted=False),
+        FlatPostSerializer, lambda reputation: reputation.post_count
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def user_comments(request, username):
+    """A user's comments, leaving out anonymized ones. Takes `fields` like `/comments/`."""
+    return user_activity(
+        request, username, Comment.objects.filter(is_anonymous=False),
+        FlatCommentSerializer, lambda reputation: reputation.comment_count
+    )
+
+
+def leaderboard_response(request, subject, metric, default_period, page):
+    config = leaderboard_settings()
+    limit = int_query_param(request, 'limit', default=config['PAGE_SIZE'], maximum=config['MAX_PAGE_SIZE'])
+    offset = int_query_param(request, 'offset', default=0, minimum=0)
+    period = request.query_params.get('period') or default_period
+    try:
+        board = resolve_board(subject, metric, period, request.query_params.get('tag'))
+    except LeaderboardError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    results = page(board, offset, limit)
+    return Response({
+        'metric': metric,
+        'period': period,
+        'next': offset + limit if len(results) > limit else None,
+        'results': results[:limit],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def user_leaderboard(request):
+    """
+    Users ranked by reputation points: all-time (`period=all`, optionally
+    `tag=`) or for a week (`period=week` or e.g. `2024-W07`). Pages with
+    `limit`/`offset`.
+    """
+    return leaderboard_response(request, 'users', 'points', 'all', user_page)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def mystery_leaderboard(request):
+    """
+    Mysteries ranked by `metric`: `points` (all-time), `activity` (votes and
+    comments in a week) or `hot` (the most active unsolved ones this week),
+    optionally within a `tag`. Pages with `limit`/`offset`.
+    """
+    metric = request.query_params.get('metric') or 'points'
+    return leaderboard_response(request, 'posts', metric, 'all' if metric == 'points' else 'week', post_page)
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_account(request):
+    """
+    Delete the signed-in user's account. Posts others have commented on stay
+    up anonymized, the rest are removed, and comments are anonymized. Large
+    accounts (or `?background=true`) are deleted by a background job: the
+    response is 202 with a status URL to poll for progress.
+    """
+    user = request.user
+    background = request.query_params.get('background', '').lower() in ('1', 'true', 'yes')
+    if background or content_count(user) > deletion_settings()['BACKGROUND_THRESHOLD']:
+        job = start_deletion(user)
+        return Response({
+            **deletion_state(job),
+            'status_url': reverse('account_deletion_status', kwargs={'job_id': job.pk}),
+        }, status=status.HTTP_202_ACCEPTED)
     try:
-        user = request.user
-        
-        # Get all user's posts
-        posts = Post.objects.filter(author=user)
-        
-        # Handle posts based on comments
-        for post in posts:
-            comment_count = Comment.objects.filter(post=post).count()
-            if comment_count > 0:
-                # If post has comments, mark as anonymous
-                post.anonymize()
-            else:
-                # If no comments, mark as deleted
-                post.is_deleted = True
-                post.save()
-
-        # Anonymize all comments
-        Comment.objects.filter(author=user).update(is_anonymous=True)
-        
-        # Delete the user
-        user.delete()
-        
+        delete_user_account(user)
         return Response({"message": "Account successfully deleted"}, 
                       status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": str(e)}, 
                       status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def account_deletion_status(request, job_id):
+    """Progress of a background account deletion. The job id is only ever given to the account owner."""
+    return Response(deletion_state(get_object_or_404(AccountDeletion, pk=job_id)))
+
+
+@require_GET
+async def post_events(request, pk):
+    """
+    Live updates of one post as server-sent events: `comment` (a new node
+    of the thread), `votes` (current counters of the post or one of its
+    comments), `eureka`, and `resync` when the client fell behind and
+    should re-fetch. A plain Django view rather than DRF, which has no
+    async views; it needs the ASGI entry point, where an open stream holds
+    no worker thread.
+    """
+    if not await Post.objects.filter(pk=pk, is_deleted=False).aexists():
+        return JsonResponse({'error': 'Post not found'}, status=404)
+    response = StreamingHttpResponse(events.stream(pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 class CustomAuthToken(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data,
@@ -0,0 +1,276 @@
+import atexit
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .response_cache import invalidate_post
+
+DEFAULTS = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL': 1.0,
+    'JOURNAL_DIR': None,
+    'FSYNC': False,
+    'BATCH_SIZE': 500,
+    # Applied batch ids are kept this long (seconds): a batch file left by a
+    # crash must be replayed within this window to be recognised as applied
+    'BATCH_RETENTION': 7 * 24 * 3600,
+}
+
+# Applied batch ids are pruned at most this often (seconds) per process
+PRUNE_INTERVAL = 3600
+
+
+def buffer_settings():
+    return {**DEFAULTS, **getattr(settings, 'VOTE_BUFFER', {})}
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class VoteBuffer:
+    """
+    Write-behind buffer for Post/Comment vote counters.
+
+    Votes still go to the Vote ledger synchronously, but instead of an
+    UPDATE on the (possibly very hot) target row, the counter delta is
+    appended to a per-process journal file and summed in memory. A background
+    thread periodically folds all pending deltas into the database with one
+    batched UPDATE per model.
+
+    Crash safety: before a flush the journal is renamed to a batch file named
+    after a fresh batch id, and the batch id is stored in VoteFlushBatch in
+    the same transaction as the counter updates. On start-up, batch files
+    whose id is already recorded are discarded and the rest (plus any journal
+    left behind by a dead process) are re-applied, so every delta is counted
+    exactly once. Journals live on local disk, so this covers the processes
+    of one host.
+    """
+
+    def __init__(self, journal_dir, flush_interval=1.0, fsync=False, batch_size=500, batch_retention=7 * 24 * 3600):
+        self.journal_dir = journal_dir
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.batch_retention = batch_retention
+        self.pruned_at = None
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending = {}
+        self.stopped = threading.Event()
+        self.thread = None
+        os.makedirs(journal_dir, exist_ok=True)
+        self.journal_path = os.path.join(journal_dir, f'votes-{self.pid}.log')
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    # Recording
+
+    def add(self, model, pk, upvotes, downvotes):
+        if not upvotes and not downvotes:
+            return
+        label = model._meta.label
+        with self.lock:
+            self.journal.write(json.dumps([label, pk, upvotes, downvotes]) + '\n')
+            self.journal.flush()
+            if self.fsync:
+                os.fsync(self.journal.fileno())
+            self._accumulate(self.pending, label, pk, upvotes, downvotes)
+
+    def pending_for(self, model, pk):
+        """Deltas not yet written to the database, for read-your-writes responses."""
+        with self.lock:
+            return tuple(self.pending.get((model._meta.label, pk), (0, 0)))
+
+    @staticmethod
+    def _accumulate(pending, label, pk, upvotes, downvotes):
+        counts = pending.setdefault((label, pk), [0, 0])
+        counts[0] += upvotes
+        counts[1] += downvotes
+
+    # Flushing
+
+    def flush(self):
+        """Write all pending deltas to the database. Returns the number of rows touched."""
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return 0
+                pending, self.pending = self.pending, {}
+                batch_id = uuid.uuid4().hex
+                batch_path = os.path.join(self.journal_dir, f'votes-{self.pid}-{batch_id}.batch')
+                self.journal.close()
+                os.replace(self.journal_path, batch_path)
+                self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+            try:
+                self._apply(batch_id, pending)
+            except Exception:
+                # Put the deltas back so the next flush retries them; the
+                # batch file is dropped because they are journaled again.
+                for (label, pk), (upvotes, downvotes) in pending.items():
+                    model = apps.get_model(label)
+                    self.add(model, pk, upvotes, downvotes)
+                os.remove(batch_path)
+                raise
+            os.remove(batch_path)
+            if self.pruned_at is None or time.monotonic() - self.pruned_at > PRUNE_INTERVAL:
+                self.prune()
+            return len(pending)
+
+    def prune(self):
+        """Forget applied batch ids older than `batch_retention`. Returns the number deleted."""
+        self.pruned_at = time.monotonic()
+        VoteFlushBatch = apps.get_model('main', 'VoteFlushBatch')
+        cutoff = timezone.now() - timedelta(seconds=self.batch_retention)
+        deleted, _ = VoteFlushBatch.objects.filter(created_at__lt=cutoff).delete()
+        return deleted
+
+    def _apply(self, batch_id, pending):
+        from .votes import vote_counters_changed
+
+        VoteFlushBatch = apps.get_model('main', 'VoteFlushBatch')
+        by_model = {}
+        for (label, pk), counts in pending.items():
+            by_model.setdefault(label, []).append((pk, counts))
+
+        with transaction.atomic():
+            _, created = VoteFlushBatch.objects.get_or_create(batch_id=batch_id)
+            if not created:
+                return
+            for label, rows in by_model.items():
+                model = apps.get_model(label)
+                for start in range(0, len(rows), self.batch_size):
+                    chunk = rows[start:start + self.batch_size]
+                    model.objects.filter(pk__in=[pk for pk, _ in chunk]).update(
+                        upvotes=F('upvotes') + self._delta_case(chunk, 0),
+                        downvotes=F('downvotes') + self._delta_case(chunk, 1)
+                    )
+                if label == 'main.Post':
+                    for pk, _ in rows:
+                        invalidate_post(pk, counters_only=True)
+                vote_counters_changed.send(
+                    sender=model, deltas=[(pk, upvotes, downvotes) for pk, (upvotes, downvotes) in rows]
+                )
+
+    @staticmethod
+    def _delta_case(rows, index):
+        return Case(
+            *[When(pk=pk, then=Value(counts[index])) for pk, counts in rows],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+
+    # Recovery
+
+    def replay(self):
+        """
+        Re-apply journals and batch files left behind by processes that are
+        no longer running. Must be called before anything is recorded, since
+        files carrying this process's pid are treated as leftovers of an
+        earlier process that happened to get the same pid.
+        """
+        self.journal.close()
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, 'votes-*'))):
+            name = os.path.basename(path)
+            parts = name.split('.')[0].split('-')
+            pid = int(parts[1])
+            if pid != self.pid and _pid_alive(pid):
+                continue
+
+            try:
+                with open(path, 'rb') as journal:
+                    contents = journal.read()
+            except FileNotFoundError:
+                # Replayed and removed by another process starting alongside
+                continue
+            pending = {}
+            for line in contents.decode('utf-8', errors='replace').splitlines():
+                try:
+                    label, pk, upvotes, downvotes = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-write
+                    continue
+                self._accumulate(pending, label, pk, upvotes, downvotes)
+
+            if name.endswith('.batch'):
+                batch_id = parts[2]
+            else:
+                # An unflushed journal gets an id derived from its name and
+                # contents, so replaying the same file twice is still a no-op
+                # while two dead processes' identical journals both count.
+                batch_id = f'{name}:{hashlib.sha1(contents).hexdigest()}'
+            self._apply(batch_id, pending)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    # Background flusher
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name='vote-buffer-flusher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+        self.journal.close()
+
+    def _run(self):
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing vote buffer: {e}")
+            finally:
+                connection.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_buffer():
+    """Process-wide VoteBuffer, or None when `VOTE_BUFFER['ENABLED']` is off."""
+    global _buffer
+    config = buffer_settings()
+    if not config['ENABLED']:
+        return None
+    with _buffer_lock:
+        if _buffer is None or _buffer.pid != os.getpid():
+            journal_dir = config['JOURNAL_DIR'] or os.path.join(settings.BASE_DIR, 'vote_journal')
+            _buffer = VoteBuffer(
+                journal_dir,
+                flush_interval=config['FLUSH_INTERVAL'],
+                fsync=config['FSYNC'],
+                batch_size=config['BATCH_SIZE'],
+                batch_retention=config['BATCH_RETENTION']
+            )
+            _buffer.replay()
+            _buffer.start()
+            atexit.register(_buffer.stop)
+        return _buffer
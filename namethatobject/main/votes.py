@@ -0,0 +1,96 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.dispatch import Signal
+
+from .models import Post, Vote
+from .response_cache import invalidate_post
+from .vote_buffer import get_vote_buffer
+
+# Sent after vote counters are changed with update(), which sends no
+# post_save: sender is the model, `deltas` a list of (pk, upvotes, downvotes).
+vote_counters_changed = Signal()
+
+
+def counter_deltas(previous, value):
+    """(upvotes, downvotes) change when a user's vote goes from `previous` to `value` (0 = no vote)."""
+    upvotes = (value == Vote.UPVOTE) - (previous == Vote.UPVOTE)
+    downvotes = (value == Vote.DOWNVOTE) - (previous == Vote.DOWNVOTE)
+    return upvotes, downvotes
+
+
+def record_vote(user, target, value):
+    """
+    Upsert `user`'s vote on `target` in the vote ledger.
+
+    Returns the value the user had before (0 if they had not voted). The
+    unique (user, target) constraint makes repeated votes idempotent: the
+    first vote is a plain INSERT, and only a change of mind has to read and
+    rewrite the existing row.
+    """
+    lookup = {'user': user, 'post' if isinstance(target, Post) else 'comment': target}
+    try:
+        with transaction.atomic():
+            Vote.objects.create(value=value, **lookup)
+        return 0
+    except IntegrityError:
+        vote = Vote.objects.select_for_update().get(**lookup)
+        if vote.value != value:
+            Vote.objects.filter(pk=vote.pk).update(value=value)
+        return vote.value
+
+
+def apply_counter_deltas(model, pk, upvotes, downvotes):
+    """Fold vote deltas into the denormalized counters with a single UPDATE of just those columns."""
+    if not upvotes and not downvotes:
+        return
+    model.objects.filter(pk=pk).update(
+        upvotes=F('upvotes') + upvotes,
+        downvotes=F('downvotes') + downvotes
+    )
+    # update() sends no post_save, so retire cached responses here
+    if model is Post:
+        invalidate_post(pk, counters_only=True)
+    vote_counters_changed.send(sender=model, deltas=[(pk, upvotes, downvotes)])
+
+
+CONFIGURED_BUFFER = object()
+
+
+def cast_vote(user, target, value, vote_buffer=CONFIGURED_BUFFER):
+    """
+    Record `user`'s vote on a Post or Comment and update its counters.
+
+    The ledger write and the counter update run in one transaction, and the
+    counters are changed with `F()` expressions so concurrent voters never
+    overwrite each other's increments. With the write-behind vote buffer
+    enabled, the counter delta is handed to the buffer once the ledger write
+    commits instead. `target.upvotes`/`downvotes` are refreshed before
+    returning and include deltas still waiting in this process's buffer, so
+    the voter always sees their own vote.
+
+    `vote_buffer` defaults to the one configured by `VOTE_BUFFER`; pass a
+    VoteBuffer (or None for direct updates) to override it.
+    """
+    model = type(target)
+    if vote_buffer is CONFIGURED_BUFFER:
+        vote_buffer = get_vote_buffer()
+    with transaction.atomic():
+        previous = record_vote(user, target, value)
+        upvotes, downvotes = counter_deltas(previous, value)
+        if vote_buffer is None:
+            apply_counter_deltas(model, target.pk, upvotes, downvotes)
+        else:
+            transaction.on_commit(lambda: vote_buffer.add(model, target.pk, upvotes, downvotes))
+
+    if vote_buffer is None:
+        target.refresh_from_db(fields=['upvotes', 'downvotes'])
+        return target
+
+    # Hold off flushes so a batch is never counted both in the database
+    # read and in the pending deltas (or in neither).
+    with vote_buffer.flush_lock:
+        target.refresh_from_db(fields=['upvotes', 'downvotes'])
+        pending_upvotes, pending_downvotes = vote_buffer.pending_for(model, target.pk)
+    target.upvotes += pending_upvotes
+    target.downvotes += pending_downvotes
+    return target
@@ -3,6 +3,7 @@ import os
 import environ
 import logging
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 # Initialize environment variables
 env = environ.Env()
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'main',
+    'wikidata',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -125,6 +127,52 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'main.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_RATES': {
+        'wikidata': env('WIKIDATA_THROTTLE_RATE', default='60/min'),
+    },
+}
+
+# Write-behind vote counters (see main/vote_buffer.py). When enabled, vote
+# endpoints journal counter deltas locally and a background thread folds them
+# into Post/Comment every FLUSH_INTERVAL seconds.
+VOTE_BUFFER = {
+    'ENABLED': env.bool('VOTE_BUFFER_ENABLED', default=False),
+    'FLUSH_INTERVAL': env.float('VOTE_BUFFER_FLUSH_INTERVAL', default=1.0),
+    'JOURNAL_DIR': env('VOTE_BUFFER_JOURNAL_DIR', default=os.path.join(BASE_DIR, 'vote_journal')),
+    'FSYNC': env.bool('VOTE_BUFFER_FSYNC', default=False),
+}
+
+# Search-as-you-type prefix index (see main/suggest.py): cap on indexed keys
+# per process, and how often it is rebuilt to pick up other workers' changes.
+SUGGEST_INDEX_MAX_TERMS = env.int('SUGGEST_INDEX_MAX_TERMS', default=500_000)
+SUGGEST_INDEX_TTL = env.int('SUGGEST_INDEX_TTL', default=600)
+
+# Cache backend. The local-memory default is per process, so deployments with
+# several workers should point CACHE_URL at a shared cache (redis://...,
+# filecache:///var/tmp/namethatobject-cache) for invalidations to reach all.
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://'),
+}
+
+# Versioned post list/detail response cache (see main/response_cache.py)
+RESPONSE_CACHE = {
+    'ENABLED': env.bool('RESPONSE_CACHE_ENABLED', default=True),
+    'TIMEOUT': env.int('RESPONSE_CACHE_TIMEOUT', default=3600),
+    'LIST_TIMEOUT': env.int('RESPONSE_CACHE_LIST_TIMEOUT', default=30),
+}
+
+# Wikidata proxy (see wikidata/). Entities and searches are cached in the
+# database; with OFFLINE on, lookups are answered from the FIXTURES file only.
+WIKIDATA = {
+    'API_URL': env('WIKIDATA_API_URL', default='https://www.wikidata.org/w/api.php'),
+    'TIMEOUT': env.float('WIKIDATA_TIMEOUT', default=5.0),
+    'OFFLINE': env.bool('WIKIDATA_OFFLINE', default=False),
+    'FIXTURES': env('WIKIDATA_FIXTURES', default=os.path.join(BASE_DIR, 'wikidata', 'fixtures', 'offline_entities.json')),
+    'ENTITY_TTL': env.int('WIKIDATA_ENTITY_TTL', default=30 * 24 * 3600),
+    'SEARCH_TTL': env.int('WIKIDATA_SEARCH_TTL', default=7 * 24 * 3600),
+    'MAX_SEARCHES': env.int('WIKIDATA_MAX_SEARCHES', default=100_000),
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -136,6 +184,10 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Headers of the resumable upload protocol (see main.chunked_uploads)
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset', 'upload-length', 'upload-checksum', 'tus-resumable')
+CORS_EXPOSE_HEADERS = ['location', 'upload-offset', 'upload-length', 'etag']
+
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Logging setup to output errors to console in development
@@ -178,6 +230,72 @@ else:
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
     MEDIA_URL = 'https://res.cloudinary.com/dbrvvzoys/image/upload/'
 
+# Background media uploads (see main/media.py). Post uploads are staged under
+# STAGING_DIR and pushed to BACKEND ('cloudinary', or 'local' to copy them
+# under MEDIA_ROOT) by a pool of WORKERS threads.
+MEDIA_PIPELINE = {
+    'BACKEND': env('MEDIA_BACKEND', default='local' if DEBUG else 'cloudinary'),
+    'WORKERS': env.int('MEDIA_WORKERS', default=2),
+    'STAGING_DIR': env('MEDIA_STAGING_DIR', default=os.path.join(BASE_DIR, 'media_staging')),
+    'EAGER': env.bool('MEDIA_EAGER', default=False),
+    'MAX_ATTEMPTS': env.int('MEDIA_MAX_ATTEMPTS', default=3),
+}
+
+# Resized WebP/JPEG copies of post images plus a placeholder, generated by the
+# media pipeline (see main/images.py)
+IMAGE_DERIVATIVES = {
+    'ENABLED': env.bool('IMAGE_DERIVATIVES_ENABLED', default=True),
+    'WIDTHS': [int(width) for width in env.list('IMAGE_DERIVATIVE_WIDTHS', default=['160', '320', '640', '1280'])],
+    'QUALITY': env.int('IMAGE_DERIVATIVE_QUALITY', default=75),
+}
+
+# Near-duplicate image lookup on post create (see main/duplicates.py).
+# MAX_DISTANCE is in bits of the 64-bit dHash.
+DUPLICATE_DETECTION = {
+    'ENABLED': env.bool('DUPLICATE_DETECTION_ENABLED', default=True),
+    'MAX_DISTANCE': env.int('DUPLICATE_MAX_DISTANCE', default=6),
+    'LIMIT': env.int('DUPLICATE_LIMIT', default=5),
+}
+
+# Account deletion (see main/accounts.py). Accounts with more posts and
+# comments than BACKGROUND_THRESHOLD are deleted by a background worker.
+ACCOUNT_DELETION = {
+    'BACKGROUND_THRESHOLD': env.int('ACCOUNT_DELETION_BACKGROUND_THRESHOLD', default=2000),
+    'BATCH_SIZE': env.int('ACCOUNT_DELETION_BATCH_SIZE', default=1000),
+    'EAGER': env.bool('ACCOUNT_DELETION_EAGER', default=False),
+}
+
+# Feed ranking for `/posts/?ordering=hot|top|unsolved` (see main/ranking.py).
+# After changing these, run `manage.py refresh_feed_scores` to rescore.
+FEED_RANKING = {
+    'GRAVITY': env.int('FEED_RANKING_GRAVITY', default=45000),
+    'COMMENT_WEIGHT': env.float('FEED_RANKING_COMMENT_WEIGHT', default=1),
+    'SOLVED_PENALTY': env.float('FEED_RANKING_SOLVED_PENALTY', default=2.0),
+}
+
+# User and mystery leaderboards (see main/leaderboards.py). Weekly boards
+# older than KEEP_WEEKS are dropped by `manage.py rebuild_leaderboards --prune`.
+LEADERBOARDS = {
+    'PAGE_SIZE': env.int('LEADERBOARD_PAGE_SIZE', default=20),
+    'MAX_PAGE_SIZE': env.int('LEADERBOARD_MAX_PAGE_SIZE', default=100),
+    'KEEP_WEEKS': env.int('LEADERBOARD_KEEP_WEEKS', default=12),
+}
+
+# Live post event streams at /posts/<id>/events/ (see main/events.py).
+# The memory broker only reaches streams served by the same process.
+POST_EVENTS = {
+    'BACKEND': env('POST_EVENTS_BACKEND', default='memory'),
+    'KEEPALIVE': env.int('POST_EVENTS_KEEPALIVE', default=15),
+    'QUEUE_SIZE': env.int('POST_EVENTS_QUEUE_SIZE', default=100),
+}
+
+# Resumable chunked video/audio uploads (see main/chunked_uploads.py)
+CHUNKED_UPLOADS = {
+    'DIR': env('CHUNKED_UPLOAD_DIR', default=os.path.join(BASE_DIR, 'chunked_uploads')),
+    'MAX_SIZE': env.int('CHUNKED_UPLOAD_MAX_SIZE', default=2 * 1024 ** 3),
+    'EXPIRE_AFTER': env.int('CHUNKED_UPLOAD_EXPIRE_AFTER', default=24 * 3600),
+}
+
 # Add these settings for CSRF
 CSRF_TRUSTED_ORIGINS = [
     "https://swe573-backend.onrender.com",
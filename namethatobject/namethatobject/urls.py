@@ -10,6 +10,7 @@ from main.views import SignUpView, CustomAuthToken  # Import the SignUpView and
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('main.urls')),  # Include main app URLs
+    path('wikidata/', include('wikidata.urls')),  # Cached Wikidata lookups
     path('api-token-auth/', obtain_auth_token, name='api_token_auth'),  # Use default token auth
     path('signup/', SignUpView.as_view(), name='signup'),  # Sign-up endpoint
 ]
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import Entity, SearchResult
+
+@admin.register(Entity)
+class EntityAdmin(admin.ModelAdmin):
+    list_display = ('entity_id', 'label', 'description', 'missing', 'fetched_at')
+    search_fields = ('entity_id', 'label')
+
+@admin.register(SearchResult)
+class SearchResultAdmin(admin.ModelAdmin):
+    list_display = ('query', 'fetched_at')
+    search_fields = ('query',)
@@ -0,0 +1,169 @@
+import json
+import threading
+
+import requests
+from django.conf import settings
+
+DEFAULTS = {
+    'API_URL': 'https://www.wikidata.org/w/api.php',
+    'LANGUAGE': 'en',
+    'TIMEOUT': 5.0,
+    'USER_AGENT': 'namethatobject/1.0 (https://namethatobject.com)',
+    'OFFLINE': False,
+    'FIXTURES': None,
+    'ENTITY_TTL': 30 * 24 * 3600,
+    'SEARCH_TTL': 7 * 24 * 3600,
+    # Cached search answers kept at most; the oldest are pruned first
+    'MAX_SEARCHES': 100_000,
+}
+
+# wbgetentities accepts at most 50 ids per request
+MAX_BATCH = 50
+
+
+class WikidataError(Exception):
+    pass
+
+
+def wikidata_settings():
+    return {**DEFAULTS, **getattr(settings, 'WIKIDATA', {})}
+
+
+class HttpTransport:
+    """Calls the live Wikidata API over one keep-alive session."""
+
+    def __init__(self, api_url, timeout, user_agent):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = user_agent
+        self.calls = 0
+
+    def get(self, params):
+        self.calls += 1
+        try:
+            response = self.session.get(self.api_url, params={**params, 'format': 'json'}, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise WikidataError(f"Wikidata request failed: {e}") from e
+        if 'error' in data:
+            raise WikidataError(data['error'].get('info', 'Wikidata returned an error'))
+        return data
+
+
+class FixtureTransport:
+    """
+    Answers `wbgetentities` and `wbsearchentities` from a JSON file of
+    `{"entities": {"Q81895": {"label": ..., "description": ...}}}` without
+    touching the network. Used in offline mode and by the tests.
+    """
+
+    def __init__(self, path=None, entities=None):
+        if entities is None:
+            entities = {}
+            if path:
+                with open(path, encoding='utf-8') as fixtures:
+                    entities = json.load(fixtures)['entities']
+        self.entities = entities
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.requested_ids = []
+
+    def get(self, params):
+        with self.lock:
+            self.calls += 1
+        language = params.get('languages') or params.get('language')
+        if params['action'] == 'wbgetentities':
+            ids = params['ids'].split('|')
+            with self.lock:
+                self.requested_ids.append(ids)
+            return {'entities': {entity_id: self._entity(entity_id, language) for entity_id in ids}}
+        if params['action'] == 'wbsearchentities':
+            search = params['search'].lower()
+            matches = [
+                {'id': entity_id, 'label': entity['label'], 'description': entity.get('description', '')}
+                for entity_id, entity in self.entities.items()
+                if entity['label'].lower().startswith(search)
+            ]
+            return {'search': matches[:int(params.get('limit', 7))]}
+        raise WikidataError(f"Unsupported action {params['action']}")
+
+    def _entity(self, entity_id, language):
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            return {'id': entity_id, 'missing': ''}
+        return {
+            'id': entity_id,
+            'labels': {language: {'language': language, 'value': entity['label']}},
+            'descriptions': {language: {'language': language, 'value': entity.get('description', '')}},
+        }
+
+
+class WikidataClient:
+    """The two Wikidata API calls the app needs, over either transport."""
+
+    def __init__(self, transport, language='en'):
+        self.transport = transport
+        self.language = language
+
+    def get_entities(self, ids):
+        """`{id: {'label', 'description'} or None if missing}` for up to MAX_BATCH ids in one request."""
+        data = self.transport.get({
+            'action': 'wbgetentities',
+            'ids': '|'.join(ids),
+            'props': 'labels|descriptions',
+            'languages': self.language,
+        })
+        entities = {}
+        for entity_id, entity in data.get('entities', {}).items():
+            if 'missing' in entity:
+                entities[entity_id] = None
+                continue
+            entities[entity_id] = {
+                'label': entity.get('labels', {}).get(self.language, {}).get('value', ''),
+                'description': entity.get('descriptions', {}).get(self.language, {}).get('value', ''),
+            }
+        return entities
+
+    def search(self, query, limit):
+        """Ordered `[{'id', 'label', 'description'}]` matches for a label prefix."""
+        data = self.transport.get({
+            'action': 'wbsearchentities',
+            'search': query,
+            'language': self.language,
+            'uselang': self.language,
+            'type': 'item',
+            'limit': limit,
+        })
+        return [
+            {'id': match['id'], 'label': match.get('label', ''), 'description': match.get('description', '')}
+            for match in data.get('search', [])
+        ]
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    global _transport
+    config = wikidata_settings()
+    with _transport_lock:
+        if _transport is None:
+            if config['OFFLINE']:
+                _transport = FixtureTransport(config['FIXTURES'])
+            else:
+                _transport = HttpTransport(config['API_URL'], config['TIMEOUT'], config['USER_AGENT'])
+        return _transport
+
+
+def set_transport(transport):
+    """Swap the process-wide transport (None rebuilds it from settings on next use)."""
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+def get_client():
+    return WikidataClient(get_transport(), language=wikidata_settings()['LANGUAGE'])
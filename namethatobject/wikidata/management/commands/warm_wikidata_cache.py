@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import PostTag
+from wikidata.client import MAX_BATCH, WikidataError
+from wikidata.resolver import normalize_id, resolve
+
+
+class Command(BaseCommand):
+    help = 'Resolve every Wikidata id used by post tags into the local entity cache.'
+
+    def handle(self, *args, **options):
+        ids = set()
+        for entity_id in PostTag.objects.exclude(wikidata_id='').values_list('wikidata_id', flat=True).distinct():
+            try:
+                ids.add(normalize_id(entity_id))
+            except ValueError:
+                self.stderr.write(f"Skipping invalid Wikidata id {entity_id!r}")
+
+        ids = sorted(ids)
+        resolved = 0
+        for start in range(0, len(ids), MAX_BATCH):
+            try:
+                resolved += len(resolve(ids[start:start + MAX_BATCH]))
+            except WikidataError as e:
+                raise CommandError(str(e))
+        self.stdout.write(f"Resolved {resolved} of {len(ids)} tag entities")
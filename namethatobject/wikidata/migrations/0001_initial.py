@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='Entity',
+            fields=[
+                ('entity_id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('label', models.CharField(blank=True, max_length=255)),
+                ('description', models.CharField(blank=True, max_length=500)),
+                ('missing', models.BooleanField(default=False)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True)),
+                ('entity_ids', models.JSONField(default=list)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('wikidata', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='searchresult',
+            name='fetched_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
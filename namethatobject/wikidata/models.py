@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class Entity(models.Model):
+    """Local copy of a Wikidata item's label and description, keyed by its id (e.g. "Q81895")."""
+    entity_id = models.CharField(max_length=32, primary_key=True)
+    label = models.CharField(max_length=255, blank=True)
+    description = models.CharField(max_length=500, blank=True)
+    # Ids Wikidata reports as missing or deleted are cached too, so they are not re-requested
+    missing = models.BooleanField(default=False)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.entity_id} ({self.label})"
+
+    def as_dict(self):
+        return {'id': self.entity_id, 'label': self.label, 'description': self.description}
+
+
+class SearchResult(models.Model):
+    """Cached `wbsearchentities` answer: the ordered entity ids found for a normalized query."""
+    query = models.CharField(max_length=255, unique=True)
+    entity_ids = models.JSONField(default=list)
+    fetched_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.query
@@ -0,0 +1,195 @@
+import re
+import threading
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .client import MAX_BATCH, WikidataError, get_client, wikidata_settings
+from .models import Entity, SearchResult
+
+ENTITY_ID = re.compile(r'^[QPL][1-9]\d*$')
+# Searches are always fetched this deep, so one cached answer serves every `limit`
+SEARCH_DEPTH = 20
+# Longer queries are refused rather than sent upstream
+MAX_QUERY_LENGTH = 100
+
+
+def normalize_id(entity_id):
+    entity_id = str(entity_id or '').strip().upper()
+    if not ENTITY_ID.match(entity_id):
+        raise ValueError(f"Invalid Wikidata id: {entity_id!r}")
+    return entity_id
+
+
+def normalize_query(query):
+    return ' '.join(str(query or '').lower().split())[:255]
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer:
+    """
+    Collapse concurrent lookups of the same keys into one upstream call.
+
+    `run(keys, fetch)` claims every key nobody else is fetching and calls
+    `fetch(claimed_keys)` once for them; keys already in flight in another
+    thread are waited for, and that thread's result (or error) is shared.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def run(self, keys, fetch):
+        owned, waiting = [], []
+        with self.lock:
+            for key in keys:
+                call = self.calls.get(key)
+                if call is None:
+                    self.calls[key] = _Call()
+                    owned.append(key)
+                else:
+                    waiting.append((key, call))
+
+        results = {}
+        error = None
+        try:
+            if owned:
+                results.update(fetch(owned))
+        except Exception as e:
+            error = e
+        finally:
+            with self.lock:
+                for key in owned:
+                    call = self.calls.pop(key)
+                    call.result = results.get(key)
+                    call.error = error
+                    call.done.set()
+        if error is not None:
+            raise error
+
+        for key, call in waiting:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            if call.result is not None:
+                results[key] = call.result
+        return results
+
+
+_entities = Coalescer()
+_searches = Coalescer()
+
+
+def store_entities(found, now=None):
+    """Upsert `{id: {'label', 'description'} or None}` into the cache; returns the Entity rows."""
+    now = now or timezone.now()
+    rows = [
+        Entity(
+            entity_id=entity_id,
+            label=(values or {}).get('label', '')[:255],
+            description=(values or {}).get('description', '')[:500],
+            missing=values is None,
+            fetched_at=now,
+        )
+        for entity_id, values in found.items()
+    ]
+    Entity.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['entity_id'],
+        update_fields=['label', 'description', 'missing', 'fetched_at'],
+    )
+    return {row.entity_id: row for row in rows}
+
+
+def fetch_entities(ids):
+    """Fetch `ids` from Wikidata with one `wbgetentities` call per MAX_BATCH ids and cache them."""
+    client = get_client()
+    fetched = {}
+    for start in range(0, len(ids), MAX_BATCH):
+        chunk = ids[start:start + MAX_BATCH]
+        found = client.get_entities(chunk)
+        # An id the API leaves out of its answer is treated like a missing one
+        fetched.update(store_entities({entity_id: found.get(entity_id) for entity_id in chunk}))
+    return fetched
+
+
+def resolve(ids):
+    """
+    `{id: {'id', 'label', 'description'}}` for the given Wikidata ids.
+
+    Ids are read from the local cache; only unknown or expired ones go to
+    Wikidata. If Wikidata is unreachable, expired entries are served as they
+    are and WikidataError is raised only when an id was never cached.
+    """
+    ids = list(dict.fromkeys(normalize_id(entity_id) for entity_id in ids))
+    if not ids:
+        return {}
+    cutoff = timezone.now() - timedelta(seconds=wikidata_settings()['ENTITY_TTL'])
+    entities = Entity.objects.in_bulk(ids)
+    stale = [entity_id for entity_id in ids if entity_id not in entities or entities[entity_id].fetched_at < cutoff]
+    if stale:
+        try:
+            entities.update(_entities.run(stale, fetch_entities))
+        except WikidataError:
+            if any(entity_id not in entities for entity_id in stale):
+                raise
+    return {
+        entity_id: entities[entity_id].as_dict()
+        for entity_id in ids
+        if entity_id in entities and not entities[entity_id].missing
+    }
+
+
+def prune_searches(now=None):
+    """Drop expired search answers, then the oldest ones beyond `MAX_SEARCHES`."""
+    config = wikidata_settings()
+    now = now or timezone.now()
+    SearchResult.objects.filter(fetched_at__lt=now - timedelta(seconds=config['SEARCH_TTL'])).delete()
+    overflow = SearchResult.objects.order_by('-fetched_at', '-id')[config['MAX_SEARCHES']:].values_list('id', flat=True)
+    SearchResult.objects.filter(id__in=list(overflow)).delete()
+
+
+def fetch_search(query):
+    matches = get_client().search(query, SEARCH_DEPTH)
+    store_entities({match['id']: match for match in matches})
+    entity_ids = [match['id'] for match in matches]
+    now = timezone.now()
+    SearchResult.objects.update_or_create(query=query, defaults={'entity_ids': entity_ids, 'fetched_at': now})
+    # Only searches that went upstream add rows, so this is where the table is kept bounded
+    prune_searches(now)
+    return entity_ids
+
+
+def search(query, limit=5):
+    """
+    Wikidata items whose label starts with `query`, as `[{'id', 'label', 'description'}]`.
+
+    Answers are cached per normalized query for `SEARCH_TTL`, and the
+    matched entities land in the entity cache, so popular searches and the
+    tags picked from them are served locally.
+    """
+    query = normalize_query(query)
+    if not query:
+        return []
+    cutoff = timezone.now() - timedelta(seconds=wikidata_settings()['SEARCH_TTL'])
+    cached = SearchResult.objects.filter(query=query).first()
+    if cached is not None and cached.fetched_at >= cutoff:
+        entity_ids = cached.entity_ids
+    else:
+        try:
+            entity_ids = _searches.run([query], lambda keys: {query: fetch_search(query)}).get(query, [])
+        except WikidataError:
+            if cached is None:
+                raise
+            entity_ids = cached.entity_ids
+
+    entity_ids = entity_ids[:limit]
+    entities = resolve(entity_ids)
+    return [entities[entity_id] for entity_id in entity_ids if entity_id in entities]
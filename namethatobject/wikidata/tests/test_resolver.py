@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from wikidata.client import FixtureTransport, WikidataError, get_transport, set_transport
+from wikidata.models import Entity, SearchResult
+from wikidata.resolver import Coalescer, prune_searches, resolve, search
+from wikidata.views import WikidataThrottle
+
+FIXTURES = os.path.join(settings.BASE_DIR, 'wikidata', 'fixtures', 'offline_entities.json')
+
+
+class FailingTransport:
+    calls = 0
+
+    def get(self, params):
+        self.calls += 1
+        raise WikidataError('offline')
+
+
+class ResolverTest(TestCase):
+    def setUp(self):
+        self.transport = FixtureTransport(FIXTURES)
+        set_transport(self.transport)
+        self.addCleanup(set_transport, None)
+
+    def test_resolved_entities_are_cached(self):
+        self.assertEqual(resolve(['q81895']), {
+            'Q81895': {'id': 'Q81895', 'label': 'spoon', 'description': 'eating utensil'}
+        })
+        self.assertEqual(resolve(['Q81895', 'Q81895']), {
+            'Q81895': {'id': 'Q81895', 'label': 'spoon', 'description': 'eating utensil'}
+        })
+        self.assertEqual(self.transport.calls, 1)
+
+    def test_unknown_ids_are_fetched_in_batches(self):
+        ids = [f'Q{n}' for n in range(100000, 100120)] + ['Q146']
+        entities = resolve(ids)
+
+        self.assertEqual(list(entities), ['Q146'])
+        self.assertEqual([len(batch) for batch in self.transport.requested_ids], [50, 50, 21])
+        # Missing ids are remembered too
+        self.assertTrue(Entity.objects.get(entity_id='Q100000').missing)
+        resolve(ids)
+        self.assertEqual(self.transport.calls, 3)
+
+    def test_invalid_id(self):
+        with self.assertRaises(ValueError):
+            resolve(['spoon'])
+
+    def test_expired_entities_are_served_when_wikidata_is_down(self):
+        resolve(['Q146'])
+        Entity.objects.update(fetched_at=timezone.now() - timedelta(days=365))
+        set_transport(FailingTransport())
+
+        self.assertEqual(resolve(['Q146'])['Q146']['label'], 'house cat')
+        with self.assertRaises(WikidataError):
+            resolve(['Q144'])
+
+    def test_searches_are_cached_and_fill_the_entity_cache(self):
+        self.assertEqual(search('Spo'), [{'id': 'Q81895', 'label': 'spoon', 'description': 'eating utensil'}])
+        self.assertEqual(search('  spo '), [{'id': 'Q81895', 'label': 'spoon', 'description': 'eating utensil'}])
+        resolve(['Q81895'])
+
+        self.assertEqual(self.transport.calls, 1)
+        self.assertEqual(SearchResult.objects.get().entity_ids, ['Q81895'])
+
+    def test_search_limit(self):
+        self.assertEqual(len(search('s', limit=1)), 1)
+        self.assertEqual(len(search('s', limit=5)), 3)
+        self.assertEqual(self.transport.calls, 1)
+
+    def test_cached_searches_are_pruned(self):
+        now = timezone.now()
+        SearchResult.objects.create(query='expired', fetched_at=now - timedelta(days=365))
+        for i in range(3):
+            SearchResult.objects.create(query=f'kept {i}', fetched_at=now - timedelta(minutes=i))
+
+        with override_settings(WIKIDATA={'MAX_SEARCHES': 2}):
+            prune_searches(now)
+            self.assertEqual(set(SearchResult.objects.values_list('query', flat=True)), {'kept 0', 'kept 1'})
+            search('spo')
+            self.assertEqual(set(SearchResult.objects.values_list('query', flat=True)), {'spo', 'kept 0'})
+
+    def test_offline_mode_uses_fixtures(self):
+        set_transport(None)
+        with override_settings(WIKIDATA={'OFFLINE': True, 'FIXTURES': FIXTURES}):
+            self.assertIsInstance(get_transport(), FixtureTransport)
+            self.assertEqual(resolve(['Q42'])['Q42']['label'], 'Douglas Adams')
+
+
+class CoalescerTest(TestCase):
+    def test_concurrent_lookups_share_one_fetch(self):
+        coalescer = Coalescer()
+        fetched = []
+        release = threading.Event()
+
+        def fetch(keys):
+            fetched.append(list(keys))
+            release.wait(5)
+            return {key: key.lower() for key in keys}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(coalescer.run(['Q1', 'Q2'], fetch)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while not fetched:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(fetched, [['Q1', 'Q2']])
+        self.assertEqual(results, [{'Q1': 'q1', 'Q2': 'q2'}] * 5)
+
+    def test_errors_reach_waiting_callers(self):
+        coalescer = Coalescer()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fetch(keys):
+            started.set()
+            release.wait(5)
+            raise WikidataError('down')
+
+        def lookup():
+            try:
+                coalescer.run(['Q1'], fetch)
+            except WikidataError as e:
+                errors.append(e)
+
+        first = threading.Thread(target=lookup)
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=lookup)
+        second.start()
+        time.sleep(0.05)
+        release.set()
+        first.join()
+        second.join()
+
+        self.assertEqual(len(errors), 2)
+
+
+class WikidataViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create_user(username='testuser'))
+        set_transport(FixtureTransport(FIXTURES))
+        self.addCleanup(set_transport, None)
+
+    def test_search(self):
+        response = self.client.get(reverse('wikidata_search'), {'q': 'gol'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['id'], 'Q897')
+
+    def test_entities(self):
+        response = self.client.get(reverse('wikidata_entities'), {'ids': 'Q753,Q1090'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['entities']), {'Q753', 'Q1090'})
+
+        response = self.client.get(reverse('wikidata_entities'), {'ids': 'copper'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upstream_failure(self):
+        set_transport(FailingTransport())
+        response = self.client.get(reverse('wikidata_search'), {'q': 'gol'})
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+
+    def test_requires_login_and_bounds_queries(self):
+        response = self.client.get(reverse('wikidata_search'), {'q': 'g' * 101})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('wikidata_search'), {'q': 'gol'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rate_limited(self):
+        with mock.patch.object(WikidataThrottle, 'THROTTLE_RATES', {'wikidata': '2/min'}):
+            for expected in (status.HTTP_200_OK, status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS):
+                response = self.client.get(reverse('wikidata_entities'), {'ids': 'Q753'})
+                self.assertEqual(response.status_code, expected)
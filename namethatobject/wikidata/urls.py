@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('search/', views.entity_search, name='wikidata_search'),
+    path('entities/', views.entity_detail, name='wikidata_entities'),
+]
@@ -0,0 +1,45 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.throttling import UserRateThrottle
+from main.views import int_query_param
+from .client import MAX_BATCH, WikidataError
+from .resolver import MAX_QUERY_LENGTH, SEARCH_DEPTH, resolve, search
+
+class WikidataThrottle(UserRateThrottle):
+    """Every uncached query or id costs an upstream Wikidata call, so both endpoints share one per-user rate."""
+    scope = 'wikidata'
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([WikidataThrottle])
+def entity_search(request):
+    """Wikidata items matching the typed `q`, served from the local cache whenever possible."""
+    limit = int_query_param(request, 'limit', default=5, maximum=SEARCH_DEPTH)
+    query = request.query_params.get('q', '')
+    if len(query) > MAX_QUERY_LENGTH:
+        return Response({'error': f'At most {MAX_QUERY_LENGTH} characters per query.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        results = search(query, limit=limit)
+    except WikidataError as e:
+        print(f"Wikidata search failed: {e}")
+        return Response({'error': 'Wikidata is unavailable.'}, status=status.HTTP_502_BAD_GATEWAY)
+    return Response({'results': results})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([WikidataThrottle])
+def entity_detail(request):
+    """Labels and descriptions for `ids` (comma-separated), resolved in batches."""
+    ids = [entity_id for entity_id in request.query_params.get('ids', '').split(',') if entity_id.strip()]
+    if len(ids) > MAX_BATCH * 4:
+        return Response({'error': f'At most {MAX_BATCH * 4} ids per request.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        entities = resolve(ids)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except WikidataError as e:
+        print(f"Wikidata lookup failed: {e}")
+        return Response({'error': 'Wikidata is unavailable.'}, status=status.HTTP_502_BAD_GATEWAY)
+    return Response({'entities': entities})